@@ -1,13 +1,39 @@
+import heapq
 import json
+from itertools import islice
 
 import frappe
 from bs4 import BeautifulSoup
 from frappe import _
 from frappe.desk.form.load import get_docinfo
-from frappe.query_builder import JoinType
+from frappe.query_builder import JoinType, Order
 from frappe.translate import get_translated_doctypes
+from frappe.utils import cint, get_datetime
 
-from crm.fcrm.doctype.crm_call_log.crm_call_log import parse_call_log
+from crm.api.doc import decode_cursor, encode_cursor
+from crm.fcrm.doctype.crm_call_log.crm_call_log import parse_call_logs
+
+# fields whose changes are not shown on the timeline
+AVOID_FIELDS = {
+	"CRM Deal": [
+		"lead",
+		"response_by",
+		"sla_creation",
+		"sla",
+		"first_response_time",
+		"first_responded_on",
+	],
+	"CRM Lead": [
+		"converted",
+		"response_by",
+		"sla_creation",
+		"sla",
+		"first_response_time",
+		"first_responded_on",
+	],
+}
+# order of the paginated activity feed, newest first
+FEED_ORDER = [["creation", "desc"], ["name", "desc"]]
 
 
 @frappe.whitelist()
@@ -30,14 +56,7 @@ def get_deal_activities(name: str):
 	deal_fields = {
 		field.fieldname: {"label": field.label, "options": field.options} for field in deal_meta.fields
 	}
-	avoid_fields = [
-		"lead",
-		"response_by",
-		"sla_creation",
-		"sla",
-		"first_response_time",
-		"first_responded_on",
-	]
+	avoid_fields = AVOID_FIELDS["CRM Deal"]
 
 	doc = frappe.db.get_values("CRM Deal", name, ["creation", "owner", "lead"])[0]
 	lead = doc[2]
@@ -66,106 +85,28 @@ def get_deal_activities(name: str):
 	docinfo.versions.reverse()
 
 	for version in docinfo.versions:
-		data = json.loads(version.data)
-		if not data.get("changed"):
-			continue
+		if activity := get_version_activity(version, deal_fields, avoid_fields, is_lead=False):
+			activities.append(activity)
 
-		if change := data.get("changed")[0]:
-			field = deal_fields.get(change[0], None)
-
-			if not field or change[0] in avoid_fields or (not change[1] and not change[2]):
-				continue
-
-			field_label = field.get("label") or change[0]
-			field_option = field.get("options") or None
-
-			activity_type = "changed"
-			data = {
-				"field": change[0],
-				"field_label": field_label,
-				"old_value": change[1],
-				"value": change[2],
-			}
-
-			if not change[1] and change[2]:
-				activity_type = "added"
-				data = {
-					"field": change[0],
-					"field_label": field_label,
-					"value": change[2],
-				}
-			elif change[1] and not change[2]:
-				activity_type = "removed"
-				data = {
-					"field": change[0],
-					"field_label": field_label,
-					"value": change[1],
-				}
-
-			if data.get("value") and field_option and is_translatable(field_option):
-				data["value"] = _(data["value"])
-
-				if data.get("old_value"):
-					data["old_value"] = _(data["old_value"])
-
-		activity = {
-			"activity_type": activity_type,
-			"creation": version.creation,
-			"owner": version.owner,
-			"data": data,
-			"is_lead": False,
-			"options": field_option,
-		}
-		activities.append(activity)
+	communications = docinfo.communications + docinfo.automated_messages
+	comment_attachments = get_attachments_by_name("Comment", [c.name for c in docinfo.comments])
+	communication_attachments = get_attachments_by_name("Communication", [c.name for c in communications])
 
 	for comment in docinfo.comments:
-		activity = {
-			"name": comment.name,
-			"activity_type": "comment",
-			"creation": comment.creation,
-			"owner": comment.owner,
-			"content": comment.content,
-			"attachments": get_attachments("Comment", comment.name),
-			"is_lead": False,
-		}
-		activities.append(activity)
-
-	for communication in docinfo.communications + docinfo.automated_messages:
-		activity = {
-			"activity_type": "communication",
-			"communication_type": communication.communication_type,
-			"communication_date": communication.communication_date or communication.creation,
-			"creation": communication.creation,
-			"data": {
-				"subject": communication.subject,
-				"content": communication.content,
-				"sender_full_name": communication.sender_full_name,
-				"sender": communication.sender,
-				"recipients": communication.recipients,
-				"cc": communication.cc,
-				"bcc": communication.bcc,
-				"attachments": get_attachments("Communication", communication.name),
-				"read_by_recipient": communication.read_by_recipient,
-				"delivery_status": communication.delivery_status,
-			},
-			"is_lead": False,
-		}
-		activities.append(activity)
+		comment_files = comment_attachments.get(comment.name, [])
+		activities.append(get_comment_activity(comment, comment_files, is_lead=False))
+
+	for communication in communications:
+		communication_files = communication_attachments.get(communication.name, [])
+		activities.append(get_communication_activity(communication, communication_files, is_lead=False))
 
 	for attachment_log in docinfo.attachment_logs:
-		activity = {
-			"name": attachment_log.name,
-			"activity_type": "attachment_log",
-			"creation": attachment_log.creation,
-			"owner": attachment_log.owner,
-			"data": parse_attachment_log(attachment_log.content, attachment_log.comment_type),
-			"is_lead": False,
-		}
-		activities.append(activity)
+		activities.append(get_attachment_log_activity(attachment_log, is_lead=False))
 
-	calls = calls + get_linked_calls(name).get("calls", [])
-	notes = notes + get_linked_notes(name) + get_linked_calls(name).get("notes", [])
-	tasks = tasks + get_linked_tasks(name) + get_linked_calls(name).get("tasks", [])
+	linked = get_linked_calls(name)
+	calls = calls + linked.get("calls", [])
+	notes = notes + get_linked_notes(name) + linked.get("notes", [])
+	tasks = tasks + get_linked_tasks(name) + linked.get("tasks", [])
 	attachments = attachments + get_attachments("CRM Deal", name)
 
 	activities.sort(key=lambda x: x["creation"], reverse=True)
@@ -174,6 +115,291 @@ def get_deal_activities(name: str):
 	return activities, calls, notes, tasks, attachments
 
 
+@frappe.whitelist()
+def get_activities_page(name: str, limit: int = 20, cursor: str | None = None):
+	"""
+	Return the newest `limit` timeline activities of a deal (including its originating
+	lead) or lead that come after `cursor`, and the cursor of the next page.
+
+	Versions, comments, communications and attachment logs of every document are read as
+	separate sources, each sorted by (creation, name) and fetched a page at a time past the
+	cursor. The sources are merged lazily, so only about a page of each is ever read.
+	"""
+	if frappe.db.exists("CRM Deal", name):
+		doctype = "CRM Deal"
+	elif frappe.db.exists("CRM Lead", name):
+		doctype = "CRM Lead"
+	else:
+		frappe.throw(_("Document not found"), frappe.DoesNotExistError)
+
+	if not frappe.has_permission(doctype, "read", name):
+		frappe.throw(_("Not permitted"), frappe.PermissionError)
+
+	limit = cint(limit) or 20
+	before = None
+	if cursor:
+		creation, last_name = decode_cursor(cursor, FEED_ORDER)
+		before = (get_datetime(creation), last_name)
+
+	if doctype == "CRM Lead":
+		documents = [("CRM Lead", name, _("created this lead"))]
+	elif lead := frappe.db.get_value("CRM Deal", name, "lead"):
+		documents = [("CRM Deal", name, _("converted the lead to this deal"))]
+		if frappe.has_permission("CRM Lead", "read", lead):
+			documents.append(("CRM Lead", lead, _("created this lead")))
+	else:
+		documents = [("CRM Deal", name, _("created this deal"))]
+
+	sources = []
+	for reference_doctype, reference_name, creation_text in documents:
+		sources.extend(get_activity_sources(reference_doctype, reference_name, creation_text, before, limit))
+
+	feed = heapq.merge(*sources, key=lambda entry: entry[0], reverse=True)
+	entries = list(islice(feed, limit + 1))
+
+	next_cursor = None
+	if len(entries) > limit:
+		entries = entries[:limit]
+		next_cursor = encode_cursor(FEED_ORDER, list(entries[-1][0]))
+
+	activities = [activity for key, activity in entries]
+	add_attachments(activities)
+
+	return {"activities": handle_multiple_versions(activities), "cursor": next_cursor}
+
+
+def get_activity_sources(doctype: str, name: str, creation_text: str, before: tuple | None, limit: int):
+	"""Per-source iterators of (sort key, activity) for one document, newest first."""
+	is_lead = doctype == "CRM Lead"
+	fields = {
+		field.fieldname: {"label": field.label, "options": field.options}
+		for field in frappe.get_meta(doctype).fields
+	}
+	avoid_fields = AVOID_FIELDS[doctype]
+
+	Version = frappe.qb.DocType("Version")
+	versions = (
+		frappe.qb.from_(Version)
+		.select(Version.name, Version.creation, Version.owner, Version.data)
+		.where((Version.ref_doctype == doctype) & (Version.docname == name))
+	)
+
+	Comment = frappe.qb.DocType("Comment")
+	comments = (
+		frappe.qb.from_(Comment)
+		.select(Comment.name, Comment.creation, Comment.owner, Comment.content, Comment.comment_type)
+		.where((Comment.reference_doctype == doctype) & (Comment.reference_name == name))
+	)
+
+	Communication = frappe.qb.DocType("Communication")
+	CommunicationLink = frappe.qb.DocType("Communication Link")
+	linked_communications = (
+		frappe.qb.from_(CommunicationLink)
+		.select(CommunicationLink.parent)
+		.where((CommunicationLink.link_doctype == doctype) & (CommunicationLink.link_name == name))
+	)
+	communications = (
+		frappe.qb.from_(Communication)
+		.select(
+			Communication.name,
+			Communication.creation,
+			Communication.communication_type,
+			Communication.communication_date,
+			Communication.subject,
+			Communication.content,
+			Communication.sender_full_name,
+			Communication.sender,
+			Communication.recipients,
+			Communication.cc,
+			Communication.bcc,
+			Communication.read_by_recipient,
+			Communication.delivery_status,
+		)
+		.where(Communication.communication_type.isin(["Communication", "Automated Message"]))
+		.where(
+			((Communication.reference_doctype == doctype) & (Communication.reference_name == name))
+			| Communication.name.isin(linked_communications)
+		)
+	)
+
+	def make_version(version):
+		return get_version_activity(version, fields, avoid_fields, is_lead)
+
+	def make_comment(comment):
+		return get_comment_activity(comment, [], is_lead)
+
+	def make_communication(communication):
+		return get_communication_activity(communication, [], is_lead)
+
+	def make_attachment_log(attachment_log):
+		return get_attachment_log_activity(attachment_log, is_lead)
+
+	creation, owner = frappe.db.get_value(doctype, name, ["creation", "owner"])
+	creation_activity = {
+		"activity_type": "creation",
+		"creation": creation,
+		"owner": owner,
+		"data": creation_text,
+		"is_lead": is_lead,
+	}
+
+	return [
+		iter_activities(Version, versions, make_version, before, limit),
+		iter_activities(
+			Comment, comments.where(Comment.comment_type == "Comment"), make_comment, before, limit
+		),
+		iter_activities(Communication, communications, make_communication, before, limit),
+		iter_activities(
+			Comment,
+			comments.where(Comment.comment_type.isin(["Attachment", "Attachment Removed"])),
+			make_attachment_log,
+			before,
+			limit,
+		),
+		iter([((creation, name), creation_activity)] if not before or (creation, name) < before else []),
+	]
+
+
+def iter_activities(table, query, make_activity, before, limit):
+	"""
+	Yield ((creation, name), activity) for the rows of `query` sorted after `before`,
+	newest first, reading `limit` rows at a time. Rows that don't make an activity
+	(e.g. versions of hidden fields) are skipped. Every activity carries the row's name,
+	which the feed's cursor and attachment lookup rely on.
+	"""
+	while True:
+		page = query
+		if before:
+			creation, name = before
+			page = page.where(
+				(table.creation < creation) | ((table.creation == creation) & (table.name < name))
+			)
+
+		rows = page.orderby(table.creation, order=Order.desc).orderby(table.name, order=Order.desc)
+		rows = rows.limit(limit).run(as_dict=True)
+		for row in rows:
+			if activity := make_activity(row):
+				activity.setdefault("name", row.name)
+				yield (row.creation, row.name), activity
+
+		if len(rows) < limit:
+			return
+
+		before = (rows[-1].creation, rows[-1].name)
+
+
+def add_attachments(activities: list):
+	"""Fill in the attachments of the comments and communications in `activities`."""
+	comments = [a for a in activities if a["activity_type"] == "comment"]
+	communications = [a for a in activities if a["activity_type"] == "communication"]
+
+	comment_attachments = get_attachments_by_name("Comment", [a["name"] for a in comments])
+	for activity in comments:
+		activity["attachments"] = comment_attachments.get(activity["name"], [])
+
+	communication_attachments = get_attachments_by_name("Communication", [a["name"] for a in communications])
+	for activity in communications:
+		activity["data"]["attachments"] = communication_attachments.get(activity["name"], [])
+
+
+def get_version_activity(version, fields: dict, avoid_fields: list, is_lead: bool):
+	data = json.loads(version.data)
+	if not data.get("changed"):
+		return None
+
+	change = data.get("changed")[0]
+	field = fields.get(change[0], None)
+
+	if not field or change[0] in avoid_fields or (not change[1] and not change[2]):
+		return None
+
+	field_label = field.get("label") or change[0]
+	field_option = field.get("options") or None
+
+	activity_type = "changed"
+	data = {
+		"field": change[0],
+		"field_label": field_label,
+		"old_value": change[1],
+		"value": change[2],
+	}
+
+	if not change[1] and change[2]:
+		activity_type = "added"
+		data = {
+			"field": change[0],
+			"field_label": field_label,
+			"value": change[2],
+		}
+	elif change[1] and not change[2]:
+		activity_type = "removed"
+		data = {
+			"field": change[0],
+			"field_label": field_label,
+			"value": change[1],
+		}
+
+	if data.get("value") and field_option and is_translatable(field_option):
+		data["value"] = _(data["value"])
+
+		if data.get("old_value"):
+			data["old_value"] = _(data["old_value"])
+
+	return {
+		"activity_type": activity_type,
+		"creation": version.creation,
+		"owner": version.owner,
+		"data": data,
+		"is_lead": is_lead,
+		"options": field_option,
+	}
+
+
+def get_comment_activity(comment, attachments: list, is_lead: bool):
+	return {
+		"name": comment.name,
+		"activity_type": "comment",
+		"creation": comment.creation,
+		"owner": comment.owner,
+		"content": comment.content,
+		"attachments": attachments,
+		"is_lead": is_lead,
+	}
+
+
+def get_communication_activity(communication, attachments: list, is_lead: bool):
+	return {
+		"activity_type": "communication",
+		"communication_type": communication.communication_type,
+		"communication_date": communication.communication_date or communication.creation,
+		"creation": communication.creation,
+		"data": {
+			"subject": communication.subject,
+			"content": communication.content,
+			"sender_full_name": communication.sender_full_name,
+			"sender": communication.sender,
+			"recipients": communication.recipients,
+			"cc": communication.cc,
+			"bcc": communication.bcc,
+			"attachments": attachments,
+			"read_by_recipient": communication.read_by_recipient,
+			"delivery_status": communication.delivery_status,
+		},
+		"is_lead": is_lead,
+	}
+
+
+def get_attachment_log_activity(attachment_log, is_lead: bool):
+	return {
+		"name": attachment_log.name,
+		"activity_type": "attachment_log",
+		"creation": attachment_log.creation,
+		"owner": attachment_log.owner,
+		"data": parse_attachment_log(attachment_log.content, attachment_log.comment_type),
+		"is_lead": is_lead,
+	}
+
+
 def get_lead_activities(name: str):
 	if not frappe.has_permission("CRM Lead", "read", name):
 		frappe.throw(_("Not permitted"), frappe.PermissionError)
@@ -184,14 +410,7 @@ def get_lead_activities(name: str):
 	lead_fields = {
 		field.fieldname: {"label": field.label, "options": field.options} for field in lead_meta.fields
 	}
-	avoid_fields = [
-		"converted",
-		"response_by",
-		"sla_creation",
-		"sla",
-		"first_response_time",
-		"first_responded_on",
-	]
+	avoid_fields = AVOID_FIELDS["CRM Lead"]
 
 	doc = frappe.db.get_values("CRM Lead", name, ["creation", "owner"])[0]
 	activities = [
@@ -207,106 +426,28 @@ def get_lead_activities(name: str):
 	docinfo.versions.reverse()
 
 	for version in docinfo.versions:
-		data = json.loads(version.data)
-		if not data.get("changed"):
-			continue
+		if activity := get_version_activity(version, lead_fields, avoid_fields, is_lead=True):
+			activities.append(activity)
 
-		if change := data.get("changed")[0]:
-			field = lead_fields.get(change[0], None)
-
-			if not field or change[0] in avoid_fields or (not change[1] and not change[2]):
-				continue
-
-			field_label = field.get("label") or change[0]
-			field_option = field.get("options") or None
-
-			activity_type = "changed"
-			data = {
-				"field": change[0],
-				"field_label": field_label,
-				"old_value": change[1],
-				"value": change[2],
-			}
-
-			if not change[1] and change[2]:
-				activity_type = "added"
-				data = {
-					"field": change[0],
-					"field_label": field_label,
-					"value": change[2],
-				}
-			elif change[1] and not change[2]:
-				activity_type = "removed"
-				data = {
-					"field": change[0],
-					"field_label": field_label,
-					"value": change[1],
-				}
-
-			if data.get("value") and field_option and is_translatable(field_option):
-				data["value"] = _(data["value"])
-
-				if data.get("old_value"):
-					data["old_value"] = _(data["old_value"])
-
-		activity = {
-			"activity_type": activity_type,
-			"creation": version.creation,
-			"owner": version.owner,
-			"data": data,
-			"is_lead": True,
-			"options": field_option,
-		}
-		activities.append(activity)
+	communications = docinfo.communications + docinfo.automated_messages
+	comment_attachments = get_attachments_by_name("Comment", [c.name for c in docinfo.comments])
+	communication_attachments = get_attachments_by_name("Communication", [c.name for c in communications])
 
 	for comment in docinfo.comments:
-		activity = {
-			"name": comment.name,
-			"activity_type": "comment",
-			"creation": comment.creation,
-			"owner": comment.owner,
-			"content": comment.content,
-			"attachments": get_attachments("Comment", comment.name),
-			"is_lead": True,
-		}
-		activities.append(activity)
-
-	for communication in docinfo.communications + docinfo.automated_messages:
-		activity = {
-			"activity_type": "communication",
-			"communication_type": communication.communication_type,
-			"communication_date": communication.communication_date or communication.creation,
-			"creation": communication.creation,
-			"data": {
-				"subject": communication.subject,
-				"content": communication.content,
-				"sender_full_name": communication.sender_full_name,
-				"sender": communication.sender,
-				"recipients": communication.recipients,
-				"cc": communication.cc,
-				"bcc": communication.bcc,
-				"attachments": get_attachments("Communication", communication.name),
-				"read_by_recipient": communication.read_by_recipient,
-				"delivery_status": communication.delivery_status,
-			},
-			"is_lead": True,
-		}
-		activities.append(activity)
+		comment_files = comment_attachments.get(comment.name, [])
+		activities.append(get_comment_activity(comment, comment_files, is_lead=True))
+
+	for communication in communications:
+		communication_files = communication_attachments.get(communication.name, [])
+		activities.append(get_communication_activity(communication, communication_files, is_lead=True))
 
 	for attachment_log in docinfo.attachment_logs:
-		activity = {
-			"name": attachment_log.name,
-			"activity_type": "attachment_log",
-			"creation": attachment_log.creation,
-			"owner": attachment_log.owner,
-			"data": parse_attachment_log(attachment_log.content, attachment_log.comment_type),
-			"is_lead": True,
-		}
-		activities.append(activity)
+		activities.append(get_attachment_log_activity(attachment_log, is_lead=True))
 
-	calls = get_linked_calls(name).get("calls", [])
-	notes = get_linked_notes(name) + get_linked_calls(name).get("notes", [])
-	tasks = get_linked_tasks(name) + get_linked_calls(name).get("tasks", [])
+	linked = get_linked_calls(name)
+	calls = linked.get("calls", [])
+	notes = get_linked_notes(name) + linked.get("notes", [])
+	tasks = get_linked_tasks(name) + linked.get("tasks", [])
 	attachments = get_attachments("CRM Lead", name)
 
 	activities.sort(key=lambda x: x["creation"], reverse=True)
@@ -315,27 +456,47 @@ def get_lead_activities(name: str):
 	return activities, calls, notes, tasks, attachments
 
 
+ATTACHMENT_FIELDS = [
+	"name",
+	"file_name",
+	"file_type",
+	"file_url",
+	"file_size",
+	"is_private",
+	"modified",
+	"creation",
+	"owner",
+]
+
+
 def get_attachments(doctype: str, name: str):
 	return (
 		frappe.db.get_all(
 			"File",
 			filters={"attached_to_doctype": doctype, "attached_to_name": name},
-			fields=[
-				"name",
-				"file_name",
-				"file_type",
-				"file_url",
-				"file_size",
-				"is_private",
-				"modified",
-				"creation",
-				"owner",
-			],
+			fields=ATTACHMENT_FIELDS,
 		)
 		or []
 	)
 
 
+def get_attachments_by_name(doctype: str, names: list):
+	"""Files attached to each of the given documents, fetched with a single query."""
+	attachments = {}
+	if not names:
+		return attachments
+
+	files = frappe.db.get_all(
+		"File",
+		filters={"attached_to_doctype": doctype, "attached_to_name": ("in", list(set(names)))},
+		fields=[*ATTACHMENT_FIELDS, "attached_to_name"],
+	)
+	for file in files:
+		attachments.setdefault(file.pop("attached_to_name"), []).append(file)
+
+	return attachments
+
+
 def handle_multiple_versions(versions: list):
 	activities = []
 	grouped_versions = []
@@ -462,7 +623,7 @@ def get_linked_calls(name: str):
 			],
 		)
 
-	calls = [parse_call_log(call) for call in calls] if calls else []
+	calls = parse_call_logs(calls)
 
 	return {"calls": calls, "notes": notes, "tasks": tasks}
 
@@ -1,9 +1,13 @@
+import hashlib
 import json
+from collections import defaultdict
+from functools import cached_property
 
 import frappe
 from frappe import _
 from frappe.query_builder import Case, DocType
-from frappe.query_builder.functions import Avg, Coalesce, Count, Date, DateFormat, IfNull, Sum
+from frappe.query_builder.functions import Coalesce, Count, Date, DateFormat, IfNull, Sum
+from frappe.utils import add_days, cint, date_diff, flt, get_first_day, get_last_day, getdate, nowdate
 from pypika.functions import Function
 
 from crm.fcrm.doctype.crm_dashboard.crm_dashboard import create_default_manager_dashboard
@@ -16,6 +20,41 @@ class TimestampDiff(Function):
 		super().__init__("TIMESTAMPDIFF", unit, start, end, **kwargs)
 
 
+# Cached charts outlive their generation by at most this long, it also bounds staleness from
+# inputs that are not hooked, like the base currency symbol or the forecast's rolling window
+DASHBOARD_CACHE_TTL = 60 * 60
+DASHBOARD_CACHE_GENERATION_KEY = "crm_dashboard_cache_generation"
+
+# Shared scans each widget reads from, along with the extra columns it needs the scan to be
+# grouped by. "previous" widens the scan to the previous period so the widget can show a delta.
+#
+#   leads          - CRM Lead counts per creation date (from CRM Dashboard Rollup)
+#   deals          - CRM Deal counts & values per creation date (from CRM Dashboard Rollup)
+#   closed_deals   - won CRM Deals grouped by closure date
+#   forecast       - CRM Deal values per expected closure month (from CRM Dashboard Rollup)
+#   status_changes - status change counts per target status (from CRM Dashboard Rollup)
+WIDGETS = {
+	"total_leads": {"leads": {"previous"}},
+	"ongoing_deals": {"deals": {"previous", "status"}},
+	"average_ongoing_deal_value": {"deals": {"previous", "status"}},
+	"won_deals": {"closed_deals": set()},
+	"average_won_deal_value": {"closed_deals": set()},
+	"average_deal_value": {"deals": {"previous", "status"}},
+	"average_time_to_close_a_lead": {"closed_deals": {"lead"}},
+	"average_time_to_close_a_deal": {"closed_deals": set()},
+	"sales_trend": {"leads": set(), "deals": {"status"}},
+	"forecasted_revenue": {"forecast": set()},
+	"funnel_conversion": {"leads": set(), "status_changes": set()},
+	"deals_by_stage_axis": {"deals": {"status"}},
+	"deals_by_stage_donut": {"deals": {"status"}},
+	"lost_deal_reasons": {"deals": {"status", "lost_reason"}},
+	"leads_by_source": {"leads": {"source"}},
+	"deals_by_source": {"deals": {"source"}},
+	"deals_by_territory": {"deals": {"territory"}},
+	"deals_by_salesperson": {"deals": {"deal_owner"}},
+}
+
+
 @frappe.whitelist()
 def reset_to_default():
 	frappe.only_for("System Manager", True)
@@ -50,13 +89,10 @@ def get_dashboard(from_date: str | None = None, to_date: str | None = None, user
 	else:
 		layout = json.loads(frappe.db.get_value("CRM Dashboard", "Manager Dashboard", "layout") or "[]")
 
+	data = get_charts([l["name"] for l in layout], from_date, to_date, user)
+
 	for l in layout:
-		method_name = f"get_{l['name']}"
-		if hasattr(frappe.get_attr("crm.api.dashboard"), method_name):
-			method = getattr(frappe.get_attr("crm.api.dashboard"), method_name)
-			l["data"] = method(from_date, to_date, user)
-		else:
-			l["data"] = None
+		l["data"] = data.get(l["name"])
 
 	return layout
 
@@ -80,413 +116,728 @@ def get_chart(
 	if is_sales_user:
 		user = frappe.session.user
 
-	method_name = f"get_{name}"
-	if hasattr(frappe.get_attr("crm.api.dashboard"), method_name):
-		method = getattr(frappe.get_attr("crm.api.dashboard"), method_name)
-		return method(from_date, to_date, user)
-	else:
+	if name not in WIDGETS:
 		return {"error": _("Invalid chart name")}
 
+	return get_charts([name], from_date, to_date, user)[name]
 
-def get_total_leads(from_date: str | None = None, to_date: str | None = None, user: str | None = None):
+
+def get_charts(names: list[str], from_date, to_date, user: str | None = None) -> dict:
 	"""
-	Get lead count for the dashboard.
+	Get data for the given charts, serving what it can from the cache and building the rest
+	together in a single engine pass.
 	"""
-	diff = frappe.utils.date_diff(to_date, from_date)
-	if diff == 0:
-		diff = 1
+	engine = DashboardEngine(from_date, to_date, user)
+	generation = get_dashboard_cache_generation()
+	roles_hash = hashlib.md5(",".join(sorted(frappe.get_roles())).encode()).hexdigest()[:10]
 
-	prev_from_date = frappe.utils.add_days(from_date, -diff)
-	to_date_plus_one = frappe.utils.add_days(to_date, 1)
+	keys = {
+		name: "crm_dashboard_chart:{}:{}:{}:{}:{}:{}:{}".format(
+			generation, name, engine.from_date, engine.to_date, user or "", roles_hash, frappe.local.lang
+		)
+		for name in names
+		if name in WIDGETS
+	}
 
-	Lead = DocType("CRM Lead")
+	data = {}
+	for name, key in keys.items():
+		cached = frappe.cache.get_value(key)
+		if cached is not None:
+			data[name] = cached
 
-	# Build conditions for current period
-	current_cond = (Lead.creation >= from_date) & (Lead.creation < to_date_plus_one)
-	if user:
-		current_cond = current_cond & (Lead.lead_owner == user)
+	if missing := [name for name in keys if name not in data]:
+		built = engine.build(missing)
+		for name in missing:
+			frappe.cache.set_value(keys[name], built[name], expires_in_sec=DASHBOARD_CACHE_TTL)
+		data.update(built)
 
-	# Build conditions for previous period
-	prev_cond = (Lead.creation >= prev_from_date) & (Lead.creation < from_date)
-	if user:
-		prev_cond = prev_cond & (Lead.lead_owner == user)
+	return data
 
-	# Build query with CASE expressions
-	query = frappe.qb.from_(Lead).select(
-		Count(Case().when(current_cond, Lead.name).else_(None)).as_("current_month_leads"),
-		Count(Case().when(prev_cond, Lead.name).else_(None)).as_("prev_month_leads"),
-	)
 
-	result = query.run(as_dict=True)
+def get_dashboard_cache_generation() -> str:
+	generation = frappe.cache.get_value(DASHBOARD_CACHE_GENERATION_KEY)
+	if not generation:
+		generation = frappe.generate_hash(length=10)
+		frappe.cache.set_value(DASHBOARD_CACHE_GENERATION_KEY, generation)
+	return generation
 
-	current_month_leads = result[0].current_month_leads or 0
-	prev_month_leads = result[0].prev_month_leads or 0
 
-	delta_in_percentage = (
-		(current_month_leads - prev_month_leads) / prev_month_leads * 100 if prev_month_leads else 0
-	)
+def invalidate_dashboard_cache(doc=None, method=None):
+	"""
+	Start a new cache generation so every cached chart is rebuilt on next read.
 
-	return {
-		"title": _("Total leads"),
-		"tooltip": _("Total number of leads"),
-		"value": current_month_leads,
-		"delta": delta_in_percentage,
-		"deltaSuffix": "%",
-	}
+	Hooked to writes on the doctypes the dashboard reads from (CRM Status Change Log rows
+	are saved with their CRM Deal). The generation is dropped again after commit so that a
+	concurrent read cannot keep pre-commit data cached under the new generation.
+	"""
+	frappe.cache.delete_value(DASHBOARD_CACHE_GENERATION_KEY)
+	frappe.db.after_commit.add(lambda: frappe.cache.delete_value(DASHBOARD_CACHE_GENERATION_KEY))
 
 
-def get_ongoing_deals(from_date: str | None = None, to_date: str | None = None, user: str | None = None):
-	"""
-	Get ongoing deal count for the dashboard, and also calculate average deal value for ongoing deals.
+class DashboardEngine:
 	"""
-	diff = frappe.utils.date_diff(to_date, from_date)
-	if diff == 0:
-		diff = 1
+	Builds dashboard widgets from a handful of shared scans.
 
-	prev_from_date = frappe.utils.add_days(from_date, -diff)
-	to_date_plus_one = frappe.utils.add_days(to_date, 1)
-
-	Deal = DocType("CRM Deal")
-	Status = DocType("CRM Deal Status")
+	All requested widgets are planned together: every widget declares the scans it reads
+	and the columns it needs them grouped by (see `WIDGETS`). Each scan then runs once for
+	the union of those columns, and every widget is filled from the shared result sets
+	instead of running its own aggregate over the same rows.
+	"""
 
-	# Build conditions for current period
-	current_cond = (
-		(Deal.creation >= from_date)
-		& (Deal.creation < to_date_plus_one)
-		& (Status.type.notin(["Won", "Lost"]))
-	)
-	if user:
-		current_cond = current_cond & (Deal.deal_owner == user)
+	def __init__(self, from_date=None, to_date=None, user: str | None = None):
+		if not from_date or not to_date:
+			from_date = get_first_day(from_date or nowdate())
+			to_date = get_last_day(to_date or nowdate())
+
+		diff = date_diff(to_date, from_date)
+		if diff == 0:
+			diff = 1
+
+		self.from_date = getdate(from_date)
+		self.to_date = getdate(to_date)
+		self.prev_from_date = getdate(add_days(self.from_date, -diff))
+		self.to_date_plus_one = getdate(add_days(self.to_date, 1))
+		self.user = user
+		self.scans = {}
+
+	def build(self, names) -> dict:
+		"""Return a dict of widget name to widget data for every known widget in `names`."""
+		names = [name for name in names if name in WIDGETS]
+
+		plan = defaultdict(set)
+		for name in names:
+			for scan, columns in WIDGETS[name].items():
+				plan[scan] |= columns
+
+		for scan, columns in plan.items():
+			self.scans[scan] = getattr(self, f"_scan_{scan}")(columns)
+
+		return {name: getattr(self, f"_build_{name}")() for name in names}
+
+	@cached_property
+	def currency_symbol(self):
+		return get_base_currency_symbol()
+
+	def current(self, scan):
+		return [row for row in self.scans[scan] if self.from_date <= row.day <= self.to_date]
+
+	def previous(self, scan):
+		return [row for row in self.scans[scan] if self.prev_from_date <= row.day < self.from_date]
+
+	# Scans
+
+	def _scan_leads(self, columns):
+		Rollup = DocType("CRM Dashboard Rollup")
+		start = self.prev_from_date if "previous" in columns else self.from_date
+
+		query = (
+			frappe.qb.from_(Rollup)
+			.select(Rollup.date.as_("day"), Sum(Rollup.record_count).as_("count"))
+			.where(
+				(Rollup.reference_doctype == "CRM Lead")
+				& (Rollup.metric == "Created")
+				& (Rollup.date >= start)
+				& (Rollup.date <= self.to_date)
+			)
+			.groupby(Rollup.date)
+		)
 
-	# Build conditions for previous period
-	prev_cond = (
-		(Deal.creation >= prev_from_date) & (Deal.creation < from_date) & (Status.type.notin(["Won", "Lost"]))
-	)
-	if user:
-		prev_cond = prev_cond & (Deal.deal_owner == user)
+		if "source" in columns:
+			query = query.select(Rollup.source).groupby(Rollup.source)
+
+		if self.user:
+			query = query.where(Rollup.record_owner == self.user)
+
+		return with_int_counts(query.run(as_dict=True))
+
+	def _scan_deals(self, columns):
+		Rollup = DocType("CRM Dashboard Rollup")
+		Status = DocType("CRM Deal Status")
+		start = self.prev_from_date if "previous" in columns else self.from_date
+
+		query = (
+			frappe.qb.from_(Rollup)
+			.select(
+				Rollup.date.as_("day"),
+				Sum(Rollup.record_count).as_("count"),
+				Sum(Rollup.total_value).as_("value"),
+				Sum(Rollup.valued_count).as_("valued"),
+			)
+			.where(
+				(Rollup.reference_doctype == "CRM Deal")
+				& (Rollup.metric == "Created")
+				& (Rollup.date >= start)
+				& (Rollup.date <= self.to_date)
+			)
+			.groupby(Rollup.date)
+		)
 
-	# Build query with CASE expressions
-	query = (
-		frappe.qb.from_(Deal)
-		.join(Status)
-		.on(Deal.status == Status.name)
-		.select(
-			Count(Case().when(current_cond, Deal.name).else_(None)).as_("current_month_deals"),
-			Count(Case().when(prev_cond, Deal.name).else_(None)).as_("prev_month_deals"),
+		if "status" in columns:
+			# left join so that widgets not filtered on status still see every deal,
+			# `status_ref` tells the status-filtered widgets whether the join matched
+			query = (
+				query.left_join(Status)
+				.on(Rollup.status == Status.name)
+				.select(Rollup.status, Status.name.as_("status_ref"), Status.type.as_("status_type"))
+				.groupby(Rollup.status, Status.name, Status.type)
+			)
+
+		for column in ("source", "territory", "lost_reason"):
+			if column in columns:
+				query = query.select(Rollup.field(column)).groupby(Rollup.field(column))
+
+		if "deal_owner" in columns:
+			query = query.select(Rollup.record_owner.as_("deal_owner")).groupby(Rollup.record_owner)
+
+		if self.user:
+			query = query.where(Rollup.record_owner == self.user)
+
+		return with_int_counts(query.run(as_dict=True))
+
+	def _scan_closed_deals(self, columns):
+		Deal = DocType("CRM Deal")
+		Status = DocType("CRM Deal Status")
+		Lead = DocType("CRM Lead")
+		day = Date(Deal.closed_date)
+		days = frappe.qb.terms.LiteralValue("DAY")
+
+		query = (
+			frappe.qb.from_(Deal)
+			.join(Status)
+			.on(Deal.status == Status.name)
+			.select(
+				day.as_("day"),
+				Count("*").as_("count"),
+				Sum(Coalesce(Deal.deal_value, 0) * IfNull(Deal.exchange_rate, 1)).as_("value"),
+				Count(Deal.deal_value).as_("valued"),
+				Sum(TimestampDiff(days, Deal.creation, Deal.closed_date)).as_("deal_days"),
+			)
+			.where(
+				(Status.type == "Won")
+				& (Deal.closed_date >= self.prev_from_date)
+				& (Deal.closed_date < self.to_date_plus_one)
+			)
+			.groupby(day)
 		)
-	)
 
-	result = query.run(as_dict=True)
+		if "lead" in columns:
+			query = (
+				query.left_join(Lead)
+				.on(Deal.lead == Lead.name)
+				.select(
+					Sum(TimestampDiff(days, Coalesce(Lead.creation, Deal.creation), Deal.closed_date)).as_(
+						"lead_days"
+					)
+				)
+			)
 
-	current_month_deals = result[0].current_month_deals or 0
-	prev_month_deals = result[0].prev_month_deals or 0
+		if self.user:
+			query = query.where(Deal.deal_owner == self.user)
 
-	delta_in_percentage = (
-		(current_month_deals - prev_month_deals) / prev_month_deals * 100 if prev_month_deals else 0
-	)
+		return query.run(as_dict=True)
 
-	return {
-		"title": _("Ongoing deals"),
-		"tooltip": _("Total number of non won/lost deals"),
-		"value": current_month_deals,
-		"delta": delta_in_percentage,
-		"deltaSuffix": "%",
-	}
+	def _scan_forecast(self, columns):
+		Rollup = DocType("CRM Dashboard Rollup")
+		Status = DocType("CRM Deal Status")
 
+		# Calculate the date 12 months ago
+		twelve_months_ago = frappe.utils.add_months(frappe.utils.nowdate(), -12)
+		month = DateFormat(Rollup.date, "%Y-%m")
 
-def get_average_ongoing_deal_value(
-	from_date: str | None = None, to_date: str | None = None, user: str | None = None
-):
-	"""
-	Get ongoing deal count for the dashboard, and also calculate average deal value for ongoing deals.
-	"""
-	diff = frappe.utils.date_diff(to_date, from_date)
-	if diff == 0:
-		diff = 1
+		forecasted_value = (
+			Case().when(Status.type == "Lost", Rollup.expected_value).else_(Rollup.weighted_value)
+		)
+		actual_value = Case().when(Status.type == "Won", Rollup.total_value).else_(0)
+
+		query = (
+			frappe.qb.from_(Rollup)
+			.join(Status)
+			.on(Rollup.status == Status.name)
+			.select(
+				month.as_("month"),
+				Sum(forecasted_value).as_("forecasted"),
+				Sum(actual_value).as_("actual"),
+			)
+			.where(
+				(Rollup.reference_doctype == "CRM Deal")
+				& (Rollup.metric == "Expected Closure")
+				& (Rollup.date >= twelve_months_ago)
+			)
+			.groupby(month)
+			.orderby(month)
+		)
 
-	prev_from_date = frappe.utils.add_days(from_date, -diff)
-	to_date_plus_one = frappe.utils.add_days(to_date, 1)
+		if self.user:
+			query = query.where(Rollup.record_owner == self.user)
+
+		return query.run(as_dict=True)
+
+	def _scan_status_changes(self, columns):
+		Rollup = DocType("CRM Dashboard Rollup")
+		CurrentStatus = DocType("CRM Deal Status").as_("s")
+		TargetStatus = DocType("CRM Deal Status").as_("st")
+
+		query = (
+			frappe.qb.from_(Rollup)
+			.join(CurrentStatus)
+			.on(Rollup.status == CurrentStatus.name)
+			.join(TargetStatus)
+			.on(Rollup.stage == TargetStatus.name)
+			.select(Rollup.stage.as_("stage"), Sum(Rollup.record_count).as_("count"))
+			.where(
+				(Rollup.reference_doctype == "CRM Deal")
+				& (Rollup.metric == "Status Change")
+				& (CurrentStatus.type != "Lost")
+				& (Rollup.date.between(self.from_date, self.to_date))
+			)
+			.groupby(Rollup.stage, TargetStatus.position)
+			.orderby(TargetStatus.position)
+		)
 
-	Deal = DocType("CRM Deal")
-	Status = DocType("CRM Deal Status")
+		if self.user:
+			query = query.where(Rollup.record_owner == self.user)
 
-	# Build conditions for current period
-	current_cond = (
-		(Deal.creation >= from_date)
-		& (Deal.creation < to_date_plus_one)
-		& (Status.type.notin(["Won", "Lost"]))
-	)
-	if user:
-		current_cond = current_cond & (Deal.deal_owner == user)
+		return with_int_counts(query.run(as_dict=True))
 
-	# Build conditions for previous period
-	prev_cond = (
-		(Deal.creation >= prev_from_date) & (Deal.creation < from_date) & (Status.type.notin(["Won", "Lost"]))
-	)
-	if user:
-		prev_cond = prev_cond & (Deal.deal_owner == user)
+	# Number charts
 
-	# Calculate deal value with exchange rate
-	deal_value_expr = Deal.deal_value * IfNull(Deal.exchange_rate, 1)
+	def _build_total_leads(self):
+		current = sum(row.count for row in self.current("leads"))
+		previous = sum(row.count for row in self.previous("leads"))
 
-	# Build query with CASE expressions
-	query = (
-		frappe.qb.from_(Deal)
-		.join(Status)
-		.on(Deal.status == Status.name)
-		.select(
-			Avg(Case().when(current_cond, deal_value_expr).else_(None)).as_("current_month_avg_value"),
-			Avg(Case().when(prev_cond, deal_value_expr).else_(None)).as_("prev_month_avg_value"),
-		)
-	)
+		return {
+			"title": _("Total leads"),
+			"tooltip": _("Total number of leads"),
+			"value": current,
+			"delta": percentage_delta(current, previous),
+			"deltaSuffix": "%",
+		}
 
-	result = query.run(as_dict=True)
+	def _build_ongoing_deals(self):
+		current = sum(row.count for row in self.current("deals") if is_ongoing(row))
+		previous = sum(row.count for row in self.previous("deals") if is_ongoing(row))
 
-	current_month_avg_value = result[0].current_month_avg_value or 0
-	prev_month_avg_value = result[0].prev_month_avg_value or 0
+		return {
+			"title": _("Ongoing deals"),
+			"tooltip": _("Total number of non won/lost deals"),
+			"value": current,
+			"delta": percentage_delta(current, previous),
+			"deltaSuffix": "%",
+		}
 
-	avg_value_delta = current_month_avg_value - prev_month_avg_value if prev_month_avg_value else 0
+	def _build_average_ongoing_deal_value(self):
+		current = average([row for row in self.current("deals") if is_ongoing(row)], "value", "valued")
+		previous = average([row for row in self.previous("deals") if is_ongoing(row)], "value", "valued")
 
-	return {
-		"title": _("Avg. ongoing deal value"),
-		"tooltip": _("Average deal value of non won/lost deals"),
-		"value": current_month_avg_value,
-		"delta": avg_value_delta,
-		"prefix": get_base_currency_symbol(),
-	}
+		return {
+			"title": _("Avg. ongoing deal value"),
+			"tooltip": _("Average deal value of non won/lost deals"),
+			"value": current,
+			"delta": current - previous if previous else 0,
+			"prefix": self.currency_symbol,
+		}
 
+	def _build_won_deals(self):
+		current = sum(row.count for row in self.current("closed_deals"))
+		previous = sum(row.count for row in self.previous("closed_deals"))
 
-def get_won_deals(from_date: str | None = None, to_date: str | None = None, user: str | None = None):
-	"""
-	Get won deal count for the dashboard, and also calculate average deal value for won deals.
-	"""
-	diff = frappe.utils.date_diff(to_date, from_date)
-	if diff == 0:
-		diff = 1
+		return {
+			"title": _("Won deals"),
+			"tooltip": _("Total number of won deals based on its closure date"),
+			"value": current,
+			"delta": percentage_delta(current, previous),
+			"deltaSuffix": "%",
+		}
 
-	prev_from_date = frappe.utils.add_days(from_date, -diff)
-	to_date_plus_one = frappe.utils.add_days(to_date, 1)
+	def _build_average_won_deal_value(self):
+		current = average(self.current("closed_deals"), "value", "valued")
+		previous = average(self.previous("closed_deals"), "value", "valued")
 
-	Deal = DocType("CRM Deal")
-	Status = DocType("CRM Deal Status")
+		return {
+			"title": _("Avg. won deal value"),
+			"tooltip": _("Average deal value of won deals"),
+			"value": current,
+			"delta": current - previous if previous else 0,
+			"prefix": self.currency_symbol,
+		}
 
-	# Build conditions for current period
-	current_cond = (
-		(Deal.closed_date >= from_date) & (Deal.closed_date < to_date_plus_one) & (Status.type == "Won")
-	)
-	if user:
-		current_cond = current_cond & (Deal.deal_owner == user)
+	def _build_average_deal_value(self):
+		current = average([row for row in self.current("deals") if is_not_lost(row)], "value", "valued")
+		previous = average([row for row in self.previous("deals") if is_not_lost(row)], "value", "valued")
+
+		return {
+			"title": _("Avg. deal value"),
+			"tooltip": _("Average deal value of ongoing & won deals"),
+			"value": current,
+			"prefix": self.currency_symbol,
+			"delta": current - previous if previous else 0,
+			"deltaSuffix": "%",
+		}
 
-	# Build conditions for previous period
-	prev_cond = (Deal.closed_date >= prev_from_date) & (Deal.closed_date < from_date) & (Status.type == "Won")
-	if user:
-		prev_cond = prev_cond & (Deal.deal_owner == user)
+	def _build_average_time_to_close_a_lead(self):
+		current = average(self.current("closed_deals"), "lead_days", "count")
+		previous = average(self.previous("closed_deals"), "lead_days", "count")
+
+		return {
+			"title": _("Avg. time to close a lead"),
+			"tooltip": _("Average time taken from lead creation to deal closure"),
+			"value": current,
+			"suffix": " days",
+			"delta": current - previous if previous else 0,
+			"deltaSuffix": " days",
+			"negativeIsBetter": True,
+		}
 
-	# Build query with CASE expressions
-	query = (
-		frappe.qb.from_(Deal)
-		.join(Status)
-		.on(Deal.status == Status.name)
-		.select(
-			Count(Case().when(current_cond, Deal.name).else_(None)).as_("current_month_deals"),
-			Count(Case().when(prev_cond, Deal.name).else_(None)).as_("prev_month_deals"),
-		)
-	)
+	def _build_average_time_to_close_a_deal(self):
+		current = average(self.current("closed_deals"), "deal_days", "count")
+		previous = average(self.previous("closed_deals"), "deal_days", "count")
+
+		return {
+			"title": _("Avg. time to close a deal"),
+			"tooltip": _("Average time taken from deal creation to deal closure"),
+			"value": current,
+			"suffix": " days",
+			"delta": current - previous if previous else 0,
+			"deltaSuffix": " days",
+			"negativeIsBetter": True,
+		}
 
-	result = query.run(as_dict=True)
+	# Axis & donut charts
 
-	current_month_deals = result[0].current_month_deals or 0
-	prev_month_deals = result[0].prev_month_deals or 0
+	def _build_sales_trend(self):
+		trend = defaultdict(lambda: {"leads": 0, "deals": 0, "won_deals": 0})
 
-	delta_in_percentage = (
-		(current_month_deals - prev_month_deals) / prev_month_deals * 100 if prev_month_deals else 0
-	)
+		for row in self.current("leads"):
+			trend[row.day]["leads"] += row.count
 
-	return {
-		"title": _("Won deals"),
-		"tooltip": _("Total number of won deals based on its closure date"),
-		"value": current_month_deals,
-		"delta": delta_in_percentage,
-		"deltaSuffix": "%",
-	}
+		for row in self.current("deals"):
+			if row.status_ref is None:
+				continue
+			trend[row.day]["deals"] += row.count
+			if row.status_type == "Won":
+				trend[row.day]["won_deals"] += row.count
 
+		sales_trend = [{"date": day.strftime("%Y-%m-%d"), **counts} for day, counts in sorted(trend.items())]
 
-def get_average_won_deal_value(
-	from_date: str | None = None, to_date: str | None = None, user: str | None = None
-):
-	"""
-	Get won deal count for the dashboard, and also calculate average deal value for won deals.
-	"""
-	diff = frappe.utils.date_diff(to_date, from_date)
-	if diff == 0:
-		diff = 1
+		return {
+			"data": sales_trend,
+			"title": _("Sales trend"),
+			"subtitle": _("Daily performance of leads, deals, and wins"),
+			"xAxis": {
+				"title": _("Date"),
+				"key": "date",
+				"type": "time",
+				"timeGrain": "day",
+			},
+			"yAxis": {
+				"title": _("Count"),
+			},
+			"series": [
+				{"name": "leads", "type": "line", "showDataPoints": True},
+				{"name": "deals", "type": "line", "showDataPoints": True},
+				{"name": "won_deals", "type": "line", "showDataPoints": True},
+			],
+		}
 
-	prev_from_date = frappe.utils.add_days(from_date, -diff)
-	to_date_plus_one = frappe.utils.add_days(to_date, 1)
+	def _build_forecasted_revenue(self):
+		result = [frappe._dict(row) for row in self.scans["forecast"]]
+
+		for row in result:
+			row["month"] = frappe.utils.get_datetime(row["month"]).strftime("%Y-%m-01")
+			row["forecasted"] = row["forecasted"] or ""
+			row["actual"] = row["actual"] or ""
+
+		return {
+			"data": result or [],
+			"title": _("Forecasted revenue"),
+			"subtitle": _("Projected vs actual revenue based on deal probability"),
+			"xAxis": {
+				"title": _("Month"),
+				"key": "month",
+				"type": "time",
+				"timeGrain": "month",
+			},
+			"yAxis": {
+				"title": _("Revenue") + f" ({self.currency_symbol})",
+			},
+			"series": [
+				{"name": "forecasted", "type": "line", "showDataPoints": True},
+				{"name": "actual", "type": "line", "showDataPoints": True},
+			],
+		}
 
-	Deal = DocType("CRM Deal")
-	Status = DocType("CRM Deal Status")
+	def _build_funnel_conversion(self):
+		result = [{"stage": "Leads", "count": sum(row.count for row in self.current("leads"))}]
+		result += self.scans["status_changes"]
+
+		return {
+			"data": result or [],
+			"title": _("Funnel conversion"),
+			"subtitle": _("Lead to deal conversion pipeline"),
+			"xAxis": {
+				"title": _("Stage"),
+				"key": "stage",
+				"type": "category",
+			},
+			"yAxis": {
+				"title": _("Count"),
+			},
+			"swapXY": True,
+			"series": [
+				{
+					"name": "count",
+					"type": "bar",
+					"echartOptions": {
+						"colorBy": "data",
+					},
+				},
+			],
+		}
 
-	# Build conditions for current period
-	current_cond = (
-		(Deal.closed_date >= from_date) & (Deal.closed_date < to_date_plus_one) & (Status.type == "Won")
-	)
-	if user:
-		current_cond = current_cond & (Deal.deal_owner == user)
+	def _deals_by_stage(self, include):
+		stages = {}
+		for row in self.current("deals"):
+			if not include(row):
+				continue
+			stage = stages.setdefault(
+				row.status, {"stage": row.status, "count": 0, "status_type": row.status_type}
+			)
+			stage["count"] += row.count
+
+		return sorted(stages.values(), key=lambda stage: stage["count"], reverse=True)
+
+	def _build_deals_by_stage_axis(self):
+		return {
+			"data": self._deals_by_stage(is_not_lost),
+			"title": _("Deals by ongoing & won stage"),
+			"xAxis": {
+				"title": _("Stage"),
+				"key": "stage",
+				"type": "category",
+			},
+			"yAxis": {"title": _("Count")},
+			"series": [
+				{"name": "count", "type": "bar"},
+			],
+		}
 
-	# Build conditions for previous period
-	prev_cond = (Deal.closed_date >= prev_from_date) & (Deal.closed_date < from_date) & (Status.type == "Won")
-	if user:
-		prev_cond = prev_cond & (Deal.deal_owner == user)
+	def _build_deals_by_stage_donut(self):
+		return {
+			"data": self._deals_by_stage(lambda row: row.status_ref is not None),
+			"title": _("Deals by stage"),
+			"subtitle": _("Current pipeline distribution"),
+			"categoryColumn": "stage",
+			"valueColumn": "count",
+		}
 
-	# Calculate deal value with exchange rate
-	deal_value_expr = Deal.deal_value * IfNull(Deal.exchange_rate, 1)
+	def _build_lost_deal_reasons(self):
+		reasons = {}
+		for row in self.current("deals"):
+			if row.status_type != "Lost" or not row.lost_reason:
+				continue
+			reason = reasons.setdefault(row.lost_reason, {"reason": row.lost_reason, "count": 0})
+			reason["count"] += row.count
+
+		return {
+			"data": sorted(reasons.values(), key=lambda reason: reason["count"], reverse=True),
+			"title": _("Lost deal reasons"),
+			"subtitle": _("Common reasons for losing deals"),
+			"xAxis": {
+				"title": _("Reason"),
+				"key": "reason",
+				"type": "category",
+			},
+			"yAxis": {
+				"title": _("Count"),
+			},
+			"series": [
+				{"name": "count", "type": "bar"},
+			],
+		}
 
-	# Build query with CASE expressions
-	query = (
-		frappe.qb.from_(Deal)
-		.join(Status)
-		.on(Deal.status == Status.name)
-		.select(
-			Avg(Case().when(current_cond, deal_value_expr).else_(None)).as_("current_month_avg_value"),
-			Avg(Case().when(prev_cond, deal_value_expr).else_(None)).as_("prev_month_avg_value"),
-		)
-	)
+	def _count_by_source(self, scan):
+		sources = {}
+		for row in self.current(scan):
+			source = sources.setdefault(
+				row.source, {"source": "Empty" if row.source is None else row.source, "count": 0}
+			)
+			source["count"] += row.count
+
+		return sorted(sources.values(), key=lambda source: source["count"], reverse=True)
+
+	def _build_leads_by_source(self):
+		return {
+			"data": self._count_by_source("leads"),
+			"title": _("Leads by source"),
+			"subtitle": _("Lead generation channel analysis"),
+			"categoryColumn": "source",
+			"valueColumn": "count",
+		}
 
-	result = query.run(as_dict=True)
+	def _build_deals_by_source(self):
+		return {
+			"data": self._count_by_source("deals"),
+			"title": _("Deals by source"),
+			"subtitle": _("Deal generation channel analysis"),
+			"categoryColumn": "source",
+			"valueColumn": "count",
+		}
 
-	current_month_avg_value = result[0].current_month_avg_value or 0
-	prev_month_avg_value = result[0].prev_month_avg_value or 0
+	def _deals_and_value_by(self, column, label):
+		groups = {}
+		for row in self.current("deals"):
+			group = groups.setdefault(row[column], {label: row[column], "deals": 0, "value": 0})
+			group["deals"] += row.count
+			group["value"] += flt(row.value)
+
+		return groups
+
+	def _build_deals_by_territory(self):
+		territories = self._deals_and_value_by("territory", "territory")
+		for territory in territories.values():
+			if territory["territory"] is None:
+				territory["territory"] = "Empty"
+
+		return {
+			"data": sorted(territories.values(), key=lambda t: (t["deals"], t["value"]), reverse=True),
+			"title": _("Deals by territory"),
+			"subtitle": _("Geographic distribution of deals and revenue"),
+			"xAxis": {
+				"title": _("Territory"),
+				"key": "territory",
+				"type": "category",
+			},
+			"yAxis": {
+				"title": _("Number of deals"),
+			},
+			"y2Axis": {
+				"title": _("Deal value") + f" ({self.currency_symbol})",
+			},
+			"series": [
+				{"name": "deals", "type": "bar"},
+				{"name": "value", "type": "line", "showDataPoints": True, "axis": "y2"},
+			],
+		}
 
-	avg_value_delta = current_month_avg_value - prev_month_avg_value if prev_month_avg_value else 0
+	def _build_deals_by_salesperson(self):
+		salespersons = self._deals_and_value_by("deal_owner", "salesperson")
+		owners = [owner for owner in salespersons if owner]
+		full_names = (
+			dict(
+				frappe.get_all(
+					"User", filters={"name": ["in", owners]}, fields=["name", "full_name"], as_list=True
+				)
+			)
+			if owners
+			else {}
+		)
+		for owner, salesperson in salespersons.items():
+			salesperson["salesperson"] = full_names.get(owner) or owner
+
+		return {
+			"data": sorted(salespersons.values(), key=lambda s: (s["deals"], s["value"]), reverse=True),
+			"title": _("Deals by salesperson"),
+			"subtitle": _("Number of deals and total value per salesperson"),
+			"xAxis": {
+				"title": _("Salesperson"),
+				"key": "salesperson",
+				"type": "category",
+			},
+			"yAxis": {
+				"title": _("Number of deals"),
+			},
+			"y2Axis": {
+				"title": _("Deal value") + f" ({self.currency_symbol})",
+			},
+			"series": [
+				{"name": "deals", "type": "bar"},
+				{"name": "value", "type": "line", "showDataPoints": True, "axis": "y2"},
+			],
+		}
 
-	return {
-		"title": _("Avg. won deal value"),
-		"tooltip": _("Average deal value of won deals"),
-		"value": current_month_avg_value,
-		"delta": avg_value_delta,
-		"prefix": get_base_currency_symbol(),
-	}
 
+def with_int_counts(rows):
+	"""Rollup counts come back as SUM()s, hand them to the widgets as plain ints."""
+	for row in rows:
+		row.count = cint(row.count)
+	return rows
 
-def get_average_deal_value(from_date: str | None = None, to_date: str | None = None, user: str | None = None):
-	"""
-	Get average deal value for the dashboard.
-	"""
-	diff = frappe.utils.date_diff(to_date, from_date)
-	if diff == 0:
-		diff = 1
 
-	prev_from_date = frappe.utils.add_days(from_date, -diff)
-	to_date_plus_one = frappe.utils.add_days(to_date, 1)
+def is_ongoing(row):
+	return row.status_type is not None and row.status_type not in ("Won", "Lost")
 
-	Deal = DocType("CRM Deal")
-	Status = DocType("CRM Deal Status")
 
-	# Build conditions for current period
-	current_cond = (Deal.creation >= from_date) & (Deal.creation < to_date_plus_one) & (Status.type != "Lost")
-	if user:
-		current_cond = current_cond & (Deal.deal_owner == user)
+def is_not_lost(row):
+	return row.status_type is not None and row.status_type != "Lost"
 
-	# Build conditions for previous period
-	prev_cond = (Deal.creation >= prev_from_date) & (Deal.creation < from_date) & (Status.type != "Lost")
-	if user:
-		prev_cond = prev_cond & (Deal.deal_owner == user)
 
-	# Calculate deal value with exchange rate
-	deal_value_expr = Deal.deal_value * IfNull(Deal.exchange_rate, 1)
+def average(rows, total: str, count: str):
+	"""Average of `total` over `count` across pre-aggregated rows, 0 when there are none."""
+	n = sum(row[count] or 0 for row in rows)
+	return sum(flt(row[total]) for row in rows) / n if n else 0
 
-	# Build query with CASE expressions
-	query = (
-		frappe.qb.from_(Deal)
-		.join(Status)
-		.on(Deal.status == Status.name)
-		.select(
-			Avg(Case().when(current_cond, deal_value_expr).else_(None)).as_("current_month_avg"),
-			Avg(Case().when(prev_cond, deal_value_expr).else_(None)).as_("prev_month_avg"),
-		)
-	)
 
-	result = query.run(as_dict=True)
+def percentage_delta(current, previous):
+	return (current - previous) / previous * 100 if previous else 0
 
-	current_month_avg = result[0].current_month_avg or 0
-	prev_month_avg = result[0].prev_month_avg or 0
 
-	delta = current_month_avg - prev_month_avg if prev_month_avg else 0
+def get_total_leads(from_date: str | None = None, to_date: str | None = None, user: str | None = None):
+	"""
+	Get lead count for the dashboard.
+	"""
+	return DashboardEngine(from_date, to_date, user).build(["total_leads"])["total_leads"]
 
-	return {
-		"title": _("Avg. deal value"),
-		"tooltip": _("Average deal value of ongoing & won deals"),
-		"value": current_month_avg,
-		"prefix": get_base_currency_symbol(),
-		"delta": delta,
-		"deltaSuffix": "%",
-	}
 
+def get_ongoing_deals(from_date: str | None = None, to_date: str | None = None, user: str | None = None):
+	"""
+	Get ongoing deal count for the dashboard.
+	"""
+	return DashboardEngine(from_date, to_date, user).build(["ongoing_deals"])["ongoing_deals"]
 
-def get_average_time_to_close_a_lead(
+
+def get_average_ongoing_deal_value(
 	from_date: str | None = None, to_date: str | None = None, user: str | None = None
 ):
 	"""
-	Get average time to close deals for the dashboard.
+	Get average deal value of ongoing deals for the dashboard.
 	"""
-	diff = frappe.utils.date_diff(to_date, from_date)
-	if diff == 0:
-		diff = 1
+	name = "average_ongoing_deal_value"
+	return DashboardEngine(from_date, to_date, user).build([name])[name]
 
-	prev_from_date = frappe.utils.add_days(from_date, -diff)
-	to_date_plus_one = frappe.utils.add_days(to_date, 1)
-	prev_to_date = from_date
 
-	Deal = DocType("CRM Deal")
-	Status = DocType("CRM Deal Status")
-	Lead = DocType("CRM Lead")
-
-	# Base condition: closed_date is not null and status type is Won
-	base_cond = (Deal.closed_date.isnotnull()) & (Status.type == "Won")
-	if user:
-		base_cond = base_cond & (Deal.deal_owner == user)
+def get_won_deals(from_date: str | None = None, to_date: str | None = None, user: str | None = None):
+	"""
+	Get won deal count for the dashboard.
+	"""
+	return DashboardEngine(from_date, to_date, user).build(["won_deals"])["won_deals"]
 
-	# Current period condition
-	current_cond = (Deal.closed_date >= from_date) & (Deal.closed_date < to_date_plus_one)
 
-	# Previous period condition
-	prev_cond = (Deal.closed_date >= prev_from_date) & (Deal.closed_date < prev_to_date)
+def get_average_won_deal_value(
+	from_date: str | None = None, to_date: str | None = None, user: str | None = None
+):
+	"""
+	Get average deal value of won deals for the dashboard.
+	"""
+	name = "average_won_deal_value"
+	return DashboardEngine(from_date, to_date, user).build([name])[name]
 
-	# Calculate time difference from lead/deal creation to deal closure
-	time_diff = TimestampDiff(
-		frappe.qb.terms.LiteralValue("DAY"), Coalesce(Lead.creation, Deal.creation), Deal.closed_date
-	)
 
-	# Build query
-	query = (
-		frappe.qb.from_(Deal)
-		.join(Status)
-		.on(Deal.status == Status.name)
-		.left_join(Lead)
-		.on(Deal.lead == Lead.name)
-		.where(base_cond)
-		.select(
-			Avg(Case().when(current_cond, time_diff).else_(None)).as_("current_avg_lead"),
-			Avg(Case().when(prev_cond, time_diff).else_(None)).as_("prev_avg_lead"),
-		)
-	)
+def get_average_deal_value(from_date: str | None = None, to_date: str | None = None, user: str | None = None):
+	"""
+	Get average deal value for the dashboard.
+	"""
+	name = "average_deal_value"
+	return DashboardEngine(from_date, to_date, user).build([name])[name]
 
-	result = query.run(as_dict=True)
 
-	current_avg_lead = result[0].current_avg_lead or 0
-	prev_avg_lead = result[0].prev_avg_lead or 0
-	delta_lead = current_avg_lead - prev_avg_lead if prev_avg_lead else 0
-
-	return {
-		"title": _("Avg. time to close a lead"),
-		"tooltip": _("Average time taken from lead creation to deal closure"),
-		"value": current_avg_lead,
-		"suffix": " days",
-		"delta": delta_lead,
-		"deltaSuffix": " days",
-		"negativeIsBetter": True,
-	}
+def get_average_time_to_close_a_lead(
+	from_date: str | None = None, to_date: str | None = None, user: str | None = None
+):
+	"""
+	Get average time from lead creation to deal closure for the dashboard.
+	"""
+	name = "average_time_to_close_a_lead"
+	return DashboardEngine(from_date, to_date, user).build([name])[name]
 
 
 def get_average_time_to_close_a_deal(
@@ -495,61 +846,8 @@ def get_average_time_to_close_a_deal(
 	"""
 	Get average time to close deals for the dashboard.
 	"""
-	diff = frappe.utils.date_diff(to_date, from_date)
-	if diff == 0:
-		diff = 1
-
-	prev_from_date = frappe.utils.add_days(from_date, -diff)
-	to_date_plus_one = frappe.utils.add_days(to_date, 1)
-	prev_to_date = from_date
-
-	Deal = DocType("CRM Deal")
-	Status = DocType("CRM Deal Status")
-	Lead = DocType("CRM Lead")
-
-	# Base condition: closed_date is not null and status type is Won
-	base_cond = (Deal.closed_date.isnotnull()) & (Status.type == "Won")
-	if user:
-		base_cond = base_cond & (Deal.deal_owner == user)
-
-	# Current period condition
-	current_cond = (Deal.closed_date >= from_date) & (Deal.closed_date < to_date_plus_one)
-
-	# Previous period condition
-	prev_cond = (Deal.closed_date >= prev_from_date) & (Deal.closed_date < prev_to_date)
-
-	# Calculate time difference from deal creation to deal closure
-	time_diff = TimestampDiff(frappe.qb.terms.LiteralValue("DAY"), Deal.creation, Deal.closed_date)
-
-	# Build query
-	query = (
-		frappe.qb.from_(Deal)
-		.join(Status)
-		.on(Deal.status == Status.name)
-		.left_join(Lead)
-		.on(Deal.lead == Lead.name)
-		.where(base_cond)
-		.select(
-			Avg(Case().when(current_cond, time_diff).else_(None)).as_("current_avg_deal"),
-			Avg(Case().when(prev_cond, time_diff).else_(None)).as_("prev_avg_deal"),
-		)
-	)
-
-	result = query.run(as_dict=True)
-
-	current_avg_deal = result[0].current_avg_deal or 0
-	prev_avg_deal = result[0].prev_avg_deal or 0
-	delta_deal = current_avg_deal - prev_avg_deal if prev_avg_deal else 0
-
-	return {
-		"title": _("Avg. time to close a deal"),
-		"tooltip": _("Average time taken from deal creation to deal closure"),
-		"value": current_avg_deal,
-		"suffix": " days",
-		"delta": delta_deal,
-		"deltaSuffix": " days",
-		"negativeIsBetter": True,
-	}
+	name = "average_time_to_close_a_deal"
+	return DashboardEngine(from_date, to_date, user).build([name])[name]
 
 
 def get_sales_trend(from_date: str | None = None, to_date: str | None = None, user: str | None = None):
@@ -561,97 +859,7 @@ def get_sales_trend(from_date: str | None = None, to_date: str | None = None, us
 		...
 	]
 	"""
-	if not from_date or not to_date:
-		from_date = frappe.utils.get_first_day(from_date or frappe.utils.nowdate())
-		to_date = frappe.utils.get_last_day(to_date or frappe.utils.nowdate())
-
-	Lead = DocType("CRM Lead")
-	Deal = DocType("CRM Deal")
-	Status = DocType("CRM Deal Status")
-
-	# Build leads query
-	leads_query = (
-		frappe.qb.from_(Lead)
-		.select(
-			Date(Lead.creation).as_("date"),
-			Count("*").as_("leads"),
-			frappe.qb.terms.ValueWrapper(0).as_("deals"),
-			frappe.qb.terms.ValueWrapper(0).as_("won_deals"),
-		)
-		.where(Date(Lead.creation).between(from_date, to_date))
-	)
-
-	if user:
-		leads_query = leads_query.where(Lead.lead_owner == user)
-
-	leads_query = leads_query.groupby(Date(Lead.creation))
-
-	# Build deals query
-	deals_query = (
-		frappe.qb.from_(Deal)
-		.join(Status)
-		.on(Deal.status == Status.name)
-		.select(
-			Date(Deal.creation).as_("date"),
-			frappe.qb.terms.ValueWrapper(0).as_("leads"),
-			Count("*").as_("deals"),
-			Sum(Case().when(Status.type == "Won", 1).else_(0)).as_("won_deals"),
-		)
-		.where(Date(Deal.creation).between(from_date, to_date))
-	)
-
-	if user:
-		deals_query = deals_query.where(Deal.deal_owner == user)
-
-	deals_query = deals_query.groupby(Date(Deal.creation))
-
-	# Combine with UNION ALL and aggregate by date
-	union_query = leads_query.union_all(deals_query)
-
-	# Wrap in outer query to aggregate by date
-	daily = (
-		frappe.qb.from_(union_query)
-		.select(
-			DateFormat(union_query.date, "%Y-%m-%d").as_("date"),
-			Sum(union_query.leads).as_("leads"),
-			Sum(union_query.deals).as_("deals"),
-			Sum(union_query.won_deals).as_("won_deals"),
-		)
-		.groupby(union_query.date)
-		.orderby(union_query.date)
-	)
-
-	result = daily.run(as_dict=True)
-
-	sales_trend = [
-		{
-			"date": frappe.utils.get_datetime(row.date).strftime("%Y-%m-%d"),
-			"leads": row.leads or 0,
-			"deals": row.deals or 0,
-			"won_deals": row.won_deals or 0,
-		}
-		for row in result
-	]
-
-	return {
-		"data": sales_trend,
-		"title": _("Sales trend"),
-		"subtitle": _("Daily performance of leads, deals, and wins"),
-		"xAxis": {
-			"title": _("Date"),
-			"key": "date",
-			"type": "time",
-			"timeGrain": "day",
-		},
-		"yAxis": {
-			"title": _("Count"),
-		},
-		"series": [
-			{"name": "leads", "type": "line", "showDataPoints": True},
-			{"name": "deals", "type": "line", "showDataPoints": True},
-			{"name": "won_deals", "type": "line", "showDataPoints": True},
-		],
-	}
+	return DashboardEngine(from_date, to_date, user).build(["sales_trend"])["sales_trend"]
 
 
 def get_forecasted_revenue(from_date: str | None = None, to_date: str | None = None, user: str | None = None):
@@ -665,72 +873,7 @@ def get_forecasted_revenue(from_date: str | None = None, to_date: str | None = N
 		...
 	]
 	"""
-	# Using Frappe Query Builder with CASE expressions
-	CRMDeal = DocType("CRM Deal")
-	CRMDealStatus = DocType("CRM Deal Status")
-
-	# Calculate the date 12 months ago
-	twelve_months_ago = frappe.utils.add_months(frappe.utils.nowdate(), -12)
-
-	forecasted_value = (
-		Case()
-		.when(CRMDealStatus.type == "Lost", CRMDeal.expected_deal_value * IfNull(CRMDeal.exchange_rate, 1))
-		.else_(
-			CRMDeal.expected_deal_value
-			* IfNull(CRMDeal.probability, 0)
-			/ 100
-			* IfNull(CRMDeal.exchange_rate, 1)
-		)
-	)
-
-	actual_value = (
-		Case()
-		.when(CRMDealStatus.type == "Won", CRMDeal.deal_value * IfNull(CRMDeal.exchange_rate, 1))
-		.else_(0)
-	)
-
-	query = (
-		frappe.qb.from_(CRMDeal)
-		.join(CRMDealStatus)
-		.on(CRMDeal.status == CRMDealStatus.name)
-		.select(
-			DateFormat(CRMDeal.expected_closure_date, "%Y-%m").as_("month"),
-			Sum(forecasted_value).as_("forecasted"),
-			Sum(actual_value).as_("actual"),
-		)
-		.where(CRMDeal.expected_closure_date >= twelve_months_ago)
-		.groupby(DateFormat(CRMDeal.expected_closure_date, "%Y-%m"))
-		.orderby(DateFormat(CRMDeal.expected_closure_date, "%Y-%m"))
-	)
-
-	if user:
-		query = query.where(CRMDeal.deal_owner == user)
-
-	result = query.run(as_dict=True)
-
-	for row in result:
-		row["month"] = frappe.utils.get_datetime(row["month"]).strftime("%Y-%m-01")
-		row["forecasted"] = row["forecasted"] or ""
-		row["actual"] = row["actual"] or ""
-
-	return {
-		"data": result or [],
-		"title": _("Forecasted revenue"),
-		"subtitle": _("Projected vs actual revenue based on deal probability"),
-		"xAxis": {
-			"title": _("Month"),
-			"key": "month",
-			"type": "time",
-			"timeGrain": "month",
-		},
-		"yAxis": {
-			"title": _("Revenue") + f" ({get_base_currency_symbol()})",
-		},
-		"series": [
-			{"name": "forecasted", "type": "line", "showDataPoints": True},
-			{"name": "actual", "type": "line", "showDataPoints": True},
-		],
-	}
+	return DashboardEngine(from_date, to_date, user).build(["forecasted_revenue"])["forecasted_revenue"]
 
 
 def get_funnel_conversion(from_date: str | None = None, to_date: str | None = None, user: str | None = None):
@@ -745,66 +888,7 @@ def get_funnel_conversion(from_date: str | None = None, to_date: str | None = No
 		...
 	]
 	"""
-	lead_conds = ""
-	deal_conds = ""
-
-	if not from_date or not to_date:
-		from_date = frappe.utils.get_first_day(from_date or frappe.utils.nowdate())
-		to_date = frappe.utils.get_last_day(to_date or frappe.utils.nowdate())
-
-	lead_filters = {"from": from_date, "to": to_date}
-	deal_filters = {"from": from_date, "to": to_date}
-
-	if user:
-		lead_conds += " AND lead_owner = %(user)s"
-		deal_conds += " AND deal_owner = %(user)s"
-		lead_filters["user"] = user
-		deal_filters["user"] = user
-
-	result = []
-
-	# Get total leads using Query Builder
-	CRMLead = DocType("CRM Lead")
-
-	query = (
-		frappe.qb.from_(CRMLead)
-		.select(Count("*").as_("count"))
-		.where(Date(CRMLead.creation).between(from_date, to_date))
-	)
-
-	if user:
-		query = query.where(CRMLead.lead_owner == user)
-
-	total_leads = query.run(as_dict=True)
-	total_leads_count = total_leads[0].count if total_leads else 0
-
-	result.append({"stage": "Leads", "count": total_leads_count})
-
-	result += get_deal_status_change_counts(from_date, to_date, deal_conds, deal_filters)
-
-	return {
-		"data": result or [],
-		"title": _("Funnel conversion"),
-		"subtitle": _("Lead to deal conversion pipeline"),
-		"xAxis": {
-			"title": _("Stage"),
-			"key": "stage",
-			"type": "category",
-		},
-		"yAxis": {
-			"title": _("Count"),
-		},
-		"swapXY": True,
-		"series": [
-			{
-				"name": "count",
-				"type": "bar",
-				"echartOptions": {
-					"colorBy": "data",
-				},
-			},
-		],
-	}
+	return DashboardEngine(from_date, to_date, user).build(["funnel_conversion"])["funnel_conversion"]
 
 
 def get_deals_by_stage_axis(
@@ -818,42 +902,8 @@ def get_deals_by_stage_axis(
 		...
 	]
 	"""
-	if not from_date or not to_date:
-		from_date = frappe.utils.get_first_day(from_date or frappe.utils.nowdate())
-		to_date = frappe.utils.get_last_day(to_date or frappe.utils.nowdate())
-
-	# Using Frappe Query Builder with NOT IN clause
-	CRMDeal = DocType("CRM Deal")
-	CRMDealStatus = DocType("CRM Deal Status")
-
-	query = (
-		frappe.qb.from_(CRMDeal)
-		.join(CRMDealStatus)
-		.on(CRMDeal.status == CRMDealStatus.name)
-		.select(CRMDeal.status.as_("stage"), Count("*").as_("count"), CRMDealStatus.type.as_("status_type"))
-		.where((Date(CRMDeal.creation).between(from_date, to_date)) & (CRMDealStatus.type.notin(["Lost"])))
-		.groupby(CRMDeal.status)
-		.orderby(Count("*"), order=frappe.qb.desc)
-	)
-
-	if user:
-		query = query.where(CRMDeal.deal_owner == user)
-
-	result = query.run(as_dict=True)
-
-	return {
-		"data": result or [],
-		"title": _("Deals by ongoing & won stage"),
-		"xAxis": {
-			"title": _("Stage"),
-			"key": "stage",
-			"type": "category",
-		},
-		"yAxis": {"title": _("Count")},
-		"series": [
-			{"name": "count", "type": "bar"},
-		],
-	}
+	name = "deals_by_stage_axis"
+	return DashboardEngine(from_date, to_date, user).build([name])[name]
 
 
 def get_deals_by_stage_donut(
@@ -867,36 +917,8 @@ def get_deals_by_stage_donut(
 		...
 	]
 	"""
-	if not from_date or not to_date:
-		from_date = frappe.utils.get_first_day(from_date or frappe.utils.nowdate())
-		to_date = frappe.utils.get_last_day(to_date or frappe.utils.nowdate())
-
-	# Using Frappe Query Builder with JOIN
-	CRMDeal = DocType("CRM Deal")
-	CRMDealStatus = DocType("CRM Deal Status")
-
-	query = (
-		frappe.qb.from_(CRMDeal)
-		.join(CRMDealStatus)
-		.on(CRMDeal.status == CRMDealStatus.name)
-		.select(CRMDeal.status.as_("stage"), Count("*").as_("count"), CRMDealStatus.type.as_("status_type"))
-		.where(Date(CRMDeal.creation).between(from_date, to_date))
-		.groupby(CRMDeal.status)
-		.orderby(Count("*"), order=frappe.qb.desc)
-	)
-
-	if user:
-		query = query.where(CRMDeal.deal_owner == user)
-
-	result = query.run(as_dict=True)
-
-	return {
-		"data": result or [],
-		"title": _("Deals by stage"),
-		"subtitle": _("Current pipeline distribution"),
-		"categoryColumn": "stage",
-		"valueColumn": "count",
-	}
+	name = "deals_by_stage_donut"
+	return DashboardEngine(from_date, to_date, user).build([name])[name]
 
 
 def get_lost_deal_reasons(from_date: str | None = None, to_date: str | None = None, user: str | None = None):
@@ -908,46 +930,7 @@ def get_lost_deal_reasons(from_date: str | None = None, to_date: str | None = No
 		...
 	]
 	"""
-	if not from_date or not to_date:
-		from_date = frappe.utils.get_first_day(from_date or frappe.utils.nowdate())
-		to_date = frappe.utils.get_last_day(to_date or frappe.utils.nowdate())
-
-	# Using Frappe Query Builder with JOIN
-	CRMDeal = DocType("CRM Deal")
-	CRMDealStatus = DocType("CRM Deal Status")
-
-	query = (
-		frappe.qb.from_(CRMDeal)
-		.join(CRMDealStatus)
-		.on(CRMDeal.status == CRMDealStatus.name)
-		.select(CRMDeal.lost_reason.as_("reason"), Count("*").as_("count"))
-		.where((Date(CRMDeal.creation).between(from_date, to_date)) & (CRMDealStatus.type == "Lost"))
-		.groupby(CRMDeal.lost_reason)
-		.having((CRMDeal.lost_reason.isnotnull()) & (CRMDeal.lost_reason != ""))
-		.orderby(Count("*"), order=frappe.qb.desc)
-	)
-
-	if user:
-		query = query.where(CRMDeal.deal_owner == user)
-
-	result = query.run(as_dict=True)
-
-	return {
-		"data": result or [],
-		"title": _("Lost deal reasons"),
-		"subtitle": _("Common reasons for losing deals"),
-		"xAxis": {
-			"title": _("Reason"),
-			"key": "reason",
-			"type": "category",
-		},
-		"yAxis": {
-			"title": _("Count"),
-		},
-		"series": [
-			{"name": "count", "type": "bar"},
-		],
-	}
+	return DashboardEngine(from_date, to_date, user).build(["lost_deal_reasons"])["lost_deal_reasons"]
 
 
 def get_leads_by_source(from_date: str | None = None, to_date: str | None = None, user: str | None = None):
@@ -959,33 +942,7 @@ def get_leads_by_source(from_date: str | None = None, to_date: str | None = None
 		...
 	]
 	"""
-	if not from_date or not to_date:
-		from_date = frappe.utils.get_first_day(from_date or frappe.utils.nowdate())
-		to_date = frappe.utils.get_last_day(to_date or frappe.utils.nowdate())
-
-	# Using Frappe Query Builder (safer, more maintainable)
-	CRMLead = DocType("CRM Lead")
-
-	query = (
-		frappe.qb.from_(CRMLead)
-		.select(IfNull(CRMLead.source, "Empty").as_("source"), Count("*").as_("count"))
-		.where(Date(CRMLead.creation).between(from_date, to_date))
-		.groupby(CRMLead.source)
-		.orderby(Count("*"), order=frappe.qb.desc)
-	)
-
-	if user:
-		query = query.where(CRMLead.lead_owner == user)
-
-	result = query.run(as_dict=True)
-
-	return {
-		"data": result or [],
-		"title": _("Leads by source"),
-		"subtitle": _("Lead generation channel analysis"),
-		"categoryColumn": "source",
-		"valueColumn": "count",
-	}
+	return DashboardEngine(from_date, to_date, user).build(["leads_by_source"])["leads_by_source"]
 
 
 def get_deals_by_source(from_date: str | None = None, to_date: str | None = None, user: str | None = None):
@@ -997,33 +954,7 @@ def get_deals_by_source(from_date: str | None = None, to_date: str | None = None
 		...
 	]
 	"""
-	if not from_date or not to_date:
-		from_date = frappe.utils.get_first_day(from_date or frappe.utils.nowdate())
-		to_date = frappe.utils.get_last_day(to_date or frappe.utils.nowdate())
-
-	# Using Frappe Query Builder
-	CRMDeal = DocType("CRM Deal")
-
-	query = (
-		frappe.qb.from_(CRMDeal)
-		.select(IfNull(CRMDeal.source, "Empty").as_("source"), Count("*").as_("count"))
-		.where(Date(CRMDeal.creation).between(from_date, to_date))
-		.groupby(CRMDeal.source)
-		.orderby(Count("*"), order=frappe.qb.desc)
-	)
-
-	if user:
-		query = query.where(CRMDeal.deal_owner == user)
-
-	result = query.run(as_dict=True)
-
-	return {
-		"data": result or [],
-		"title": _("Deals by source"),
-		"subtitle": _("Deal generation channel analysis"),
-		"categoryColumn": "source",
-		"valueColumn": "count",
-	}
+	return DashboardEngine(from_date, to_date, user).build(["deals_by_source"])["deals_by_source"]
 
 
 def get_deals_by_territory(from_date: str | None = None, to_date: str | None = None, user: str | None = None):
@@ -1035,53 +966,7 @@ def get_deals_by_territory(from_date: str | None = None, to_date: str | None = N
 		...
 	]
 	"""
-	if not from_date or not to_date:
-		from_date = frappe.utils.get_first_day(from_date or frappe.utils.nowdate())
-		to_date = frappe.utils.get_last_day(to_date or frappe.utils.nowdate())
-
-	# Using Frappe Query Builder with complex aggregations
-	CRMDeal = DocType("CRM Deal")
-
-	query = (
-		frappe.qb.from_(CRMDeal)
-		.select(
-			IfNull(CRMDeal.territory, "Empty").as_("territory"),
-			Count("*").as_("deals"),
-			Sum(Coalesce(CRMDeal.deal_value, 0) * IfNull(CRMDeal.exchange_rate, 1)).as_("value"),
-		)
-		.where(Date(CRMDeal.creation).between(from_date, to_date))
-		.groupby(CRMDeal.territory)
-		.orderby(Count("*"), order=frappe.qb.desc)
-		.orderby(
-			Sum(Coalesce(CRMDeal.deal_value, 0) * IfNull(CRMDeal.exchange_rate, 1)), order=frappe.qb.desc
-		)
-	)
-
-	if user:
-		query = query.where(CRMDeal.deal_owner == user)
-
-	result = query.run(as_dict=True)
-
-	return {
-		"data": result or [],
-		"title": _("Deals by territory"),
-		"subtitle": _("Geographic distribution of deals and revenue"),
-		"xAxis": {
-			"title": _("Territory"),
-			"key": "territory",
-			"type": "category",
-		},
-		"yAxis": {
-			"title": _("Number of deals"),
-		},
-		"y2Axis": {
-			"title": _("Deal value") + f" ({get_base_currency_symbol()})",
-		},
-		"series": [
-			{"name": "deals", "type": "bar"},
-			{"name": "value", "type": "line", "showDataPoints": True, "axis": "y2"},
-		],
-	}
+	return DashboardEngine(from_date, to_date, user).build(["deals_by_territory"])["deals_by_territory"]
 
 
 def get_deals_by_salesperson(
@@ -1095,56 +980,8 @@ def get_deals_by_salesperson(
 		...
 	]
 	"""
-	if not from_date or not to_date:
-		from_date = frappe.utils.get_first_day(from_date or frappe.utils.nowdate())
-		to_date = frappe.utils.get_last_day(to_date or frappe.utils.nowdate())
-
-	# Using Frappe Query Builder with LEFT JOIN
-	CRMDeal = DocType("CRM Deal")
-	User = DocType("User")
-
-	query = (
-		frappe.qb.from_(CRMDeal)
-		.left_join(User)
-		.on(User.name == CRMDeal.deal_owner)
-		.select(
-			IfNull(User.full_name, CRMDeal.deal_owner).as_("salesperson"),
-			Count("*").as_("deals"),
-			Sum(Coalesce(CRMDeal.deal_value, 0) * IfNull(CRMDeal.exchange_rate, 1)).as_("value"),
-		)
-		.where(Date(CRMDeal.creation).between(from_date, to_date))
-		.groupby(CRMDeal.deal_owner)
-		.orderby(Count("*"), order=frappe.qb.desc)
-		.orderby(
-			Sum(Coalesce(CRMDeal.deal_value, 0) * IfNull(CRMDeal.exchange_rate, 1)), order=frappe.qb.desc
-		)
-	)
-
-	if user:
-		query = query.where(CRMDeal.deal_owner == user)
-
-	result = query.run(as_dict=True)
-
-	return {
-		"data": result or [],
-		"title": _("Deals by salesperson"),
-		"subtitle": _("Number of deals and total value per salesperson"),
-		"xAxis": {
-			"title": _("Salesperson"),
-			"key": "salesperson",
-			"type": "category",
-		},
-		"yAxis": {
-			"title": _("Number of deals"),
-		},
-		"y2Axis": {
-			"title": _("Deal value") + f" ({get_base_currency_symbol()})",
-		},
-		"series": [
-			{"name": "deals", "type": "bar"},
-			{"name": "value", "type": "line", "showDataPoints": True, "axis": "y2"},
-		],
-	}
+	name = "deals_by_salesperson"
+	return DashboardEngine(from_date, to_date, user).build([name])[name]
 
 
 def get_base_currency_symbol():
@@ -1,19 +1,31 @@
+import base64
+import copy
+import hashlib
 import json
+import re
+import time
 
 import frappe
 from frappe import _
 from frappe.custom.doctype.property_setter.property_setter import make_property_setter
 from frappe.desk.form.assign_to import set_status
-from frappe.model import no_value_fields
+from frappe.desk.reportview import get_match_cond
+from frappe.model import default_fields, no_value_fields
 from frappe.model.delete_doc import get_dynamic_linked_docs, get_linked_docs
 from frappe.model.document import get_controller
-from frappe.utils import make_filter_tuple
+from frappe.utils import cint, make_filter_tuple
 from pypika import Criterion
 
-from crm.api.views import get_views
+from crm.api.views import get_view_config_generation, get_views
 from crm.fcrm.doctype.crm_form_script.crm_form_script import get_form_script
 from crm.utils import is_frappe_version
 
+LIST_COUNT_CACHE_TTL = 60
+# Cached counts younger than this are served without a background recount
+LIST_COUNT_REFRESH_AFTER = 10
+VIEW_CONFIG_CACHE_TTL = 3600
+LIST_COUNT_EVENT = "crm_list_count"
+
 COUNT_NAME = (
 	{"COUNT": "name", "as": "total_count"}
 	if is_frappe_version("16", above=True)
@@ -268,8 +280,12 @@ def get_data(
 	kanban_fields: str | list | None = None,
 	view: str | dict | None = None,
 	default_filters: dict | None = None,
+	cursor: str | None = None,
+	use_cursor: bool = False,
+	estimate_count: bool = False,
 ):
 	custom_view = False
+	next_cursor = None
 	filters = frappe._dict(filters)
 	rows = frappe.parse_json(rows or "[]")
 	columns = frappe.parse_json(columns or "[]")
@@ -298,11 +314,8 @@ def get_data(
 
 	is_default = True
 	data = []
-	_list = get_controller(doctype)
-	default_rows = []
-	if hasattr(_list, "default_list_data"):
-		default_rows = _list.default_list_data().get("rows")
-
+	config = get_view_config(doctype, view_type)
+	default_rows = config.default_rows
 	meta = frappe.get_meta(doctype)
 
 	if view_type != "kanban":
@@ -321,21 +334,13 @@ def get_data(
 		if not rows:
 			rows = ["name"]
 
-		default_view_filters = {
-			"dt": doctype,
-			"type": view_type or "list",
-			"is_standard": 1,
-			"user": frappe.session.user,
-		}
-
-		if not custom_view and frappe.db.exists("CRM View Settings", default_view_filters):
-			list_view_settings = frappe.get_doc("CRM View Settings", default_view_filters)
-			columns = frappe.parse_json(list_view_settings.columns)
-			rows = frappe.parse_json(list_view_settings.rows)
+		if not custom_view and config.standard_view:
+			columns = config.standard_view.columns
+			rows = config.standard_view.rows
 			is_default = False
-		elif not custom_view or (is_default and hasattr(_list, "default_list_data")):
+		elif not custom_view or (is_default and config.has_default_list_data):
 			rows = default_rows
-			columns = _list.default_list_data().get("columns")
+			columns = config.default_columns
 
 		# check if rows has all keys from columns if not add them
 		for column in columns:
@@ -355,16 +360,20 @@ def get_data(
 		if group_by_field and group_by_field not in rows:
 			rows.append(group_by_field)
 
-		data = (
-			frappe.get_list(
-				doctype,
-				fields=rows,
-				filters=filters,
-				order_by=order_by,
-				page_length=page_length,
+		keyset_order = get_window_order(doctype, order_by) if use_cursor or cursor else None
+		if keyset_order:
+			data, next_cursor = get_keyset_page(doctype, rows, filters, keyset_order, page_length, cursor)
+		else:
+			data = (
+				frappe.get_list(
+					doctype,
+					fields=rows,
+					filters=filters,
+					order_by=order_by,
+					page_length=page_length,
+				)
+				or []
 			)
-			or []
-		)
 		data = parse_list_data(data, doctype)
 
 	if view_type == "kanban":
@@ -372,7 +381,7 @@ def get_data(
 			rows = default_rows
 
 		if not kanban_columns and column_field:
-			field_meta = frappe.get_meta(doctype).get_field(column_field)
+			field_meta = meta.get_field(column_field)
 			if field_meta.fieldtype == "Link":
 				kanban_columns = frappe.get_all(
 					field_meta.options,
@@ -383,23 +392,26 @@ def get_data(
 				kanban_columns = [{"name": option} for option in field_meta.options.split("\n")]
 
 		if not title_field:
-			title_field = "name"
-			if hasattr(_list, "default_kanban_settings"):
-				title_field = _list.default_kanban_settings().get("title_field")
+			title_field = config.kanban_title_field
 
 		if title_field not in rows:
 			rows.append(title_field)
 
 		if not kanban_fields:
-			kanban_fields = ["name"]
-			if hasattr(_list, "default_kanban_settings"):
-				kanban_fields = json.loads(_list.default_kanban_settings().get("kanban_fields"))
+			kanban_fields = config.kanban_fields
 
 		for field in kanban_fields:
 			if field not in rows:
 				rows.append(field)
 
+		grouped_data = get_grouped_kanban_data(doctype, rows, filters, order_by, column_field, kanban_columns)
+
 		for kc in kanban_columns:
+			if kc.get("name") in grouped_data:
+				column_data = grouped_data[kc.get("name")]
+				data.append({"column": kc, "fields": kanban_fields, "data": column_data})
+				continue
+
 			# Start with base filters
 			column_filters = []
 
@@ -448,43 +460,17 @@ def get_data(
 
 			data.append({"column": kc, "fields": kanban_fields, "data": column_data})
 
-	fields = frappe.get_meta(doctype).fields
-	fields = [field for field in fields if field.fieldtype not in no_value_fields]
-	fields = [
-		{
-			"label": _(field.label),
-			"fieldtype": field.fieldtype,
-			"fieldname": field.fieldname,
-			"options": field.options,
-		}
-		for field in fields
-		if field.label and field.fieldname
-	]
-
-	std_fields = [
-		{"label": "Name", "fieldtype": "Data", "fieldname": "name"},
-		{"label": "Created On", "fieldtype": "Datetime", "fieldname": "creation"},
-		{"label": "Last Modified", "fieldtype": "Datetime", "fieldname": "modified"},
-		{
-			"label": "Modified By",
-			"fieldtype": "Link",
-			"fieldname": "modified_by",
-			"options": "User",
-		},
-		{"label": "Assigned To", "fieldtype": "Text", "fieldname": "_assign"},
-		{"label": "Owner", "fieldtype": "Link", "fieldname": "owner", "options": "User"},
-		{"label": "Like", "fieldtype": "Data", "fieldname": "_liked_by"},
-	]
-
-	for field in std_fields:
-		if field.get("fieldname") not in rows:
-			rows.append(field.get("fieldname"))
-		if field not in fields:
-			field["label"] = _(field["label"])
-			fields.append(field)
+	fields = config.fields
+	for fieldname in config.std_fieldnames:
+		if fieldname not in rows:
+			rows.append(fieldname)
 
 	if not is_default and custom_view_name:
-		is_default = frappe.db.get_value("CRM View Settings", custom_view_name, "load_default_columns")
+		saved_view = next((v for v in config.views if v.name == custom_view_name), None)
+		if saved_view:
+			is_default = saved_view.load_default_columns
+		else:
+			is_default = frappe.db.get_value("CRM View Settings", custom_view_name, "load_default_columns")
 
 	if group_by_field and view_type == "group_by":
 
@@ -533,15 +519,172 @@ def get_data(
 		"page_length": page_length,
 		"page_length_count": page_length_count,
 		"is_default": is_default,
-		"views": get_views(doctype),
-		"total_count": frappe.get_list(doctype, filters=filters, fields=[COUNT_NAME])[0].total_count,
+		"views": config.views,
+		**get_total_count(doctype, filters, estimate_count),
 		"row_count": len(data),
-		"form_script": get_form_script(doctype),
-		"list_script": get_form_script(doctype, "List"),
+		"cursor": next_cursor,
+		"form_script": config.form_script,
+		"list_script": config.list_script,
 		"view_type": view_type,
 	}
 
 
+def get_view_config(doctype, view_type=None):
+	"""
+	Return the parts of a list view that don't depend on the request: default and saved
+	columns/rows, kanban defaults, the field list, views and form scripts.
+
+	Cached per doctype, view type, user and language until a CRM View Settings, CRM Form
+	Script or DocType change starts a new cache generation. Callers get their own copy.
+	"""
+	key = ":".join(
+		[
+			"crm_view_config",
+			get_view_config_generation(),
+			doctype,
+			view_type or "list",
+			frappe.session.user,
+			frappe.local.lang or "",
+		]
+	)
+	config = frappe.cache.get_value(key)
+	if config is None:
+		config = build_view_config(doctype, view_type)
+		frappe.cache.set_value(key, config, expires_in_sec=VIEW_CONFIG_CACHE_TTL)
+
+	return copy.deepcopy(config)
+
+
+def build_view_config(doctype, view_type=None):
+	_list = get_controller(doctype)
+	default_list_data = _list.default_list_data() if hasattr(_list, "default_list_data") else {}
+	kanban_settings = _list.default_kanban_settings() if hasattr(_list, "default_kanban_settings") else {}
+
+	standard_view = frappe.db.get_value(
+		"CRM View Settings",
+		{"dt": doctype, "type": view_type or "list", "is_standard": 1, "user": frappe.session.user},
+		["columns", "rows"],
+		as_dict=True,
+	)
+	if standard_view:
+		standard_view.columns = frappe.parse_json(standard_view.columns)
+		standard_view.rows = frappe.parse_json(standard_view.rows)
+
+	fields = frappe.get_meta(doctype).fields
+	fields = [field for field in fields if field.fieldtype not in no_value_fields]
+	fields = [
+		{
+			"label": _(field.label),
+			"fieldtype": field.fieldtype,
+			"fieldname": field.fieldname,
+			"options": field.options,
+		}
+		for field in fields
+		if field.label and field.fieldname
+	]
+
+	std_fields = [
+		{"label": "Name", "fieldtype": "Data", "fieldname": "name"},
+		{"label": "Created On", "fieldtype": "Datetime", "fieldname": "creation"},
+		{"label": "Last Modified", "fieldtype": "Datetime", "fieldname": "modified"},
+		{
+			"label": "Modified By",
+			"fieldtype": "Link",
+			"fieldname": "modified_by",
+			"options": "User",
+		},
+		{"label": "Assigned To", "fieldtype": "Text", "fieldname": "_assign"},
+		{"label": "Owner", "fieldtype": "Link", "fieldname": "owner", "options": "User"},
+		{"label": "Like", "fieldtype": "Data", "fieldname": "_liked_by"},
+	]
+
+	for field in std_fields:
+		if field not in fields:
+			field["label"] = _(field["label"])
+			fields.append(field)
+
+	return frappe._dict(
+		has_default_list_data=hasattr(_list, "default_list_data"),
+		default_columns=default_list_data.get("columns"),
+		default_rows=default_list_data.get("rows") or [],
+		kanban_title_field=kanban_settings.get("title_field") if kanban_settings else "name",
+		kanban_fields=json.loads(kanban_settings.get("kanban_fields")) if kanban_settings else ["name"],
+		standard_view=standard_view,
+		fields=fields,
+		std_fieldnames=[field["fieldname"] for field in std_fields],
+		views=get_views(doctype),
+		form_script=get_form_script(doctype),
+		list_script=get_form_script(doctype, "List"),
+	)
+
+
+def get_total_count(doctype, filters, estimate=False):
+	"""
+	Return `total_count` for a list, and with `estimate` whether it is an estimate.
+
+	With `estimate`, a count cached for the same filters and user within the last
+	`LIST_COUNT_CACHE_TTL` seconds is returned, or the table statistics when there are no
+	filters and the user's permissions don't restrict the list. Once that count is older
+	than `LIST_COUNT_REFRESH_AFTER` seconds, the exact count is computed in the background
+	and pushed to the user as a `crm_list_count` realtime event carrying the returned
+	`count_key`.
+	"""
+	if not estimate:
+		return {"total_count": count_records(doctype, filters)}
+
+	key = get_list_count_key(doctype, filters)
+	cached = frappe.cache.get_value(key)
+	if cached:
+		total_count, counted_at = cached["total_count"], cached["counted_at"]
+	elif not filters and not get_match_cond(doctype):
+		# table statistics count every record, so only for users who may read all of them
+		total_count, counted_at = frappe.db.estimate_count(doctype), 0
+	else:
+		total_count = cache_list_count(doctype, filters, key)
+		return {"total_count": total_count, "total_count_estimated": False, "count_key": key}
+
+	if time.time() - counted_at > LIST_COUNT_REFRESH_AFTER:
+		frappe.enqueue(
+			"crm.api.doc.refresh_list_count",
+			queue="short",
+			job_id=f"crm-list-count-{key}",
+			deduplicate=True,
+			doctype=doctype,
+			filters=filters,
+			key=key,
+		)
+	return {"total_count": total_count, "total_count_estimated": True, "count_key": key}
+
+
+def refresh_list_count(doctype, filters, key):
+	"""Background job: cache the exact count of a list and push it to the user."""
+	total_count = cache_list_count(doctype, filters, key)
+	frappe.publish_realtime(
+		LIST_COUNT_EVENT,
+		{"doctype": doctype, "count_key": key, "total_count": total_count},
+		user=frappe.session.user,
+	)
+
+
+def cache_list_count(doctype, filters, key):
+	total_count = count_records(doctype, filters)
+	frappe.cache.set_value(
+		key,
+		{"total_count": total_count, "counted_at": time.time()},
+		expires_in_sec=LIST_COUNT_CACHE_TTL,
+	)
+	return total_count
+
+
+def count_records(doctype, filters):
+	return frappe.get_list(doctype, filters=filters, fields=[COUNT_NAME])[0].total_count
+
+
+def get_list_count_key(doctype, filters):
+	filters_hash = hashlib.md5(frappe.as_json(filters, indent=None).encode()).hexdigest()
+	return f"crm_list_count:{doctype}:{frappe.session.user}:{filters_hash}"
+
+
 def parse_list_data(data, doctype):
 	_list = get_controller(doctype)
 	if hasattr(_list, "parse_list_data"):
@@ -587,6 +730,173 @@ def get_records_based_on_order(doctype, rows, filters, page_length, order):
 	return records
 
 
+def get_grouped_kanban_data(doctype, rows, filters, order_by, column_field, kanban_columns):
+	"""
+	Fetch the first page and the total count of every kanban column at once: one
+	`GROUP BY column_field` count query and one windowed query ranking rows within each
+	column, instead of a page query plus a count query per column.
+
+	Columns with a manual card order or marked for deletion are left out, as are all
+	columns when the sort order can't be expressed as a window ordering. Returns a dict of
+	column name to rows and sets `all_count` and `count` on the grouped columns.
+	"""
+	columns = [kc for kc in kanban_columns if kc.get("name") and not kc.get("order") and not kc.get("delete")]
+	window_order = get_window_order(doctype, order_by)
+	if not column_field or not columns or not window_order or not is_valid_column(doctype, column_field):
+		return {}
+
+	column_filters = convert_filter_to_tuple(doctype, filters) if filters else []
+	column_filters = [*column_filters, [doctype, column_field, "in", [kc.get("name") for kc in columns]]]
+
+	counts = frappe.get_list(
+		doctype,
+		filters=column_filters,
+		fields=[column_field, COUNT_NAME],
+		group_by=column_field,
+		order_by=None,
+		limit_page_length=0,
+	)
+	counts = {d.get(column_field): d.total_count for d in counts}
+
+	page_length = max(cint(kc.get("page_length", 20)) for kc in columns)
+	order_fields = [field for field, direction in window_order]
+	fields = list(dict.fromkeys([*rows, "name", column_field, *order_fields]))
+	query = frappe.get_list(
+		doctype, fields=fields, filters=column_filters, order_by=None, limit_page_length=0, run=0
+	)
+	# the permitted, filtered list query is ranked per column in a derived table
+	query = query if isinstance(query, str) else query.get_sql()
+	order = ", ".join(f"_kanban.`{field}` {direction}" for field, direction in window_order)
+
+	records = frappe.db.sql(
+		f"""
+		select * from (
+			select _kanban.*, row_number() over (
+				partition by _kanban.`{column_field}` order by {order}
+			) as _kanban_rank
+			from ({query}) _kanban
+		) _ranked
+		where _kanban_rank <= {int(page_length)}
+		order by _kanban_rank
+		""",
+		as_dict=True,
+	)
+
+	data = {kc.get("name"): [] for kc in columns}
+	for record in records:
+		column = data.get(record.get(column_field))
+		if column is not None:
+			column.append(frappe._dict({field: record.get(field) for field in rows}))
+
+	for kc in columns:
+		column_data = data[kc.get("name")][: cint(kc.get("page_length", 20))]
+		data[kc.get("name")] = column_data
+		kc["all_count"] = counts.get(kc.get("name"), 0)
+		kc["count"] = len(column_data)
+
+	return data
+
+
+def get_window_order(doctype, order_by):
+	"""Parse `order_by` into (fieldname, direction) pairs, None if it isn't plain field sorting."""
+	order = []
+	for part in (order_by or "modified desc").split(","):
+		match = re.fullmatch(r"\s*(?:`?tab[\w ]+`?\.)?`?(\w+)`?(?:\s+(asc|desc))?\s*", part, re.IGNORECASE)
+		if not match or not is_valid_column(doctype, match.group(1)):
+			return None
+		order.append((match.group(1), (match.group(2) or "asc").lower()))
+
+	if "name" not in [field for field, direction in order]:
+		# tie-breaker so pages are stable
+		order.append(("name", order[-1][1]))
+
+	return order
+
+
+def get_keyset_page(doctype, rows, filters, order, page_length, cursor=None):
+	"""
+	Fetch the page of records following `cursor` in the given (fieldname, direction) order.
+
+	Seeks past the last record of the previous page instead of re-reading every earlier
+	row with a growing limit. Returns the records and the cursor of the next page, None
+	when there are no more records.
+	"""
+	page_length = cint(page_length) or 20
+	order_fields = [field for field, direction in order]
+	fields = list(dict.fromkeys([*rows, *order_fields]))
+
+	query = frappe.get_list(
+		doctype, fields=fields, filters=filters, order_by=None, limit_page_length=0, run=0
+	)
+	query = query if isinstance(query, str) else query.get_sql()
+	condition = get_keyset_condition(order, decode_cursor(cursor, order)) if cursor else "1 = 1"
+	sort = ", ".join(f"_page.`{field}` {direction}" for field, direction in order)
+
+	records = frappe.db.sql(
+		f"""
+		select * from ({query}) _page
+		where {condition}
+		order by {sort}
+		limit {page_length + 1}
+		""",
+		as_dict=True,
+	)
+
+	next_cursor = None
+	if len(records) > page_length:
+		records = records[:page_length]
+		next_cursor = encode_cursor(order, [records[-1].get(field) for field in order_fields])
+
+	return [frappe._dict({field: record.get(field) for field in rows}) for record in records], next_cursor
+
+
+def get_keyset_condition(order, values):
+	"""
+	SQL condition matching the rows sorted after `values` in `order`, i.e. a row comparison
+	with per-column directions. NULLs sort first, as they do in MariaDB.
+	"""
+	condition = None
+	for (field, direction), value in reversed(list(zip(order, values, strict=True))):
+		column = f"_page.`{field}`"
+		if value is None:
+			after = f"{column} is not null" if direction == "asc" else "0 = 1"
+			same = f"{column} is null"
+		else:
+			value = frappe.db.escape(str(value))
+			after = (
+				f"{column} > {value}" if direction == "asc" else f"({column} < {value} or {column} is null)"
+			)
+			same = f"{column} = {value}"
+
+		condition = after if condition is None else f"({after} or ({same} and {condition}))"
+
+	return condition
+
+
+def encode_cursor(order, values):
+	payload = json.dumps({"order": order, "values": values}, default=str, separators=(",", ":"))
+	return base64.urlsafe_b64encode(payload.encode()).decode()
+
+
+def decode_cursor(cursor, order):
+	"""Return the sort key values stored in `cursor`, which must have been issued for `order`."""
+	try:
+		payload = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+		values = payload["values"]
+		valid = [list(d) for d in payload["order"]] == [list(d) for d in order] and len(values) == len(order)
+	except (ValueError, TypeError, KeyError, AttributeError):
+		valid = False
+
+	if not valid:
+		frappe.throw(_("Invalid cursor, reload the list"), frappe.ValidationError)
+
+	return values
+
+
+def is_valid_column(doctype, fieldname):
+	return fieldname in default_fields or frappe.get_meta(doctype).has_field(fieldname)
+
+
 @frappe.whitelist()
 def remove_assignments(doctype: str, name: str, assignees: str | list, ignore_permissions: bool = False):
 	assignees = frappe.parse_json(assignees)
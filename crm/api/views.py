@@ -1,6 +1,8 @@
 import frappe
 from pypika import Criterion
 
+VIEW_CONFIG_GENERATION_KEY = "crm_view_config_generation"
+
 
 @frappe.whitelist()
 def get_views(doctype: str):
@@ -14,3 +16,17 @@ def get_views(doctype: str):
 		query = query.where(View.dt == doctype)
 	views = query.run(as_dict=True)
 	return views
+
+
+def get_view_config_generation() -> str:
+	generation = frappe.cache.get_value(VIEW_CONFIG_GENERATION_KEY)
+	if not generation:
+		generation = frappe.generate_hash(length=10)
+		frappe.cache.set_value(VIEW_CONFIG_GENERATION_KEY, generation)
+	return generation
+
+
+def invalidate_view_config_cache(doc=None, method=None):
+	"""Start a new view config cache generation, now and again once the transaction commits."""
+	frappe.cache.delete_value(VIEW_CONFIG_GENERATION_KEY)
+	frappe.db.after_commit.add(lambda: frappe.cache.delete_value(VIEW_CONFIG_GENERATION_KEY))
@@ -1,8 +1,9 @@
 # Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and contributors
 # For license information, please see license.txt
 
-"""Whitelisted entry points: ``enrich`` (enqueue full run) and ``enrich_preview``
-(bounded, fast, synchronous prefill).
+"""Whitelisted entry points: ``enrich`` (enqueue full run), ``enrich_bulk`` (enqueue a
+backfill of every record matching a filter) and ``enrich_preview`` (bounded, fast,
+synchronous prefill).
 
 Both are type-annotated -- hooks.py sets ``require_type_annotated_api_methods``.
 Security: enrich enforces the doctype allow-list (from Settings) + a ``write``
@@ -17,6 +18,7 @@ import frappe
 from frappe import _
 from frappe.rate_limiter import rate_limit
 
+from .bulk import enqueue_bulk_enrichment
 from .config import ENABLE_FLAG_BY_DOCTYPE, EnrichmentConfig, get_config
 from .mapper import get_value_for_source_key
 from .pipeline import preview as run_preview
@@ -93,6 +95,33 @@ def retry(run: str) -> dict:
 	return _enqueue_run(cfg, run_doc.reference_doctype, run_doc.reference_name, website)
 
 
+@frappe.whitelist()
+@rate_limit(limit=ENRICH_RATE_LIMIT, seconds=60)
+def enrich_bulk(reference_doctype: str, filters: dict | list | None = None) -> dict:
+	"""Enqueue one background backfill of every ``reference_doctype`` record matching
+	``filters`` (the desk list's "Enrich from Website" action). Records sharing a
+	domain share one crawl -- see ``bulk.run_bulk_enrichment``.
+
+	Requires ``write`` on the doctype; records the user cannot write are skipped with
+	a Failed run. Throws while a backfill of the doctype is already running. Returns
+	``{queued: bool, job_id: str, count: int}``.
+	"""
+	cfg = get_config()
+	if reference_doctype not in _enabled_doctypes(cfg):
+		frappe.throw(
+			_("Enrichment is not enabled for {0}.").format(reference_doctype),
+			frappe.ValidationError,
+		)
+
+	if not frappe.has_permission(reference_doctype, ptype="write"):
+		frappe.throw(
+			_("You are not permitted to update {0}.").format(reference_doctype),
+			frappe.PermissionError,
+		)
+
+	return enqueue_bulk_enrichment(reference_doctype, filters, frappe.session.user)
+
+
 @frappe.whitelist()
 @rate_limit(limit=ENRICH_RATE_LIMIT, seconds=60)
 def enrich_preview(website: str, doctype: str = "CRM Deal") -> dict:
@@ -0,0 +1,212 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and contributors
+# For license information, please see license.txt
+
+"""Bulk enrichment: backfill every record matching a filter in one background job.
+
+Per-record enrichment (``tasks.run_enrichment``) builds the config, a session and a
+crawl for each record. A backfill of thousands of records instead:
+
+* builds the config once for the whole job,
+* groups the records by registrable domain, so each site is crawled once and the
+  result is mapped onto every record on that domain,
+* crawls ``bulk_concurrency`` domains in parallel -- each crawl keeps its own
+  ``crawl_concurrency`` connection budget, and a domain is only ever crawled by one
+  worker, so the per-host politeness budget of a single run holds, and
+* writes the Run history of every batch with one insert, commits, and reports
+  progress over realtime once per batch.
+
+Crawls run in worker threads and never touch the database; mapping, saving and the
+Run writes happen on the job's own thread.
+"""
+
+from __future__ import annotations
+
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+import frappe
+from frappe import _
+from frappe.utils.background_jobs import is_job_enqueued
+
+from crm.api.doc import count_records
+
+from .config import _setting, get_config, get_settings
+from .crawler import registrable_domain
+from .mapper import apply_to_document
+from .pipeline import _normalize_website
+from .pipeline import run as run_pipeline
+from .tasks import run_values, write_runs
+
+# Realtime event carrying the per-batch progress of a bulk run.
+BULK_PROGRESS_EVENT = "domain_enrichment_bulk_progress"
+
+# Domains per batch: each batch is one commit, one Run insert and one progress event.
+BULK_BATCH_SIZE = 50
+
+# Upper bound on domains crawled at once, whatever Settings asks for.
+MAX_BULK_CONCURRENCY = 32
+
+
+def bulk_concurrency(value) -> int:
+	"""The ``bulk_concurrency`` setting clamped to ``1..MAX_BULK_CONCURRENCY``."""
+	try:
+		concurrency = int(value or 1)
+	except (TypeError, ValueError):
+		concurrency = 1
+	return max(1, min(concurrency, MAX_BULK_CONCURRENCY))
+
+
+def enqueue_bulk_enrichment(reference_doctype: str, filters, user: str) -> dict:
+	"""Enqueue one ``run_bulk_enrichment`` job per doctype (long queue, ``job_id`` +
+	``deduplicate``); throws while a backfill of the same doctype is queued or running.
+	The timeout allows one full crawl per matching record, spread over the parallel
+	crawls -- an upper bound, since records sharing a domain share a crawl.
+	"""
+	job_id = f"domain-enrich-bulk-{reference_doctype}"
+	if is_job_enqueued(job_id):
+		frappe.throw(
+			_("A backfill of {0} is already running. Try again once it completes.").format(
+				_(reference_doctype)
+			),
+			title=_("Backfill Already Running"),
+		)
+
+	count = count_records(reference_doctype, filters)
+	s = get_settings()
+	per_crawl = int(_setting(s, "request_timeout")) * int(_setting(s, "max_pages")) + 60
+	rounds = -(-count // bulk_concurrency(_setting(s, "bulk_concurrency")))
+	frappe.enqueue(
+		"crm.domain_enrichment.bulk.run_bulk_enrichment",
+		queue="long",
+		timeout=per_crawl * max(rounds, 1) + 300,
+		job_id=job_id,
+		deduplicate=True,
+		reference_doctype=reference_doctype,
+		filters=filters,
+		user=user,
+	)
+	return {"queued": True, "job_id": job_id, "count": count}
+
+
+def group_by_domain(records) -> tuple[dict, list]:
+	"""Split ``(name, website)`` records into ``{domain: (website, [names])}`` plus the
+	records whose website is not a crawlable URL. The first website seen for a domain
+	is the one crawled."""
+	groups = {}
+	invalid = []
+	for name, website in records:
+		try:
+			url = _normalize_website(website)
+		except ValueError:
+			invalid.append((name, website))
+			continue
+		domain = registrable_domain(urlparse(url).netloc)
+		groups.setdefault(domain, (url, []))[1].append(name)
+	return groups, invalid
+
+
+def _crawl(website, cfg):
+	"""Worker-thread body: ``(result, error)``; never raises, never touches the DB."""
+	try:
+		return run_pipeline(website, cfg=cfg), ""
+	except Exception:
+		return None, traceback.format_exc()
+
+
+def run_bulk_enrichment(reference_doctype: str, filters=None, user: str | None = None):
+	"""Enqueued worker: enrich every ``reference_doctype`` record matching ``filters``.
+
+	Records are read with the triggering user's permissions (``execute_job`` runs as
+	them) and saved permission-respecting, exactly like ``tasks.run_enrichment``. A
+	record that fails to map or save gets a Failed Run; the rest of its batch goes on.
+	"""
+	user = user or frappe.session.user
+	cfg = get_config()
+
+	records = frappe.get_list(
+		reference_doctype,
+		filters=filters,
+		fields=["name", "website"],
+		order_by="creation asc",
+	)
+	groups, invalid = group_by_domain((r.name, r.website) for r in records if (r.website or "").strip())
+	total = len(invalid) + sum(len(names) for _website, names in groups.values())
+	progress = {"done": len(invalid), "completed": 0, "failed": len(invalid)}
+
+	if invalid:
+		now = frappe.utils.now_datetime()
+		write_runs(
+			[
+				run_values(
+					reference_doctype, name, website, "Failed", started_on=now, notes="invalid website URL"
+				)
+				for name, website in invalid
+			]
+		)
+		frappe.db.commit()
+
+	domains = list(groups)
+	with ThreadPoolExecutor(max_workers=bulk_concurrency(cfg.setting("bulk_concurrency"))) as pool:
+		for start in range(0, len(domains), BULK_BATCH_SIZE):
+			batch = domains[start : start + BULK_BATCH_SIZE]
+			started_on = frappe.utils.now_datetime()
+			crawled = pool.map(lambda domain: _crawl(groups[domain][0], cfg), batch)
+
+			runs = []
+			for domain, (result, error) in zip(batch, crawled, strict=True):
+				website, names = groups[domain]
+				for name in names:
+					runs.append(_apply(reference_doctype, name, website, result, error, cfg, started_on))
+
+			write_runs(runs)
+			frappe.db.commit()
+
+			progress["done"] += len(runs)
+			progress["completed"] += sum(run["status"] == "Completed" for run in runs)
+			progress["failed"] += sum(run["status"] == "Failed" for run in runs)
+			_publish_progress(reference_doctype, total, progress, user)
+
+	_publish_progress(reference_doctype, total, progress, user, status="completed")
+
+
+def _apply(reference_doctype, name, website, result, error, cfg, started_on) -> dict:
+	"""Map a domain's crawl onto one record; returns the record's Run values."""
+	if result is None:
+		return run_values(
+			reference_doctype, name, website, "Failed", started_on=started_on, notes=error[:1000]
+		)
+
+	# Only this record's partial writes are undone -- earlier records of the batch
+	# are not committed yet.
+	frappe.db.savepoint("bulk_enrichment_record")
+	try:
+		doc = frappe.get_doc(reference_doctype, name)
+		doc.check_permission("write")
+		if apply_to_document(doc, result, cfg):
+			doc.save()
+	except Exception:
+		frappe.db.rollback(save_point="bulk_enrichment_record")
+		frappe.log_error(title="Domain Enrichment: bulk enrichment failed for a record")
+		return run_values(
+			reference_doctype,
+			name,
+			website,
+			"Failed",
+			started_on=started_on,
+			notes=frappe.utils.cstr(frappe.get_traceback())[:1000],
+		)
+
+	return run_values(reference_doctype, name, website, "Completed", result=result, started_on=started_on)
+
+
+def _publish_progress(reference_doctype, total, progress, user, status="running"):
+	"""Best-effort realtime progress for the whole bulk run."""
+	try:
+		frappe.publish_realtime(
+			BULK_PROGRESS_EVENT,
+			{"reference_doctype": reference_doctype, "total": total, "status": status, **progress},
+			user=user,
+		)
+	except Exception:
+		pass
@@ -0,0 +1,122 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and contributors
+# For license information, please see license.txt
+
+"""Per-site cache of fetched pages, shared by every worker through Redis.
+
+A Lead, a Deal and an Organization on the same website, a preview followed by the
+full run, or a retry shortly after a run all fetch the same pages. ``http.fetch``
+consults this cache first (when ``cfg.fetch_cache`` is set), so those pages are
+downloaded once per ``fetch_cache_ttl``.
+
+Each entry holds the status, final URL, content type, the charset-decoded body and
+the response validators (``ETag`` / ``Last-Modified``), compressed. An entry is fresh
+for ``fetch_cache_ttl`` seconds after it was fetched; after that it is kept for up to
+``REVALIDATE_WINDOW`` so a later run can revalidate it with a conditional request
+and reuse the stored body on a 304. The cache as a whole is capped at
+``fetch_cache_size`` MB: once over it, the least recently used entries are evicted.
+Every Redis call is best-effort -- a cache failure is a miss, never a failed fetch.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import time
+import zlib
+
+import frappe
+
+FETCH_CACHE_KEY = "crm_enrichment_fetch"
+# How long a stale entry is kept for conditional revalidation (re-enrichments, retries).
+REVALIDATE_WINDOW = 30 * 24 * 3600
+
+
+class FetchCache:
+	"""Built on the request/job thread, then safe to use from crawler worker threads:
+	the site-scoped key prefix is resolved up front and only plain Redis commands run
+	afterwards."""
+
+	def __init__(self, ttl: int, max_bytes: int):
+		self.ttl = ttl
+		self.max_bytes = max_bytes
+		# Redis lifetime of an entry: fresh for ``ttl``, then revalidatable.
+		self.lifetime = max(ttl, REVALIDATE_WINDOW)
+		self.redis = frappe.cache
+		prefix = frappe.cache.make_key(FETCH_CACHE_KEY)
+		self.page_prefix = f"{prefix}|page|"
+		# member -> last access time; the eviction order
+		self.lru_key = f"{prefix}|lru"
+		# member -> compressed entry size
+		self.sizes_key = f"{prefix}|sizes"
+		self.total_key = f"{prefix}|bytes"
+
+	def get(self, url: str) -> dict | None:
+		member = _member(url)
+		try:
+			payload = self.redis.get(self.page_prefix + member)
+			if payload is None:
+				return None
+			self.redis.zadd(self.lru_key, {member: time.time()})
+			return json.loads(zlib.decompress(payload))
+		except Exception:
+			return None
+
+	def is_fresh(self, entry: dict) -> bool:
+		"""Servable without asking the server: fetched (or revalidated) within ``ttl``."""
+		return time.time() - entry.get("fetched_on", 0) < self.ttl
+
+	def set(self, url: str, entry: dict) -> None:
+		member = _member(url)
+		try:
+			payload = zlib.compress(json.dumps({**entry, "fetched_on": time.time()}).encode())
+			if len(payload) > self.max_bytes:
+				return
+
+			pipe = self.redis.pipeline()
+			pipe.set(self.page_prefix + member, payload, ex=self.lifetime)
+			pipe.zadd(self.lru_key, {member: time.time()})
+			pipe.hget(self.sizes_key, member)
+			pipe.hset(self.sizes_key, member, len(payload))
+			previous = pipe.execute()[2]
+			self.redis.incrby(self.total_key, len(payload) - int(previous or 0))
+
+			self._evict()
+		except Exception:
+			pass
+
+	def _evict(self):
+		# Not accessed for a whole lifetime means written before that: already expired.
+		self._drop(self.redis.zrangebyscore(self.lru_key, 0, time.time() - self.lifetime))
+
+		while int(self.redis.get(self.total_key) or 0) > self.max_bytes:
+			oldest = self.redis.zrange(self.lru_key, 0, 0)
+			if not oldest:
+				self.redis.delete(self.total_key)
+				break
+			self._drop(oldest)
+
+	def _drop(self, members):
+		if not members:
+			return
+		members = [m.decode() if isinstance(m, bytes) else m for m in members]
+		sizes = self.redis.hmget(self.sizes_key, members)
+
+		pipe = self.redis.pipeline()
+		pipe.delete(*(self.page_prefix + member for member in members))
+		pipe.zrem(self.lru_key, *members)
+		pipe.hdel(self.sizes_key, *members)
+		pipe.decrby(self.total_key, sum(int(size or 0) for size in sizes))
+		pipe.execute()
+
+
+def _member(url: str) -> str:
+	return hashlib.sha1(url.encode()).hexdigest()
+
+
+def build_fetch_cache(cfg) -> FetchCache | None:
+	"""The cache for one enrichment config, or ``None`` when disabled (TTL or size of 0)."""
+	ttl = int(cfg.setting("fetch_cache_ttl") or 0)
+	size_mb = int(cfg.setting("fetch_cache_size") or 0)
+	if ttl <= 0 or size_mb <= 0:
+		return None
+	return FetchCache(ttl, size_mb * 1024 * 1024)
@@ -4,18 +4,22 @@
 """Loads enrichment configuration (Settings + Rules + Field Mappings) from the desk.
 
 The engine is rule-agnostic: it loads admin-edited config here and executes it.
-``get_config()`` assembles an ``EnrichmentConfig`` from the config doctypes on demand
-(not cached -- see the note on ``get_config``). Hot paths that only need the Settings
-toggles use ``get_settings`` / ``auto_enrich_enabled_for`` instead of the full build.
+``get_config()`` assembles an ``EnrichmentConfig`` from the config doctypes and keeps
+it in memory until the config changes (see ``config_version``). Hot paths that only
+need the Settings toggles use ``get_settings`` / ``auto_enrich_enabled_for`` instead.
 """
 
 from __future__ import annotations
 
 import re
+from collections import Counter
 from dataclasses import dataclass, field
+from functools import lru_cache
 
 import frappe
 
+from .cache import build_fetch_cache
+
 # DocType -> the Settings checkbox that enables enrichment for it. Single source of
 # truth shared by the manual (api) and auto-enrich (tasks) paths.
 ENABLE_FLAG_BY_DOCTYPE = {
@@ -25,6 +29,18 @@ ENABLE_FLAG_BY_DOCTYPE = {
 }
 
 
+# Tables ``get_config`` reads besides the Settings Single; any write to them changes
+# ``config_version``.
+CONFIG_TABLES = (
+	"CRM Enrichment Rule",
+	"CRM Enrichment Rule Pattern",
+	"CRM Enrichment Field Mapping",
+	"CRM Enrichment Link Priority",
+	"CRM Enrichment Skip Pattern",
+	"CRM Enrichment Domain",
+)
+CONFIG_GENERATION_KEY = "crm_enrichment_config_generation"
+
 # Sensible fallbacks applied when the Single doctype has not been saved yet (the
 # JSON field defaults only populate a freshly-created row, which may not exist).
 DEFAULT_SETTINGS = {
@@ -39,6 +55,10 @@ DEFAULT_SETTINGS = {
 	"request_timeout": 10,
 	"max_download_bytes": 3_000_000,
 	"retry_count": 2,
+	"crawl_concurrency": 4,
+	"bulk_concurrency": 8,
+	"fetch_cache_ttl": 21600,
+	"fetch_cache_size": 256,
 	"user_agent": (
 		"Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
 		"(KHTML, like Gecko) Chrome/125.0.0.0 Safari/537.36"
@@ -101,7 +121,9 @@ class Rule:
 
 	``patterns`` is a list of (compiled_regex, raw_pattern) tuples. Substring
 	patterns (is_regex=0) are compiled as escaped, case-insensitive regexes so the
-	executors can use one uniform match path.
+	executors can use one uniform match path. The same patterns are also split into
+	``keywords`` (raw is_regex=0 patterns) and ``regexes`` (compiled is_regex=1
+	patterns) for ``KeywordMatcher``, which scans all keywords of many rules at once.
 	"""
 
 	rule_type: str
@@ -110,6 +132,8 @@ class Rule:
 	weight: float = 1.0
 	match_scope: str = "Full Text"
 	patterns: list = field(default_factory=list)
+	keywords: list = field(default_factory=list)
+	regexes: list = field(default_factory=list)
 
 	@property
 	def label(self) -> str:
@@ -124,6 +148,89 @@ class Rule:
 		return sum(len(rx.findall(text)) for rx, _raw in self.patterns)
 
 
+class KeywordMatcher:
+	"""Counts the hits of many rules in one text, scanning it once for all their
+	keyword (is_regex=0) patterns instead of once per pattern per rule.
+
+	Keywords share a trie; one combined regex (``\\b`` followed by the trie as a
+	nested alternation) finds every position where some keyword can start, and the
+	trie walk from there yields each keyword matching at that position -- so
+	overlapping keywords ("ai", "ai platform") are all counted, as before. Every hit
+	is confirmed with the keyword's own ``\\bkeyword\\b`` regex, and each keyword's
+	hits stay non-overlapping, so ``counts`` equals per-rule ``Rule.matches``.
+	Regex patterns keep their own ``findall``.
+	"""
+
+	def __init__(self, rules: list):
+		self.rules = rules
+		owners: dict = {}  # lowercase keyword -> {rule index: times listed}
+		self._regexes = []  # (rule index, compiled regex)
+		for index, rule in enumerate(rules):
+			for keyword, times in Counter(k.lower() for k in rule.keywords).items():
+				owners.setdefault(keyword, {})[index] = times
+			self._regexes.extend((index, rx) for rx in rule.regexes)
+		self._owners = owners
+		self._scan, self._trie, self._longest = _keyword_index(tuple(sorted(owners)))
+
+	def counts(self, text: str) -> list:
+		"""Hits per rule, in ``rules`` order."""
+		hits = [0] * len(self.rules)
+		if not text:
+			return hits
+		for index, rx in self._regexes:
+			hits[index] += len(rx.findall(text))
+		if self._scan is None:
+			return hits
+
+		next_start = {}  # keyword -> end of its last hit
+		for start in (m.start() for m in self._scan.finditer(text)):
+			node = self._trie
+			for char in text[start : start + self._longest]:
+				node = node.get(char.lower())
+				if node is None:
+					break
+				keyword = node.get(None)
+				if keyword is None or start < next_start.get(keyword, 0):
+					continue
+				match = _keyword_regex(keyword).match(text, start)
+				if match:
+					next_start[keyword] = match.end()
+					for index, times in self._owners[keyword].items():
+						hits[index] += times
+		return hits
+
+
+@lru_cache(maxsize=64)
+def _keyword_index(keywords: tuple) -> tuple:
+	"""``(scan regex, trie, longest keyword)`` for a set of lowercase keywords,
+	built once per distinct rule set. Trie nodes map a lowercased character to the
+	next node; ``node[None]`` is the keyword ending there."""
+	if not keywords:
+		return None, {}, 0
+
+	trie: dict = {}
+	for keyword in keywords:
+		node = trie
+		for char in keyword:
+			node = node.setdefault(char, {})
+		node[None] = keyword
+
+	def alternation(node):
+		# A keyword ends here: enough for a candidate position, the walk does the rest.
+		if None in node:
+			return ""
+		branches = [re.escape(char) + alternation(child) for char, child in node.items() if char is not None]
+		return branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})"
+
+	scan = re.compile(rf"\b(?={alternation(trie)})", re.IGNORECASE)
+	return scan, trie, max(len(keyword) for keyword in keywords)
+
+
+@lru_cache(maxsize=1024)
+def _keyword_regex(keyword: str):
+	return re.compile(rf"\b{re.escape(keyword)}\b", re.IGNORECASE)
+
+
 @dataclass
 class Mapping:
 	source_key: str
@@ -143,6 +250,7 @@ class EnrichmentConfig:
 	skip_patterns: list = field(default_factory=list)  # list[str]
 	allowed_domains: list = field(default_factory=list)
 	blocked_domains: list = field(default_factory=list)
+	fetch_cache: object = None  # cache.FetchCache, or None when page caching is off
 
 	# Convenience accessors with fallbacks --------------------------------- #
 	def setting(self, key, default=None):
@@ -178,11 +286,15 @@ def _build_rules() -> dict:
 	names = frappe.get_all("CRM Enrichment Rule", filters={"enabled": 1}, pluck="name")
 	for name in names:
 		doc = frappe.get_doc("CRM Enrichment Rule", name)
-		compiled = []
+		compiled, keywords, regexes = [], [], []
 		for pat in doc.patterns or []:
 			rx = _compile_pattern(pat.pattern, pat.is_regex)
 			if rx is not None:
 				compiled.append((rx, pat.pattern))
+				if pat.is_regex:
+					regexes.append(rx)
+				else:
+					keywords.append(pat.pattern)
 		if not compiled:
 			continue
 		rule = Rule(
@@ -192,6 +304,8 @@ def _build_rules() -> dict:
 			weight=doc.weight or 1.0,
 			match_scope=doc.match_scope or "Full Text",
 			patterns=compiled,
+			keywords=keywords,
+			regexes=regexes,
 		)
 		rules_by_type.setdefault(doc.rule_type, []).append(rule)
 	return rules_by_type
@@ -232,7 +346,9 @@ def _build_settings(settings_doc) -> dict:
 
 
 def _build_config() -> EnrichmentConfig:
-	settings_doc = frappe.get_cached_doc("CRM Enrichment Settings")
+	# Uncached read: a Settings write made through frappe.db must not be served from
+	# the document cache right after config_version saw it.
+	settings_doc = frappe.get_single("CRM Enrichment Settings")
 
 	link_priority = [
 		(kw.keyword.lower(), kw.weight or 1.0)
@@ -245,7 +361,7 @@ def _build_config() -> EnrichmentConfig:
 	allowed_domains = [d.domain.lower().strip() for d in (settings_doc.allowed_domains or []) if d.domain]
 	blocked_domains = [d.domain.lower().strip() for d in (settings_doc.blocked_domains or []) if d.domain]
 
-	return EnrichmentConfig(
+	cfg = EnrichmentConfig(
 		settings=_build_settings(settings_doc),
 		rules_by_type=_build_rules(),
 		mappings_by_doctype=_build_mappings(),
@@ -254,17 +370,60 @@ def _build_config() -> EnrichmentConfig:
 		allowed_domains=allowed_domains,
 		blocked_domains=blocked_domains,
 	)
+	cfg.fetch_cache = build_fetch_cache(cfg)
+	return cfg
+
+
+# site -> (config_version(), EnrichmentConfig), per worker process.
+_config_cache: dict = {}
 
 
 def get_config() -> EnrichmentConfig:
-	"""Assemble the full enrichment config (Settings + Rules + Field Mappings) fresh.
-
-	Deliberately NOT cached. It is built at most a couple of times per enrichment run,
-	and a run is a multi-second, network-bound crawl -- so the handful of small queries
-	here is noise. A cache, by contrast, buys nothing measurable and adds a real
-	stale-config surface (any write that bypasses ``on_update`` -- a bulk ``db_set``,
-	direct SQL -- would serve stale rules until a restart). The per-insert hot path does
-	NOT call this; it uses ``auto_enrich_enabled_for`` (Settings-only). Do not re-add a
-	cache here without a measured hot-path caller that justifies it.
+	"""The full enrichment config (Settings + Rules + Field Mappings).
+
+	Built once per worker process and reused until ``config_version`` changes, so
+	``enrich``, ``retry``, ``enrich_preview`` and the enqueued runs pay two small
+	version queries instead of a ``get_doc`` per Rule and a recompile of every pattern.
+	The returned config is shared: treat it as read-only (``dataclasses.replace`` it to
+	override settings, as ``pipeline.preview`` does).
 	"""
-	return _build_config()
+	version = config_version()
+	cached = _config_cache.get(frappe.local.site)
+	if cached and cached[0] == version:
+		return cached[1]
+
+	cfg = _build_config()
+	_config_cache[frappe.local.site] = (version, cfg)
+	return cfg
+
+
+def config_version() -> tuple:
+	"""Changes with every write to the config doctypes: the Settings ``modified`` plus
+	``(max(modified), count)`` of each of ``CONFIG_TABLES``.
+
+	Derived from the rows themselves rather than bumped by ``on_update`` hooks, so
+	writes through ``frappe.db`` (``set_value``, ``delete``, ``bulk_insert``) count as
+	well as document saves, and uncommitted writes of another transaction never do.
+	A write that leaves ``modified`` alone (raw SQL) must call ``clear_config_cache``.
+	"""
+	settings_modified = frappe.db.sql(
+		"select value from `tabSingles` where doctype = %s and field = 'modified'",
+		"CRM Enrichment Settings",
+	)
+	tables = frappe.db.sql(
+		" union all ".join(f"select max(modified), count(*) from `tab{dt}`" for dt in CONFIG_TABLES)
+	)
+	return _config_generation(), tuple(map(tuple, settings_modified)), tuple(map(tuple, tables))
+
+
+def _config_generation() -> str:
+	generation = frappe.cache.get_value(CONFIG_GENERATION_KEY)
+	if not generation:
+		generation = frappe.generate_hash(length=10)
+		frappe.cache.set_value(CONFIG_GENERATION_KEY, generation)
+	return generation
+
+
+def clear_config_cache():
+	"""Make every worker rebuild the config on its next ``get_config``."""
+	frappe.cache.delete_value(CONFIG_GENERATION_KEY)
@@ -1,27 +1,30 @@
 # Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and contributors
 # For license information, please see license.txt
 
-"""Same-domain, depth-limited BFS crawler. Caps, priorities and skip-patterns
-come from config (Settings child tables), not module constants.
+"""Same-domain, depth-limited BFS crawler. Caps, priorities, skip-patterns and the
+per-crawl connection budget come from config (Settings child tables), not module
+constants.
 
 Exposes:
-    crawl()           -> ranked list of (CrawledPage, soup) tuples, homepage first
-    crawl_page()      -> fetch + parse a single page into a CrawledPage
-    extract_content() -> pull title/headings/visible text from soup
+    crawl()      -> ranked list of (CrawledPage, ParsedPage) tuples, homepage first
+    crawl_page() -> fetch + parse (once, see ``document.parse_page``) a single page
 """
 
 from __future__ import annotations
 
+import heapq
 import re
 from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from functools import lru_cache
+from itertools import count
 from urllib.parse import urldefrag, urljoin, urlparse
 from urllib.robotparser import RobotFileParser
 from xml.etree import ElementTree as ET
 
 import tldextract
-from bs4 import BeautifulSoup
 
+from .document import parse_page
 from .http import build_session, fetch
 from .result import CrawledPage
 
@@ -50,6 +53,9 @@ SKIP_EXTENSIONS = (
 	".rss",
 )
 SKIP_SCHEMES = ("mailto:", "tel:", "javascript:", "data:", "#")
+# Upper bound on parallel fetches per crawl -- requests' default per-host pool size,
+# so concurrent fetches reuse pooled connections instead of discarding them.
+MAX_CRAWL_CONCURRENCY = 10
 
 
 def normalize_url(url: str) -> str:
@@ -126,30 +132,9 @@ def _is_crawlable(url: str, skip_patterns: list) -> bool:
 	return True
 
 
-def extract_content(soup: BeautifulSoup) -> dict:
-	"""Mutates ``soup`` (decomposes script/style) -- pass a throwaway copy if the
-	caller needs the original DOM afterwards."""
-	title = ""
-	if soup.title and soup.title.string:
-		title = soup.title.string.strip()
-
-	headings = []
-	for tag in soup.find_all(["h1", "h2", "h3"]):
-		txt = tag.get_text(" ", strip=True)
-		if txt:
-			headings.append(txt)
-
-	for node in soup(["script", "style", "noscript", "template", "svg"]):
-		node.decompose()
-	text = soup.get_text(" ", strip=True)
-	text = " ".join(text.split())
-
-	return {"title": title, "headings": headings, "text": text}
-
-
-def _links_on_page(soup, page_url, base_netloc, skip_patterns):
-	for a in soup.find_all("a", href=True):
-		href = a["href"].strip()
+def _links_on_page(parsed, page_url, base_netloc, skip_patterns):
+	for href, anchor in parsed.links:
+		href = href.strip()
 		if not href or any(href.lower().startswith(s) for s in SKIP_SCHEMES):
 			continue
 		absolute = normalize_url(urljoin(page_url, href))
@@ -157,25 +142,20 @@ def _links_on_page(soup, page_url, base_netloc, skip_patterns):
 			continue
 		if not same_site(absolute, base_netloc):
 			continue
-		yield absolute, a.get_text(" ", strip=True)
+		yield absolute, anchor
 
 
-def _parse_and_fill(page, html):
-	"""``extract_content`` runs on a throwaway parse so the returned soup stays unmutated."""
-	soup = BeautifulSoup(html, "html.parser")
-	content = extract_content(BeautifulSoup(html, "html.parser"))
-	page.title = content["title"]
-	page.headings = content["headings"]
-	page.text = content["text"]
-	return soup
-
-
-def crawl_page(url, cfg, session=None):
-	status, html, error, final_url = fetch(url, cfg, session=session)
+def crawl_page(url, cfg, session=None, head_only=False):
+	status, html, error, final_url = fetch(url, cfg, session=session, head_only=head_only)
 	# Resolved URL: links and provenance match the host that actually served the body.
 	page = CrawledPage(url=final_url or url, status_code=status, html=html or "", error=error)
-	soup = _parse_and_fill(page, html) if (html and not error) else None
-	return page, soup
+	if not html or error:
+		return page, None
+	parsed = parse_page(html)
+	page.title = parsed.title
+	page.headings = parsed.headings
+	page.text = parsed.text
+	return page, parsed
 
 
 ABOUT_PROBE_PATHS = ("/about", "/about-us", "/company", "/our-story")
@@ -215,27 +195,39 @@ def _robots_allows(robots, user_agent, url):
 
 
 def probe_about_pages(home_url, cfg, session=None, skip_urls=()):
+	"""Probe ``ABOUT_PROBE_PATHS``, ``crawl_concurrency`` at a time; the first
+	qualifying page in path order wins, so the answer matches a one-at-a-time probe,
+	and no path past the wave holding it is fetched."""
 	skip = {normalize_url(u) for u in skip_urls}
 	user_agent = cfg.setting("user_agent")
 	own_session = session is None
 	session = session or build_session(cfg)
 	robots = load_robots(home_url, cfg, session)
 	try:
+		urls = []
 		for path in ABOUT_PROBE_PATHS:
 			url = normalize_url(urljoin(home_url, path))
 			if url in skip:
 				continue
 			skip.add(url)
-			if not _robots_allows(robots, user_agent, url):
-				continue
-			page, soup = crawl_page(url, cfg, session=session)
-			if (
-				soup is not None
-				and page.status_code == 200
-				and not page.error
-				and len(page.text) >= ABOUT_MIN_TEXT
-			):
-				return [(page, soup)]
+			if _robots_allows(robots, user_agent, url):
+				urls.append(url)
+		if not urls:
+			return []
+
+		concurrency = min(len(urls), crawl_concurrency(cfg))
+		with ThreadPoolExecutor(max_workers=concurrency) as pool:
+			# In waves of ``concurrency``: a hit stops the probe after its own wave.
+			for start in range(0, len(urls), concurrency):
+				wave = urls[start : start + concurrency]
+				for page, parsed in pool.map(lambda url: crawl_page(url, cfg, session=session), wave):
+					if (
+						parsed is not None
+						and page.status_code == 200
+						and not page.error
+						and len(page.text) >= ABOUT_MIN_TEXT
+					):
+						return [(page, parsed)]
 	finally:
 		if own_session:
 			session.close()
@@ -341,9 +333,82 @@ def discover_sitemap_urls(start_url, cfg, session, robots):
 		return []
 
 
-def crawl(start_url, cfg, session=None, progress=None):
+class Frontier:
+	"""Priority queue of URLs still to crawl.
+
+	Ordered by (not homepage, link priority, insertion order): priority is computed
+	once on push, so a pop is O(log n) even when a sitemap seeds thousands of URLs.
+	A URL is crawled once; pushing a queued URL again only re-queues it when it now
+	ranks higher (e.g. a sitemap seed later linked as "Contact us"), leaving a stale
+	entry that ``pop`` skips.
+	"""
+
+	def __init__(self, link_priority: list):
+		self.link_priority = link_priority
+		self._heap = []
+		# url -> heap entry currently live for it
+		self._queued = {}
+		self._popped = set()
+		self._counter = count()
+
+	def __len__(self):
+		return len(self._queued)
+
+	def __contains__(self, url):
+		"""True for any URL ever pushed, including ones already popped."""
+		return url in self._queued or url in self._popped
+
+	def push(self, url: str, depth: int, anchor_text: str = "") -> bool:
+		"""Queue ``url``, or re-queue it if it now ranks higher; returns whether it was."""
+		if url in self._popped:
+			return False
+		queued = self._queued.get(url)
+		if queued:
+			depth = min(depth, queued[-1])
+		entry = (
+			0 if depth == 0 else 1,
+			_link_priority(url, anchor_text, self.link_priority),
+			next(self._counter),
+			url,
+			depth,
+		)
+		if queued and queued[:2] <= entry[:2]:
+			return False
+		self._queued[url] = entry
+		heapq.heappush(self._heap, entry)
+		return True
+
+	def pop(self) -> tuple[str, int]:
+		"""The highest-priority ``(url, depth)``."""
+		while True:
+			entry = heapq.heappop(self._heap)
+			*_key, url, depth = entry
+			if self._queued.get(url) is entry:
+				del self._queued[url]
+				self._popped.add(url)
+				return url, depth
+
+
+def crawl_concurrency(cfg) -> int:
+	"""Parallel fetches per crawl, clamped to ``1..MAX_CRAWL_CONCURRENCY``. A crawl
+	never leaves its site, so this is also the per-host connection budget."""
+	try:
+		concurrency = int(cfg.setting("crawl_concurrency") or 1)
+	except (TypeError, ValueError):
+		concurrency = 1
+	return max(1, min(concurrency, MAX_CRAWL_CONCURRENCY))
+
+
+def crawl(start_url, cfg, session=None, progress=None, head_only=False):
+	"""Fetches up to ``crawl_concurrency`` pages at once from one shared (pinned,
+	SSRF-guarded) session. Dispatch follows frontier order and results keep dispatch
+	order, so concurrency changes wall time, not which pages are crawled first.
+	``progress`` is only ever called from the calling thread. ``head_only`` fetches
+	only each page's ``<head>`` (see ``http.fetch``): metadata, but little body text
+	and few links."""
 	max_pages = int(cfg.setting("max_pages"))
 	max_depth = int(cfg.setting("max_depth"))
+	concurrency = crawl_concurrency(cfg)
 	link_priority = cfg.link_priority
 	skip_patterns = cfg.skip_patterns
 
@@ -353,97 +418,101 @@ def crawl(start_url, cfg, session=None, progress=None):
 	start_url = normalize_url(start_url)
 	base_netloc = urlparse(start_url).netloc
 
-	# robots.txt only gates discovered links; skip the fetch for homepage-only runs.
-	crawl_beyond_homepage = max_depth >= 1 and max_pages > 1
-	robots = load_robots(start_url, cfg, session) if crawl_beyond_homepage else None
-
 	visited = set()
 	# Resolved (post-redirect) URLs already crawled -- catches a duplicate the
 	# pre-fetch `visited` check can't (e.g. /contact.html -> /contact).
 	visited_resolved = set()
+	# (dispatch order, page, parsed page); sorted by dispatch order on return.
 	results = []
-	# Queue holds (url, depth, anchor_text).
-	queue = deque([(start_url, 0, "")])
-
-	# Sitemap-seeded links join at depth 1, never 0, so the homepage still wins
-	# the first pop. Additive only -- a site with no sitemap is unaffected.
-	if crawl_beyond_homepage and cfg.setting("use_sitemap", True):
-		queued_from_sitemap = set()
-		for loc in discover_sitemap_urls(start_url, cfg, session, robots):
-			link = normalize_url(loc)
-			if link == start_url or link in queued_from_sitemap:
-				continue
-			if not same_site(link, base_netloc) or not _is_crawlable(link, skip_patterns):
-				continue
-			if not _robots_allows(robots, user_agent, link):
-				continue
-			queued_from_sitemap.add(link)
-			queue.append((link, 1, ""))
+	frontier = Frontier(link_priority)
+	# future -> (dispatch order, depth)
+	in_flight = {}
+	dispatch_order = count()
+	pool = ThreadPoolExecutor(max_workers=concurrency)
+
+	def dispatch(url, depth):
+		visited.add(url)
+		if progress:
+			progress(f"Crawling {url}")
+		in_flight[pool.submit(crawl_page, url, cfg, session, head_only)] = (next(dispatch_order), depth)
 
 	try:
-		while queue and len(results) < max_pages:
-			# Pick the highest-priority queued URL (homepage first, then by keyword).
-			queue = deque(
-				sorted(
-					queue,
-					key=lambda item: (
-						0 if item[1] == 0 else 1,
-						_link_priority(item[0], item[2], link_priority),
-					),
-				)
-			)
-			url, depth, _anchor = queue.popleft()
-			url = normalize_url(url)
-			if url in visited:
-				continue
-			visited.add(url)
-
-			if progress:
-				progress(f"Crawling {url}")
-			page, soup = crawl_page(url, cfg, session=session)
-			resolved = normalize_url(page.url) if page.url else ""
-
-			if not results:
-				# Homepage: can't be a duplicate yet. Adopt its resolved host as the
-				# same-site base if it redirected elsewhere.
-				if resolved:
-					base_netloc = urlparse(page.url).netloc or base_netloc
-			else:
-				# A redirect can land here under a different requested URL (e.g.
-				# /contact.html -> /contact) -- drop the duplicate, no budget spent.
-				if resolved and resolved in visited_resolved:
+		# The homepage is never robots-gated, so its fetch overlaps robots.txt and
+		# sitemap discovery below.
+		dispatch(start_url, 0)
+
+		# robots.txt only gates discovered links; skip the fetch for homepage-only runs.
+		crawl_beyond_homepage = max_depth >= 1 and max_pages > 1
+		robots = load_robots(start_url, cfg, session) if crawl_beyond_homepage else None
+
+		# Sitemap-seeded links join at depth 1, never 0, and wait for the homepage to
+		# finish. Additive only -- a site with no sitemap is unaffected.
+		if crawl_beyond_homepage and cfg.setting("use_sitemap", True):
+			for loc in discover_sitemap_urls(start_url, cfg, session, robots):
+				link = normalize_url(loc)
+				if link in visited:
 					continue
-				if soup is not None and page.url and not same_site(page.url, base_netloc):
-					# Same-site link redirected off-domain; fetch() only checks SSRF
-					# per hop, not same-site scope. Clear every parsed field (not just
-					# html/text) so nothing -- including title/headings, already
-					# filled in by crawl_page() -- leaks into extraction.
-					page.error = page.error or f"redirected off-site to {urlparse(page.url).netloc}"
-					page.html = ""
-					page.text = ""
-					page.title = ""
-					page.headings = []
-					soup = None
-
-			if resolved:
-				visited_resolved.add(resolved)
-
-			results.append((page, soup))
-
-			if soup is None or depth >= max_depth:
-				continue
-
-			# Resolve links against the page's resolved URL, not the requested one.
-			seen_here = set()
-			for link, anchor in _links_on_page(soup, page.url, base_netloc, skip_patterns):
-				if link in visited or link in seen_here:
+				if not same_site(link, base_netloc) or not _is_crawlable(link, skip_patterns):
 					continue
 				if not _robots_allows(robots, user_agent, link):
 					continue
-				seen_here.add(link)
-				queue.append((link, depth + 1, anchor))
+				frontier.push(link, 1)
+
+		while in_flight:
+			done, _pending = wait(in_flight, return_when=FIRST_COMPLETED)
+			for future in sorted(done, key=lambda f: in_flight[f][0]):
+				order, depth = in_flight.pop(future)
+				page, parsed = future.result()
+				resolved = normalize_url(page.url) if page.url else ""
+
+				if order == 0:
+					# Homepage: can't be a duplicate yet. Adopt its resolved host as the
+					# same-site base if it redirected elsewhere. Nothing else is in
+					# flight yet, so every later page is scoped against this base.
+					if resolved:
+						base_netloc = urlparse(page.url).netloc or base_netloc
+				else:
+					# A redirect can land here under a different requested URL (e.g.
+					# /contact.html -> /contact) -- drop the duplicate, no budget spent.
+					if resolved and resolved in visited_resolved:
+						continue
+					if parsed is not None and page.url and not same_site(page.url, base_netloc):
+						# Same-site link redirected off-domain; fetch() only checks SSRF
+						# per hop, not same-site scope. Clear every parsed field (not just
+						# html/text) so nothing -- including title/headings, already
+						# filled in by crawl_page() -- leaks into extraction.
+						page.error = page.error or f"redirected off-site to {urlparse(page.url).netloc}"
+						page.html = ""
+						page.text = ""
+						page.title = ""
+						page.headings = []
+						parsed = None
+
+				if resolved:
+					visited_resolved.add(resolved)
+
+				results.append((order, page, parsed))
+
+				if parsed is None or depth >= max_depth:
+					continue
+
+				# Resolve links against the page's resolved URL, not the requested one.
+				for link, anchor in _links_on_page(parsed, page.url, base_netloc, skip_patterns):
+					# a queued link is pushed again: its anchor text may rank it higher
+					if link in visited:
+						continue
+					if not _robots_allows(robots, user_agent, link):
+						continue
+					frontier.push(link, depth + 1, anchor)
+
+			# In-flight fetches count against the page budget, so the crawl never
+			# fetches more than max_pages pages (a dropped duplicate frees its slot).
+			while frontier and len(in_flight) < concurrency and len(results) + len(in_flight) < max_pages:
+				dispatch(*frontier.pop())
 	finally:
+		pool.shutdown(wait=True, cancel_futures=True)
 		if own_session:
 			session.close()
 
-	return results
+	results.sort(key=lambda item: item[0])
+	return [(page, parsed) for _order, page, parsed in results]
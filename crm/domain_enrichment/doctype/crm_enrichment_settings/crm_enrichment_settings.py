@@ -27,10 +27,14 @@ class CRMEnrichmentSettings(Document):
 		allowed_domains: DF.Table[CRMEnrichmentDomain]
 		auto_enrich: DF.Check
 		blocked_domains: DF.Table[CRMEnrichmentDomain]
+		bulk_concurrency: DF.Int
+		crawl_concurrency: DF.Int
 		enable_deal: DF.Check
 		enable_lead: DF.Check
 		enable_organization: DF.Check
 		enabled: DF.Check
+		fetch_cache_size: DF.Int
+		fetch_cache_ttl: DF.Int
 		link_priority_order: DF.Table[CRMEnrichmentLinkPriority]
 		max_depth: DF.Int
 		max_download_bytes: DF.Int
@@ -0,0 +1,136 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and contributors
+# For license information, please see license.txt
+
+"""Parse-once page model.
+
+``parse_page`` parses a page's HTML once -- with lxml when it is installed, else the
+stdlib ``html.parser`` -- and indexes, in a single walk of the tree, everything the
+crawler and the extractors read: title, headings, visible text, ``<a>`` links,
+``<link>`` tags, ``<meta>`` tags, JSON-LD blocks and body paragraphs. Only the
+resulting ``ParsedPage`` is kept; the BeautifulSoup tree is dropped as soon as the
+page is indexed.
+
+Text is gathered exactly as ``get_text`` would (only ``NavigableString``/``CData``
+strings), so extractors see the same values they did when they walked the soup.
+"""
+
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass, field
+
+from bs4 import BeautifulSoup, CData, NavigableString, Tag
+
+try:
+	import lxml
+
+	PARSER = "lxml"
+except ImportError:
+	PARSER = "html.parser"
+
+# Strings below these are not part of the page's visible text.
+INVISIBLE_TAGS = {"script", "style", "noscript", "template", "svg"}
+# Paragraphs below these are page chrome, not body copy.
+NON_CONTENT_TAGS = {"nav", "header", "footer", "aside", "form"}
+HEADING_TAGS = {"h1", "h2", "h3"}
+
+_TEXT_TYPES = (NavigableString, CData)
+
+
+@dataclass
+class ParsedPage:
+	title: str = ""
+	headings: list = field(default_factory=list)  # h1-h3 text, document order
+	text: str = ""  # visible text, whitespace-collapsed
+	links: list = field(default_factory=list)  # (href, anchor text) per <a href>
+	link_tags: list = field(default_factory=list)  # attributes of each <link href>
+	meta: dict = field(default_factory=dict)  # ("property" | "name", value) -> content
+	json_ld: list = field(default_factory=list)  # decoded JSON-LD objects
+	paragraphs: list = field(default_factory=list)  # <p> text outside page chrome
+
+	def meta_content(self, name: str) -> str:
+		"""Content of the first ``<meta property=name>``, else the first
+		``<meta name=name>`` -- the same lookup as ``soup.find`` on each attribute."""
+		content = self.meta.get(("property", name))
+		if content is None:
+			content = self.meta.get(("name", name))
+		return content or ""
+
+
+def parse_page(html: str) -> ParsedPage:
+	soup = BeautifulSoup(html, PARSER)
+	page = ParsedPage()
+	text, headings, paragraphs = [], [], []
+	title_seen = False
+
+	# (node, under an invisible tag, under page chrome, open text collectors)
+	stack = [(soup, False, False, ())]
+	while stack:
+		node, invisible, chrome, collectors = stack.pop()
+
+		if isinstance(node, NavigableString):
+			if type(node) not in _TEXT_TYPES:
+				continue
+			stripped = node.strip()
+			if not stripped:
+				continue
+			if not invisible:
+				text.append(stripped)
+			for collector in collectors:
+				collector.append(stripped)
+			continue
+		if not isinstance(node, Tag):
+			continue
+
+		name = node.name
+		if name == "title" and not title_seen:
+			title_seen = True
+			page.title = (node.string or "").strip()
+		elif name in HEADING_TAGS:
+			headings.append(collector := [])
+			collectors = (*collectors, collector)
+		elif name == "p":
+			if not chrome:
+				paragraphs.append(collector := [])
+				collectors = (*collectors, collector)
+		elif name == "a" and node.get("href") is not None:
+			collector = []
+			page.links.append((node["href"], collector))
+			collectors = (*collectors, collector)
+		elif name == "link" and node.get("href") is not None:
+			page.link_tags.append(dict(node.attrs))
+		elif name == "meta":
+			for attr in ("property", "name"):
+				if node.get(attr) is not None:
+					page.meta.setdefault((attr, node[attr]), node.get("content"))
+		elif name == "script" and node.get("type") == "application/ld+json":
+			page.json_ld.extend(_json_ld_blocks(node.string or node.get_text() or ""))
+
+		if name in ("script", "style"):
+			# Script/Stylesheet strings are never text (see _TEXT_TYPES).
+			continue
+		invisible = invisible or name in INVISIBLE_TAGS
+		chrome = chrome or name in NON_CONTENT_TAGS
+		stack.extend((child, invisible, chrome, collectors) for child in reversed(node.contents))
+
+	page.text = " ".join(" ".join(text).split())
+	page.headings = [" ".join(parts) for parts in headings if parts]
+	page.paragraphs = [" ".join(" ".join(parts).split()) for parts in paragraphs]
+	page.links = [(href, " ".join(parts)) for href, parts in page.links]
+	return page
+
+
+def _json_ld_blocks(raw: str) -> list:
+	if not raw.strip():
+		return []
+	try:
+		data = json.loads(raw)
+	except (ValueError, TypeError):
+		return []
+	if isinstance(data, dict):
+		if "@graph" in data and isinstance(data["@graph"], list):
+			return [d for d in data["@graph"] if isinstance(d, dict)]
+		return [data]
+	if isinstance(data, list):
+		return [d for d in data if isinstance(d, dict)]
+	return []
@@ -5,18 +5,20 @@
 
 No literal keyword/industry/social tables here: classifiers iterate over
 ``cfg.rules_by_type[...]``, honoring each rule's ``match_scope``, ``weight`` and
-compiled patterns. JSON-LD parsing, the favicon scorer, readability diagnosis,
+compiled patterns. JSON-LD typing, the favicon scorer, readability diagnosis,
 email/phone regex, and company-name cleaning stay as plain mechanics -- not
 tunable knowledge, so not pushed into doctypes.
+
+Page-level extractors read a ``document.ParsedPage`` (the page's links, meta tags,
+JSON-LD and paragraphs, indexed in one parse), never a DOM.
 """
 
 from __future__ import annotations
 
-import json
 import re
 from urllib.parse import urljoin, urlparse
 
-from .config import INDUSTRY_MIN_CONFIDENCE, INDUSTRY_MIN_SCORE
+from .config import INDUSTRY_MIN_CONFIDENCE, INDUSTRY_MIN_SCORE, KeywordMatcher
 from .result import (
 	Email,
 	Field,
@@ -70,39 +72,29 @@ SCOPE_URL = "URL"
 
 def apply_keyword_rules(text_by_scope: dict, rules: list) -> dict:
 	"""Returns ``{label: weighted_score}`` -- ``label`` is the rule's industry
-	(Industry rules) or target_value (everything else)."""
+	(Industry rules) or target_value (everything else). Each scope's text is scanned
+	once for the keywords of all rules on that scope (``KeywordMatcher``)."""
+	indexes_by_scope: dict = {}
+	for index, rule in enumerate(rules):
+		indexes_by_scope.setdefault(rule.match_scope, []).append(index)
+
+	hits_by_rule = [0] * len(rules)
+	for scope, indexes in indexes_by_scope.items():
+		counts = KeywordMatcher([rules[i] for i in indexes]).counts(text_by_scope.get(scope, ""))
+		for index, hits in zip(indexes, counts, strict=True):
+			hits_by_rule[index] = hits
+
+	# Scores in rule order: max() over them breaks ties by first rule, as before.
 	scores: dict = {}
-	for rule in rules:
-		text = text_by_scope.get(rule.match_scope, "")
-		hits = rule.matches(text)
+	for rule, hits in zip(rules, hits_by_rule, strict=True):
 		if hits:
 			scores[rule.label] = scores.get(rule.label, 0.0) + hits * (rule.weight or 1.0)
 	return scores
 
 
 # --------------------------------------------------------------------------- #
-# JSON-LD (mechanics)
+# JSON-LD (mechanics; blocks are decoded once, by document.parse_page)
 # --------------------------------------------------------------------------- #
-def parse_json_ld(soup):
-	blocks = []
-	for tag in soup.find_all("script", attrs={"type": "application/ld+json"}):
-		raw = tag.string or tag.get_text() or ""
-		if not raw.strip():
-			continue
-		try:
-			data = json.loads(raw)
-		except (ValueError, TypeError):
-			continue
-		if isinstance(data, dict):
-			if "@graph" in data and isinstance(data["@graph"], list):
-				blocks.extend([d for d in data["@graph"] if isinstance(d, dict)])
-			else:
-				blocks.append(data)
-		elif isinstance(data, list):
-			blocks.extend([d for d in data if isinstance(d, dict)])
-	return blocks
-
-
 def _ld_type_matches(block, wanted):
 	t = block.get("@type", "")
 	types = t if isinstance(t, list) else [t]
@@ -167,11 +159,11 @@ def diagnose_readability(pages):
 # --------------------------------------------------------------------------- #
 # Company information (mechanics)
 # --------------------------------------------------------------------------- #
-def _meta_with_method(soup, *names):
+def _meta_with_method(parsed, *names):
 	for name in names:
-		tag = soup.find("meta", attrs={"property": name}) or soup.find("meta", attrs={"name": name})
-		if tag and tag.get("content"):
-			return tag["content"].strip(), name
+		content = parsed.meta_content(name)
+		if content:
+			return content.strip(), name
 	return "", ""
 
 
@@ -244,11 +236,11 @@ def _safe_url(base_url, raw):
 	return resolved if urlparse(resolved).scheme in ("http", "https") else ""
 
 
-def _best_icon(soup, base_url):
+def _best_icon(parsed, base_url):
 	"""Best ``<link rel=icon>`` candidate: scalable SVG beats any raster, then
 	largest declared size wins."""
 	candidates = []
-	for tag in soup.find_all("link", href=True):
+	for tag in parsed.link_tags:
 		rel = tag.get("rel") or []
 		rel = " ".join(rel).lower() if isinstance(rel, list) else str(rel).lower()
 		if "icon" not in rel:
@@ -271,12 +263,12 @@ def _best_icon(soup, base_url):
 	return candidates[0][1]
 
 
-def extract_logo(soup, base_url):
+def extract_logo(parsed, base_url):
 	"""The company's link icon -- a crisp, square brand mark, not the wider
 	social-share image (``og:image`` is usually a banner; see :func:`extract_image`).
 	Priority: SVG > largest declared raster/apple-touch > ``/favicon.ico`` fallback.
 	"""
-	icon_url = _best_icon(soup, base_url)
+	icon_url = _best_icon(parsed, base_url)
 	if icon_url:
 		return Field(icon_url, base_url, Method.FAVICON)
 
@@ -286,11 +278,11 @@ def extract_logo(soup, base_url):
 	return Field()
 
 
-def extract_image(soup, base_url):
+def extract_image(parsed, base_url):
 	"""The larger brand/social image (JSON-LD ``Organization.logo`` -> ``og:image``/
 	``twitter:image``), NOT the company logo -- see :func:`extract_logo`. Returns a
 	:class:`Field`, empty if none declared."""
-	for block in parse_json_ld(soup):
+	for block in parsed.json_ld:
 		if not _ld_type_matches(block, _ORG_TYPES):
 			continue
 		logo = block.get("logo")
@@ -299,7 +291,7 @@ def extract_image(soup, base_url):
 		if safe:
 			return Field(safe, base_url, Method.JSON_LD)
 
-	og_content, _name = _meta_with_method(soup, "og:image", "og:image:url", "twitter:image")
+	og_content, _name = _meta_with_method(parsed, "og:image", "og:image:url", "twitter:image")
 	safe = _safe_url(base_url, og_content)
 	if safe:
 		return Field(safe, base_url, Method.META_TAG)
@@ -361,7 +353,7 @@ def _is_about_page(url):
 	return bool(_ABOUT_SEGMENT_RE.match(seg))
 
 
-def extract_company_info(homepage, soup):
+def extract_company_info(homepage, parsed):
 	url = homepage.url
 	info = {
 		"company_name": Field(),
@@ -371,7 +363,7 @@ def extract_company_info(homepage, soup):
 		"social_links": [],
 	}
 
-	for block in parse_json_ld(soup):
+	for block in parsed.json_ld:
 		if not _ld_type_matches(block, _ORG_TYPES):
 			continue
 		if not info["company_name"].value and block.get("name"):
@@ -386,24 +378,23 @@ def extract_company_info(homepage, soup):
 		break  # first matching org block wins
 
 	if not info["company_name"].value:
-		content, _name = _meta_with_method(soup, "og:site_name", "og:title")
+		content, _name = _meta_with_method(parsed, "og:site_name", "og:title")
 		if content:
 			info["company_name"] = Field(_clean_company_name(content, url), url, Method.META_TAG)
 		elif homepage.title:
 			info["company_name"] = Field(_clean_company_name(homepage.title, url), url, Method.TITLE_TAG)
 
 	if not info["description"].value:
-		content, _name = _meta_with_method(soup, "og:description", "description")
+		content, _name = _meta_with_method(parsed, "og:description", "description")
 		if content:
 			info["description"] = Field(content, url, Method.META_TAG)
 
-	info["logo"] = extract_logo(soup, url)
-	info["image"] = extract_image(soup, url)
+	info["logo"] = extract_logo(parsed, url)
+	info["image"] = extract_image(parsed, url)
 
 	return info
 
 
-_NON_CONTENT_PARENTS = {"nav", "header", "footer", "aside", "form"}
 _MIN_PARAGRAPH_LEN = 80
 _MAX_PARAGRAPHS_SCANNED = 6
 
@@ -415,17 +406,14 @@ def _company_name_hits(text, company_name):
 	return len(re.findall(rf"\b{re.escape(name)}\b", text, re.IGNORECASE))
 
 
-def first_paragraph(soup, industry_rules=None, company_name=""):
+def first_paragraph(parsed, industry_rules=None, company_name=""):
 	"""Best substantial body paragraph on a page. Scores up to
-	``_MAX_PARAGRAPHS_SCANNED`` qualifying ``<p>`` tags by Industry-rule keyword hits
-	(the same corpus ``classify_industry`` uses); ``company_name`` mentions only
-	break ties, never outrank keyword signal. Read-only -- does not mutate ``soup``.
+	``_MAX_PARAGRAPHS_SCANNED`` qualifying ``<p>`` tags (outside nav/header/footer/
+	aside/form) by Industry-rule keyword hits (the same corpus ``classify_industry``
+	uses); ``company_name`` mentions only break ties, never outrank keyword signal.
 	"""
 	candidates = []
-	for p in soup.find_all("p"):
-		if any(parent.name in _NON_CONTENT_PARENTS for parent in p.parents):
-			continue
-		text = " ".join((p.get_text(" ") or "").split())
+	for text in parsed.paragraphs:
 		if len(text) < _MIN_PARAGRAPH_LEN or " " not in text:
 			continue
 		candidates.append(text)
@@ -441,16 +429,17 @@ def first_paragraph(soup, industry_rules=None, company_name=""):
 	# wins when nothing scores higher (covers the "all zero hits" case for free).
 	# Company-name hits are a separate tuple slot -- they can only break ties,
 	# never add to the industry-hit count.
+	matcher = KeywordMatcher(industry_rules)
 	return max(
 		candidates,
 		key=lambda text: (
-			sum(rule.matches(text) for rule in industry_rules),
+			sum(matcher.counts(text)),
 			_company_name_hits(text, company_name),
 		),
 	)
 
 
-def select_description(pages, soups_by_url, industry_rules=None, company_name=""):
+def select_description(pages, parsed_by_url, industry_rules=None, company_name=""):
 	"""Pick the best *company* description across crawled pages.
 
 	Priority: JSON-LD ``Organization.description`` -> About-page body paragraph ->
@@ -471,25 +460,25 @@ def select_description(pages, soups_by_url, industry_rules=None, company_name=""
 			best_key, best_field = key, field_obj
 
 	for page in pages:
-		soup = soups_by_url.get(page.url)
-		if soup is None:
+		parsed = parsed_by_url.get(page.url)
+		if parsed is None:
 			continue
 
 		is_home = page.url == home_url
 		is_about = _is_about_page(page.url)
 
-		for block in parse_json_ld(soup):
+		for block in parsed.json_ld:
 			if _ld_type_matches(block, _ORG_TYPES) and block.get("description"):
 				consider(Field(block["description"].strip(), page.url, Method.JSON_LD), 6)
 				break
 
 		if is_about:
 			consider(
-				Field(first_paragraph(soup, industry_rules, company_name), page.url, Method.BODY_TEXT), 5
+				Field(first_paragraph(parsed, industry_rules, company_name), page.url, Method.BODY_TEXT), 5
 			)
 
 		if is_home or is_about:
-			content, _name = _meta_with_method(soup, "og:description", "description")
+			content, _name = _meta_with_method(parsed, "og:description", "description")
 			if content:
 				content = content.strip()
 				score = 2 if (is_home and _COMMERCE_RE.search(content)) else 4
@@ -497,7 +486,7 @@ def select_description(pages, soups_by_url, industry_rules=None, company_name=""
 
 		if is_home:
 			consider(
-				Field(first_paragraph(soup, industry_rules, company_name), page.url, Method.BODY_TEXT), 1
+				Field(first_paragraph(parsed, industry_rules, company_name), page.url, Method.BODY_TEXT), 1
 			)
 
 	return best_field or Field()
@@ -566,7 +555,7 @@ def extract_phones(pages):
 # --------------------------------------------------------------------------- #
 # Social profiles (config-driven via Social rules)
 # --------------------------------------------------------------------------- #
-def extract_social_profiles(pages, soups_by_url, social_rules, extra_links=None):
+def extract_social_profiles(pages, parsed_by_url, social_rules, extra_links=None):
 	"""Return dict network -> SocialProfile(value, source, method); each Social
 	rule's ``target_value`` is the network name."""
 	profiles = {rule.target_value: SocialProfile() for rule in social_rules}
@@ -574,11 +563,11 @@ def extract_social_profiles(pages, soups_by_url, social_rules, extra_links=None)
 	home_url = pages[0].url if pages else ""
 	candidates = [(link, home_url, Method.JSON_LD) for link in (extra_links or [])]
 	for page in pages:
-		soup = soups_by_url.get(page.url)
-		if soup is None:
+		parsed = parsed_by_url.get(page.url)
+		if parsed is None:
 			continue
-		for a in soup.find_all("a", href=True):
-			candidates.append((a["href"].strip(), page.url, Method.SOCIAL_RULE))
+		for href, _anchor in parsed.links:
+			candidates.append((href.strip(), page.url, Method.SOCIAL_RULE))
 
 	for href, source, method in candidates:
 		if not href or SOCIAL_NEGATIVE.search(href):
@@ -8,6 +8,8 @@ framework's), this module adds the crawler-specific behavior the framework does
 provide:
 
 * a hard download cap (``max_download_bytes``) via streamed reads,
+* the shared page cache (``cache.FetchCache``), consulted before any connection,
+  with ``If-None-Match`` / ``If-Modified-Since`` revalidation of stale entries,
 * an HTML-only content-type filter,
 * the never-raise ``(status_code, html, error)`` contract, and
 * a mandatory **SSRF guard** that resolves the hostname and rejects loopback /
@@ -25,6 +27,8 @@ from __future__ import annotations
 import ipaddress
 import re
 import socket
+import threading
+import time
 from urllib.parse import urlparse
 
 import frappe
@@ -33,8 +37,12 @@ from requests.adapters import HTTPAdapter, Retry
 
 HTML_CONTENT_TYPES = ("text/html", "application/xhtml")
 RETRY_STATUS_FORCELIST = (429, 500, 502, 503, 504)
+# Error statuses worth caching like a page: the page is gone, not briefly unavailable.
+CACHED_ERROR_STATUSES = (404, 410)
 # Cap redirect chases ourselves (we follow manually to re-check each hop).
 MAX_REDIRECTS = 5
+# Guards the per-session adapter cache: a concurrent crawl shares one session across threads.
+_ADAPTER_LOCK = threading.Lock()
 # Default crawler UA: a current desktop-Chrome string so bot walls that reject bare
 # clients serve HTML. Overridable via the CRM Enrichment Settings ``user_agent`` field.
 DEFAULT_USER_AGENT = (
@@ -83,11 +91,63 @@ def _is_blocked_ip(ip: str) -> bool:
 	return not addr.is_global or addr.is_multicast
 
 
-def _resolve_ips(host: str) -> list:
-	"""Resolve ``host`` to its IP strings via ``socket.getaddrinfo``."""
+# --------------------------------------------------------------------------- #
+# Resolver cache
+# --------------------------------------------------------------------------- #
+# One run resolves the same host for robots.txt, the sitemaps, every page, every
+# redirect hop and every about-page probe. Answers are reused for DNS_CACHE_TTL
+# seconds -- about one crawl -- so a changed record is picked up by the next run.
+# Reuse keeps the rebinding defense intact: the reused IPs are re-checked by the
+# guard on every fetch, and the connection is still pinned to the checked IP.
+DNS_CACHE_TTL = 30
+DNS_CACHE_SIZE = 256
+
+_dns_cache: dict = {}  # host -> (expires_at, ips)
+_dns_stats = {"hits": 0, "misses": 0}
+_DNS_LOCK = threading.Lock()
+
+
+def dns_cache_stats(stats: dict | None = None) -> dict:
+	"""Resolver cache hits, misses and hit rate of one session's fetches (its
+	``dns_stats``, see ``build_session``), or of the whole process since it started
+	(or the last ``clear_dns_cache``)."""
+	stats = _dns_stats if stats is None else stats
+	with _DNS_LOCK:
+		hits, misses = stats["hits"], stats["misses"]
+	return {"hits": hits, "misses": misses, "hit_rate": hits / (hits + misses) if hits + misses else 0.0}
+
+
+def clear_dns_cache() -> None:
+	with _DNS_LOCK:
+		_dns_cache.clear()
+		_dns_stats.update(hits=0, misses=0)
+
+
+def _resolve_ips(host: str, stats: dict | None = None) -> list:
+	"""Resolve ``host`` to its IP strings via ``socket.getaddrinfo``, through the
+	short-lived resolver cache. Failed lookups are never cached. The hit or miss is
+	counted in ``stats`` too, when given."""
+	now = time.monotonic()
+	with _DNS_LOCK:
+		entry = _dns_cache.get(host)
+		outcome = "hits" if entry and entry[0] > now else "misses"
+		_dns_stats[outcome] += 1
+		if stats is not None:
+			stats[outcome] += 1
+		if outcome == "hits":
+			return list(entry[1])
+
 	infos = socket.getaddrinfo(host, None)
 	# index 4 is sockaddr; element 0 is the IP for both AF_INET / AF_INET6.
-	return list({info[4][0] for info in infos})
+	ips = list({info[4][0] for info in infos})
+
+	with _DNS_LOCK:
+		if host not in _dns_cache and len(_dns_cache) >= DNS_CACHE_SIZE:
+			expired = [key for key, (expires_at, _ips) in _dns_cache.items() if expires_at <= now]
+			for key in expired or [next(iter(_dns_cache))]:
+				del _dns_cache[key]
+		_dns_cache[host] = (now + DNS_CACHE_TTL, tuple(ips))
+	return ips
 
 
 def validate_url(url: str, cfg) -> str:
@@ -104,12 +164,22 @@ def validate_url(url: str, cfg) -> str:
 	return url
 
 
-def _validated_ips(url: str, cfg) -> list:
+def _check_domain_lists(host: str, cfg) -> None:
+	"""Raise ``SSRFError`` if the Settings allow/block lists reject ``host``."""
+	blocked = cfg.blocked_domains if cfg else []
+	allowed = cfg.allowed_domains if cfg else []
+	if _domain_in_list(host, blocked):
+		raise SSRFError(f"host is on the blocked-domains list: {host}")
+	if allowed and not _domain_in_list(host, allowed):
+		raise SSRFError(f"host is not on the allowed-domains list: {host}")
+
+
+def _validated_ips(url: str, cfg, dns_stats: dict | None = None) -> list:
 	"""Run the full SSRF checks for ``url`` and return the resolved, validated IPs.
 
 	The caller connects to one of these exact addresses (see ``_pinned_get``), so
 	the IP that was checked is the IP that serves the request. Raises ``SSRFError``
-	on any rejection.
+	on any rejection. ``dns_stats`` counts the lookup (see ``_resolve_ips``).
 	"""
 	parsed = urlparse(url)
 	if parsed.scheme not in ("http", "https"):
@@ -122,15 +192,10 @@ def _validated_ips(url: str, cfg) -> list:
 	if not host:
 		raise SSRFError("URL has no host")
 
-	blocked = cfg.blocked_domains if cfg else []
-	allowed = cfg.allowed_domains if cfg else []
-	if _domain_in_list(host, blocked):
-		raise SSRFError(f"host is on the blocked-domains list: {host}")
-	if allowed and not _domain_in_list(host, allowed):
-		raise SSRFError(f"host is not on the allowed-domains list: {host}")
+	_check_domain_lists(host, cfg)
 
 	try:
-		ips = _resolve_ips(host)
+		ips = _resolve_ips(host, dns_stats)
 	except socket.gaierror as exc:
 		raise SSRFError(f"could not resolve host {host}: {exc}") from exc
 	if not ips:
@@ -160,6 +225,8 @@ def build_session(cfg=None):
 	retries = int(cfg.setting("retry_count")) if cfg else 2
 	user_agent = cfg.setting("user_agent") if cfg else DEFAULT_USER_AGENT
 	session = get_request_session(max_retries=retries)
+	# Resolver cache hits and misses of this session's fetches, reported per run
+	session.dns_stats = {"hits": 0, "misses": 0}
 	# get_request_session only forces 500; widen to the usual transient set.
 	try:
 		adapter = HTTPAdapter(max_retries=_retry_policy(retries))
@@ -225,18 +292,19 @@ class _PinnedIPAdapter(HTTPAdapter):
 def _pinned_adapter(session, hostname: str, retries: int) -> _PinnedIPAdapter:
 	"""Per-hostname adapter cache on the session, so keep-alive pooling survives
 	across the pages of a crawl instead of reconnecting for every request."""
-	cache = getattr(session, "_pinned_adapters", None)
-	if cache is None:
-		cache = {}
-		session._pinned_adapters = cache
-	adapter = cache.get(hostname)
-	if adapter is None:
-		adapter = _PinnedIPAdapter(hostname, max_retries=_retry_policy(retries))
-		cache[hostname] = adapter
+	with _ADAPTER_LOCK:
+		cache = getattr(session, "_pinned_adapters", None)
+		if cache is None:
+			cache = {}
+			session._pinned_adapters = cache
+		adapter = cache.get(hostname)
+		if adapter is None:
+			adapter = _PinnedIPAdapter(hostname, max_retries=_retry_policy(retries))
+			cache[hostname] = adapter
 	return adapter
 
 
-def _pinned_get(session, url: str, pinned_ip: str, timeout: int, retries: int):
+def _pinned_get(session, url: str, pinned_ip: str, timeout: int, retries: int, headers=None):
 	"""GET ``url`` connecting to ``pinned_ip`` -- an address the SSRF guard just
 	validated -- so a DNS answer that changes between validation and connection
 	(rebinding) cannot steer the socket somewhere else. Only the socket target is
@@ -256,7 +324,7 @@ def _pinned_get(session, url: str, pinned_ip: str, timeout: int, retries: int):
 		requests.Request(
 			"GET",
 			parsed._replace(netloc=ip_netloc).geturl(),
-			headers={"Host": host_header},
+			headers={"Host": host_header, **(headers or {})},
 		)
 	)
 	return _pinned_adapter(session, host, retries).send(
@@ -272,6 +340,11 @@ def _pinned_get(session, url: str, pinned_ip: str, timeout: int, retries: int):
 # Fetch
 # --------------------------------------------------------------------------- #
 _META_CHARSET_RE = re.compile(rb"""charset=["']?\s*([a-zA-Z0-9_\-]+)""", re.IGNORECASE)
+# End of the document head: ``</head>``, or the ``<body>`` of a page that omits it.
+_HEAD_END_RE = re.compile(rb"</head\b|<body\b", re.IGNORECASE)
+# A head-only fetch keeps reading this much past the head, for JSON-LD placed at the
+# top of the body.
+HEAD_ONLY_TAIL_BYTES = 32_768
 
 
 def _sniff_html_charset(raw: bytes) -> str | None:
@@ -286,17 +359,29 @@ def _sniff_html_charset(raw: bytes) -> str | None:
 	return None
 
 
-def _read_capped(resp, max_bytes: int) -> str:
-	chunks = []
+def _read_capped(resp, max_bytes: int, head_only: bool = False) -> tuple[str, bool]:
+	"""The decoded body, and whether it was cut off at ``max_bytes``.
+
+	``head_only`` stops reading ``HEAD_ONLY_TAIL_BYTES`` after the end of the document
+	head (the caller then closes the connection); the body counts as cut off unless
+	the document ended first.
+	"""
+	raw = bytearray()
 	total = 0
+	stop_at = max_bytes
 	for chunk in resp.iter_content(chunk_size=16_384, decode_unicode=False):
 		if not chunk:
 			continue
 		total += len(chunk)
-		chunks.append(chunk)
-		if total >= max_bytes:
+		raw += chunk
+		if head_only and stop_at == max_bytes:
+			# Rescan a few bytes of the previous chunk: the tag may straddle chunks.
+			match = _HEAD_END_RE.search(raw, max(0, total - len(chunk) - 8))
+			if match:
+				stop_at = min(max_bytes, match.start() + HEAD_ONLY_TAIL_BYTES)
+		if total >= stop_at:
 			break
-	raw = b"".join(chunks)
+	raw = bytes(raw[:stop_at] if stop_at < max_bytes else raw)
 	# requests defaults text/* without an explicit charset to ISO-8859-1, which
 	# mojibakes UTF-8 pages that only declare their charset in a <meta> tag. When the
 	# header carries no charset, trust the document's own declaration instead.
@@ -304,13 +389,65 @@ def _read_capped(resp, max_bytes: int) -> str:
 		encoding = resp.encoding or "utf-8"
 	else:
 		encoding = _sniff_html_charset(raw) or "utf-8"
+	truncated = total >= stop_at
 	try:
-		return raw.decode(encoding, errors="replace")
+		return raw.decode(encoding, errors="replace"), truncated
 	except (LookupError, TypeError):
-		return raw.decode("utf-8", errors="replace")
+		return raw.decode("utf-8", errors="replace"), truncated
+
 
+def _is_html(content_type: str) -> bool:
+	return not content_type or any(ct in content_type for ct in HTML_CONTENT_TYPES)
 
-def fetch(url: str, cfg, session=None, html_only: bool = True):
+
+def _cache_usable(cached: dict, url: str, cfg, max_bytes: int, head_only: bool = False) -> bool:
+	"""Whether a cached entry may answer this fetch at all (fresh or revalidated).
+
+	A body cut short by a smaller cap than ``max_bytes`` is not, nor is a head-only
+	body (cached by a preview) for a full fetch, nor a URL or final URL the allow/block
+	lists now reject -- the live fetch then reports the rejection.
+	"""
+	if cached.get("head_only") and not head_only:
+		return False
+	if cached.get("truncated") and cached.get("max_bytes", 0) < max_bytes:
+		return False
+	try:
+		for cached_url in (url, cached.get("final_url") or url):
+			_check_domain_lists((urlparse(cached_url).hostname or "").rstrip("."), cfg)
+	except SSRFError:
+		return False
+	return True
+
+
+def _from_cache(cached: dict, url: str, html_only: bool, max_bytes: int):
+	"""The ``fetch`` result for a usable cached entry."""
+	final_url = cached.get("final_url") or url
+	content_type = cached.get("content_type", "")
+	if html_only and not _is_html(content_type):
+		return cached["status"], "", f"skipped non-HTML content-type: {content_type}", final_url
+	return cached["status"], cached["html"][:max_bytes], "", final_url
+
+
+def _validators(resp, cached=None) -> dict:
+	"""``ETag`` / ``Last-Modified`` of a response, falling back to the cached ones (a
+	304 need not repeat them)."""
+	cached = cached or {}
+	return {
+		"etag": resp.headers.get("ETag") or cached.get("etag"),
+		"last_modified": resp.headers.get("Last-Modified") or cached.get("last_modified"),
+	}
+
+
+def _conditional_headers(cached: dict) -> dict:
+	headers = {}
+	if cached.get("etag"):
+		headers["If-None-Match"] = cached["etag"]
+	if cached.get("last_modified"):
+		headers["If-Modified-Since"] = cached["last_modified"]
+	return headers
+
+
+def fetch(url: str, cfg, session=None, html_only: bool = True, head_only: bool = False):
 	"""Fetch a URL and return ``(status_code, html, error, final_url)``.
 
 	Never raises -- any failure (SSRF rejection, timeout, non-HTML, oversized) is
@@ -319,7 +456,9 @@ def fetch(url: str, cfg, session=None, html_only: bool = True):
 	IP of every hop is re-validated by the SSRF guard; ``final_url`` is the URL that
 	actually served the body (post-redirect), so callers resolve relative links and
 	record provenance against the right host. Pass ``html_only=False`` to accept
-	non-HTML bodies (e.g. ``text/plain`` robots.txt).
+	non-HTML bodies (e.g. ``text/plain`` robots.txt), and ``head_only=True`` to stop
+	downloading shortly after the document ``<head>`` (see ``_read_capped``) when only
+	head metadata is needed.
 
 	SSRF note: each hop connects to the exact IP the guard validated for it
 	(``_pinned_get``), so a DNS-rebinding host (short TTL, alternating answers)
@@ -332,18 +471,34 @@ def fetch(url: str, cfg, session=None, html_only: bool = True):
 	max_bytes = int(cfg.setting("max_download_bytes")) if cfg else 3_000_000
 	retries = int(cfg.setting("retry_count")) if cfg else 2
 
+	cache = cfg.fetch_cache if cfg else None
+	cached = cache.get(url) if cache is not None else None
+	if cached is not None and not _cache_usable(cached, url, cfg, max_bytes, head_only):
+		cached = None
+	if cached is not None and cache.is_fresh(cached):
+		return _from_cache(cached, url, html_only, max_bytes)
+	# A stale entry is revalidated on the hop that originally served it.
+	revalidate = _conditional_headers(cached) if cached is not None else {}
+
 	own_session = session is None
 	session = session or build_session(cfg)
 	current = url
 	try:
 		for _hop in range(MAX_REDIRECTS + 1):
 			try:
-				ips = _validated_ips(current, cfg)
+				ips = _validated_ips(current, cfg, getattr(session, "dns_stats", None))
 			except SSRFError as exc:
 				return 0, "", f"blocked by SSRF guard: {exc}", current
 
 			# Redirects are followed manually (each hop re-validated and re-pinned).
-			resp = _pinned_get(session, current, ips[0], timeout, retries)
+			conditional = revalidate if revalidate and current == cached.get("final_url") else None
+			resp = _pinned_get(session, current, ips[0], timeout, retries, headers=conditional)
+
+			if conditional and resp.status_code == 304:
+				# Unchanged since the cached fetch: reuse the body, restart its freshness.
+				resp.close()
+				cache.set(url, {**cached, **_validators(resp, cached)})
+				return _from_cache(cached, url, html_only, max_bytes)
 
 			if resp.is_redirect or resp.is_permanent_redirect:
 				location = resp.headers.get("Location")
@@ -354,14 +509,29 @@ def fetch(url: str, cfg, session=None, html_only: bool = True):
 				continue
 
 			content_type = resp.headers.get("Content-Type", "").lower()
-			if html_only and content_type and not any(ct in content_type for ct in HTML_CONTENT_TYPES):
+			if html_only and not _is_html(content_type):
 				status = resp.status_code
 				resp.close()
 				return status, "", f"skipped non-HTML content-type: {content_type}", current
 
-			html = _read_capped(resp, max_bytes)
+			html, truncated = _read_capped(resp, max_bytes, head_only)
 			status = resp.status_code
 			resp.close()
+			# Transient errors (429, 5xx) are never cached, so the next fetch retries.
+			if cache is not None and (200 <= status < 300 or status in CACHED_ERROR_STATUSES):
+				cache.set(
+					url,
+					{
+						"status": status,
+						"final_url": current,
+						"content_type": content_type,
+						"html": html,
+						"truncated": truncated,
+						"max_bytes": max_bytes,
+						"head_only": head_only and truncated,
+						**_validators(resp),
+					},
+				)
 			return status, html, "", current
 
 		return 0, "", "too many redirects", current
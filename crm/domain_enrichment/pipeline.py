@@ -19,11 +19,12 @@ from urllib.parse import urlparse
 from . import extractors
 from .config import EnrichmentConfig, get_config
 from .crawler import crawl, probe_about_pages
-from .http import build_session
+from .http import build_session, dns_cache_stats
 from .result import EnrichmentResult, Field, Method
 
-# A preview only needs the document <head> (JSON-LD / OG / meta), which sits near the
-# top -- cap the download well below the full run's max_download_bytes.
+# A preview only needs the document <head> (JSON-LD / OG / meta): its fetch stops
+# shortly after </head>, and never reads past this cap (far below the full run's
+# max_download_bytes) on a page whose head never ends.
 PREVIEW_MAX_DOWNLOAD_BYTES = 512_000
 
 PROGRESS_STEPS = [
@@ -61,14 +62,15 @@ def preview(website: str, cfg: EnrichmentConfig = None) -> EnrichmentResult:
 	those are the full ``run`` path's job, which fires as a background job once the
 	record is saved, so spending synchronous request time on them here is wasted work.
 
-	Homepage-only (no crawl), short timeout, small download cap. SSRF is enforced by
+	Homepage-only (no crawl), short timeout, head-only download (the connection is
+	closed shortly after ``</head>``) under a small cap. SSRF is enforced by
 	``fetch`` inside ``crawl``. Never raises -- failures land in ``result.notes``.
 	"""
 	website = _normalize_website(website)
 	cfg = cfg or get_config()
 	result = EnrichmentResult(website=website)
 
-	# Bounded fetch: short preview timeout + head-sized download cap, homepage only.
+	# Bounded fetch: short preview timeout + head-only download, homepage only.
 	fetch_cfg = replace(
 		cfg,
 		settings={
@@ -80,16 +82,16 @@ def preview(website: str, cfg: EnrichmentConfig = None) -> EnrichmentResult:
 		},
 	)
 
-	crawled = crawl(website, fetch_cfg)
-	homepage, home_soup = crawled[0] if crawled else (None, None)
-	if home_soup is None:
+	crawled = crawl(website, fetch_cfg, head_only=True)
+	homepage, home_parsed = crawled[0] if crawled else (None, None)
+	if home_parsed is None:
 		result.notes.append(
 			(homepage.error if homepage else "") or extractors.READABILITY_MESSAGES["unreachable"]
 		)
 		return result
 
 	# Metadata only: name / description / logo / sameAs social links from the <head>.
-	company = extractors.extract_company_info(homepage, home_soup)
+	company = extractors.extract_company_info(homepage, home_parsed)
 	result.company_name = company.get("company_name") or Field()
 	result.description = company.get("description") or Field()
 	result.logo = company.get("logo") or Field()
@@ -124,8 +126,8 @@ def run(website: str, cfg: EnrichmentConfig = None, progress=None) -> Enrichment
 		# 1 + 2. Discover + crawl (BFS does both; reported together).
 		emit(0)
 		crawled = crawl(website, cfg, session=session, progress=lambda msg: emit(1, msg))
-		pages = [page for page, _soup in crawled]
-		soups_by_url = {page.url: soup for page, soup in crawled}
+		pages = [page for page, _parsed in crawled]
+		parsed_by_url = {page.url: parsed for page, parsed in crawled}
 		result.pages_crawled = [{"url": p.url, "status": p.status_code, "error": p.error} for p in pages]
 		result.errors = [{"url": p.url, "error": p.error} for p in pages if p.error]
 
@@ -140,33 +142,37 @@ def run(website: str, cfg: EnrichmentConfig = None, progress=None) -> Enrichment
 			result.notes.append(extractors.READABILITY_MESSAGES["empty"])
 
 		homepage = pages[0]
-		home_soup = soups_by_url.get(homepage.url)
+		home_parsed = parsed_by_url.get(homepage.url)
 
 		# If the BFS didn't surface an About page, probe the common paths -- it's the
 		# best source of a company description (and helps industry/contacts too). Only
 		# when the page budget allows more fetches, so the synchronous preview
 		# (max_pages=1) doesn't tie up a web worker on extra probes.
 		max_pages = int(cfg.setting("max_pages", 10) or 10)
-		if home_soup and len(pages) < max_pages and not any(extractors._is_about_page(p.url) for p in pages):
-			for page, soup in probe_about_pages(
+		if (
+			home_parsed
+			and len(pages) < max_pages
+			and not any(extractors._is_about_page(p.url) for p in pages)
+		):
+			for page, parsed in probe_about_pages(
 				homepage.url, cfg, session=session, skip_urls=[p.url for p in pages]
 			):
 				pages.append(page)
-				soups_by_url[page.url] = soup
+				parsed_by_url[page.url] = parsed
 				result.pages_crawled.append(
 					{"url": page.url, "status": page.status_code, "error": page.error}
 				)
 
 		# 3. Company information (each field carries provenance).
 		emit(2)
-		company = extractors.extract_company_info(homepage, home_soup) if home_soup else {}
+		company = extractors.extract_company_info(homepage, home_parsed) if home_parsed else {}
 		result.company_name = company.get("company_name") or Field()
 		result.logo = company.get("logo") or Field()
 		result.image = company.get("image") or Field()
 		result.description = (
 			extractors.select_description(
 				pages,
-				soups_by_url,
+				parsed_by_url,
 				industry_rules=cfg.rules("Industry"),
 				company_name=result.company_name.value,
 			)
@@ -180,7 +186,7 @@ def run(website: str, cfg: EnrichmentConfig = None, progress=None) -> Enrichment
 		result.phones = extractors.extract_phones(pages)
 		result.social_profiles = extractors.extract_social_profiles(
 			pages,
-			soups_by_url,
+			parsed_by_url,
 			cfg.rules("Social"),
 			extra_links=company.get("social_links"),
 		)
@@ -196,4 +202,5 @@ def run(website: str, cfg: EnrichmentConfig = None, progress=None) -> Enrichment
 		emit(6)
 		return result
 	finally:
+		result.dns_cache = dns_cache_stats(session.dns_stats)
 		session.close()
@@ -98,6 +98,7 @@ class EnrichmentResult:
 	pages_crawled: list = field(default_factory=list)
 	errors: list = field(default_factory=list)
 	notes: list = field(default_factory=list)  # human-readable warnings
+	dns_cache: dict = field(default_factory=dict)  # resolver cache hits/misses of the run
 
 	def to_dict(self):
 		"""Render the canonical JSON schema. Every field is explainable: scalar
@@ -118,6 +119,7 @@ class EnrichmentResult:
 				"pages_crawled": self.pages_crawled,
 				"errors": self.errors,
 				"notes": self.notes,
+				"dns_cache": self.dns_cache,
 			},
 		}
 
@@ -9,8 +9,9 @@ to the origin document, and publishes a terminal event. It NEVER raises to the
 worker -- every failure is recorded on the Run, logged via ``frappe.log_error`` and
 reported over realtime.
 
-``write_run`` is the ONLY place that persists run history, so the storage choice
-(standalone Run doctype today) stays swappable.
+``write_run`` (and its bulk counterpart ``write_runs``) is the ONLY place that
+persists run history, so the storage choice (standalone Run doctype today) stays
+swappable.
 """
 
 from __future__ import annotations
@@ -53,7 +54,26 @@ def _publish(reference_doctype, reference_name, status, message="", step=0, payl
 		pass
 
 
-def write_run(
+# CRM Enrichment Run columns set by the run writers, beyond the standard ones.
+RUN_FIELDS = (
+	"reference_doctype",
+	"reference_name",
+	"source_website",
+	"status",
+	"started_on",
+	"finished_on",
+	"notes",
+	"company_name",
+	"industry",
+	"industry_confidence",
+	"emails_found",
+	"phones_found",
+	"social_profiles",
+	"raw_json",
+)
+
+
+def run_values(
 	reference_doctype: str,
 	reference_name: str,
 	website: str,
@@ -61,42 +81,96 @@ def write_run(
 	result=None,
 	started_on=None,
 	notes: str = "",
-):
-	"""Persist exactly one ``CRM Enrichment Run`` from an ``EnrichmentResult``.
+) -> dict:
+	"""The ``RUN_FIELDS`` of one ``CRM Enrichment Run``, built from an ``EnrichmentResult``.
 
-	The single point of run-history writing -- storage stays swappable behind it.
 	When ``result`` is given the summary fields + ``raw_json`` (full ``to_dict()``)
-	are populated; otherwise a bare Run (status/website) is written.
+	are populated; otherwise a bare Run (status/website) is described.
 	"""
-	doc = frappe.new_doc("CRM Enrichment Run")
-	doc.reference_doctype = reference_doctype
-	doc.reference_name = reference_name
-	doc.source_website = website
-	doc.status = status
-	doc.started_on = started_on or frappe.utils.now_datetime()
-	if status in ("Completed", "Failed"):
-		doc.finished_on = frappe.utils.now_datetime()
-	if notes:
-		doc.notes = notes
+	values = {
+		"reference_doctype": reference_doctype,
+		"reference_name": reference_name,
+		"source_website": website,
+		"status": status,
+		"started_on": started_on or frappe.utils.now_datetime(),
+		"finished_on": frappe.utils.now_datetime() if status in ("Completed", "Failed") else None,
+		"notes": notes or None,
+		"company_name": None,
+		"industry": None,
+		"industry_confidence": 0,
+		"emails_found": 0,
+		"phones_found": 0,
+		"social_profiles": None,
+		"raw_json": None,
+	}
 
 	if result is not None:
 		# extract_social_profiles pre-seeds an empty entry per configured rule; only
 		# summarise the networks that were actually found.
 		social = ", ".join(sorted(k for k, v in result.social_profiles.items() if v.value))
-		doc.company_name = result.company_name.value or ""
-		doc.industry = result.industry.value or ""
-		doc.industry_confidence = result.industry_confidence or 0
-		doc.emails_found = len(result.emails)
-		doc.phones_found = len(result.phones)
-		doc.social_profiles = social
-		doc.raw_json = frappe.as_json(result.to_dict())
+		values.update(
+			company_name=result.company_name.value or "",
+			industry=result.industry.value or "",
+			industry_confidence=result.industry_confidence or 0,
+			emails_found=len(result.emails),
+			phones_found=len(result.phones),
+			social_profiles=social,
+			raw_json=frappe.as_json(result.to_dict()),
+		)
 		if not notes and result.notes:
-			doc.notes = "\n".join(result.notes)
+			values["notes"] = "\n".join(result.notes)
+
+	return values
 
+
+def write_run(
+	reference_doctype: str,
+	reference_name: str,
+	website: str,
+	status: str,
+	result=None,
+	started_on=None,
+	notes: str = "",
+):
+	"""Persist exactly one ``CRM Enrichment Run`` from an ``EnrichmentResult``.
+
+	The single point of run-history writing for one record -- storage stays swappable
+	behind it (and ``write_runs`` for bulk).
+	"""
+	doc = frappe.new_doc("CRM Enrichment Run")
+	doc.update(run_values(reference_doctype, reference_name, website, status, result, started_on, notes))
 	doc.insert(ignore_permissions=True)
 	return doc.name
 
 
+def write_runs(runs: list[dict]) -> None:
+	"""Persist many ``CRM Enrichment Run`` rows (``run_values`` dicts) in one insert.
+
+	The bulk counterpart of ``write_run``. Skips the per-document insert cycle --
+	the Run doctype is an append-only log with no controller hooks.
+	"""
+	if not runs:
+		return
+
+	timestamp = frappe.utils.now()
+	user = frappe.session.user
+	frappe.db.bulk_insert(
+		"CRM Enrichment Run",
+		fields=("name", "creation", "modified", "owner", "modified_by", *RUN_FIELDS),
+		values=[
+			(
+				frappe.generate_hash(length=10),
+				timestamp,
+				timestamp,
+				user,
+				user,
+				*(run[fieldname] for fieldname in RUN_FIELDS),
+			)
+			for run in runs
+		],
+	)
+
+
 def enqueue_enrichment(
 	reference_doctype: str, reference_name: str, website: str, user: str, trigger: str = "manual"
 ) -> dict:
@@ -14,10 +14,8 @@ from __future__ import annotations
 
 import re
 
-from bs4 import BeautifulSoup
-
 from crm.domain_enrichment.config import EnrichmentConfig, Mapping, Rule
-from crm.domain_enrichment.crawler import extract_content
+from crm.domain_enrichment.document import parse_page
 from crm.domain_enrichment.result import CrawledPage
 
 # --------------------------------------------------------------------------- #
@@ -155,14 +153,14 @@ MALICIOUS_DOCTYPE_XML = """<?xml version="1.0"?>
 
 
 def fake_fetch(responses):
-	"""Build a ``fetch(url, cfg, session=None, html_only=True)`` stub keyed by exact URL.
+	"""Build a ``fetch(url, cfg, session=None, html_only=True, head_only=False)`` stub keyed by exact URL.
 
 	``responses`` maps url -> (status, body) for a 200-shaped response. A URL absent
 	from the map behaves like a 404 (mirrors a missing sitemap/robots.txt), so tests
 	only need to declare the endpoints they care about.
 	"""
 
-	def fake(url, cfg, session=None, html_only=True):
+	def fake(url, cfg, session=None, html_only=True, head_only=False):
 		entry = responses.get(url)
 		if entry is None:
 			return 404, "", "not found", url
@@ -179,7 +177,7 @@ def fake_fetch_with_redirects(responses, redirects):
 	"""
 	base = fake_fetch(responses)
 
-	def fake(url, cfg, session=None, html_only=True):
+	def fake(url, cfg, session=None, html_only=True, head_only=False):
 		status, body, error, final_url = base(url, cfg, session=session, html_only=html_only)
 		return status, body, error, redirects.get(url, final_url)
 
@@ -190,22 +188,18 @@ def fake_fetch_with_redirects(responses, redirects):
 # Page helper
 # --------------------------------------------------------------------------- #
 def make_page(url, html, status_code=200):
-	"""Build a (CrawledPage, soup) pair from raw HTML, exactly as the crawler does.
-
-	``extract_content`` mutates its soup, so it is given a throwaway parse and the
-	returned ``soup`` is a fresh, unmutated DOM (mirrors ``crawler.crawl_page``).
-	"""
-	soup = BeautifulSoup(html, "html.parser")
-	content = extract_content(BeautifulSoup(html, "html.parser"))
+	"""Build a (CrawledPage, ParsedPage) pair from raw HTML, exactly as
+	``crawler.crawl_page`` does."""
+	parsed = parse_page(html)
 	page = CrawledPage(
 		url=url,
 		status_code=status_code,
 		html=html,
-		text=content["text"],
-		title=content["title"],
-		headings=content["headings"],
+		text=parsed.text,
+		title=parsed.title,
+		headings=parsed.headings,
 	)
-	return page, soup
+	return page, parsed
 
 
 # --------------------------------------------------------------------------- #
@@ -214,7 +208,7 @@ def make_page(url, html, status_code=200):
 def _compile(pattern, is_regex):
 	if is_regex:
 		return re.compile(pattern, re.IGNORECASE)
-	return re.compile(re.escape(pattern), re.IGNORECASE)
+	return re.compile(rf"\b{re.escape(pattern)}\b", re.IGNORECASE)
 
 
 def keyword_rule(rule_type, patterns, *, target_value="", industry="", weight=1.0, match_scope="Full Text"):
@@ -227,6 +221,7 @@ def keyword_rule(rule_type, patterns, *, target_value="", industry="", weight=1.
 		weight=weight,
 		match_scope=match_scope,
 		patterns=compiled,
+		keywords=list(patterns),
 	)
 
 
@@ -239,6 +234,7 @@ def regex_rule(rule_type, patterns, *, target_value="", weight=1.0, match_scope=
 		weight=weight,
 		match_scope=match_scope,
 		patterns=compiled,
+		regexes=[rx for rx, _raw in compiled],
 	)
 
 
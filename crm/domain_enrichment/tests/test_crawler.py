@@ -5,20 +5,21 @@
 
 Covers URL normalization, the same-site/registrable-domain check, link-priority
 ordering (config-driven keywords), the crawlable filter (asset/scheme/skip-pattern
-rejection) and ``extract_content`` (title/headings/visible text).
+rejection), the heap frontier and the crawl loop.
 """
 
 from __future__ import annotations
 
+import threading
 from unittest import mock
 
 from frappe.tests import UnitTestCase
 
 from crm.domain_enrichment import crawler
 from crm.domain_enrichment.crawler import (
+	Frontier,
 	_is_crawlable,
 	_link_priority,
-	extract_content,
 	normalize_url,
 	registrable_domain,
 	same_site,
@@ -127,6 +128,58 @@ class LinkPriorityTest(UnitTestCase):
 		self.assertLess(about_page, news_article)
 
 
+class FrontierTest(UnitTestCase):
+	def test_pops_homepage_then_priority_then_insertion_order(self):
+		frontier = Frontier(PRIORITY)
+		frontier.push("https://acme.example/blog", 1)
+		frontier.push("https://acme.example/pricing", 1)
+		frontier.push("https://acme.example/team", 1)
+		frontier.push("https://acme.example", 0)
+		frontier.push("https://acme.example/about-us", 2)
+		popped = [frontier.pop() for _ in range(len(frontier))]
+		self.assertEqual(
+			popped,
+			[
+				("https://acme.example", 0),
+				("https://acme.example/about-us", 2),
+				("https://acme.example/team", 1),
+				("https://acme.example/blog", 1),
+				("https://acme.example/pricing", 1),
+			],
+		)
+
+	def test_url_is_queued_only_once(self):
+		frontier = Frontier(PRIORITY)
+		self.assertTrue(frontier.push("https://acme.example/contact", 1))
+		self.assertFalse(frontier.push("https://acme.example/contact", 2, "Contact us"))
+		self.assertEqual(len(frontier), 1)
+		frontier.pop()
+		self.assertIn("https://acme.example/contact", frontier)
+		self.assertFalse(frontier.push("https://acme.example/contact", 1))
+
+	def test_better_anchored_push_requeues_sitemap_seed(self):
+		frontier = Frontier(PRIORITY)
+		# sitemap seeds carry no anchor text
+		frontier.push("https://acme.example/blog", 1)
+		frontier.push("https://acme.example/p/123", 1)
+		frontier.push("https://acme.example/pricing", 1)
+		# the homepage then links the seed as "About us"
+		self.assertTrue(frontier.push("https://acme.example/p/123", 1, "About us"))
+		self.assertFalse(frontier.push("https://acme.example/p/123", 2, "More"))
+		self.assertEqual(len(frontier), 3)
+
+		popped = [frontier.pop() for _ in range(len(frontier))]
+		self.assertEqual(
+			popped,
+			[
+				("https://acme.example/p/123", 1),
+				("https://acme.example/blog", 1),
+				("https://acme.example/pricing", 1),
+			],
+		)
+		self.assertEqual(len(frontier), 0)
+
+
 class IsCrawlableTest(UnitTestCase):
 	def test_rejects_non_http_schemes(self):
 		self.assertFalse(_is_crawlable("mailto:a@b.com", []))
@@ -151,24 +204,6 @@ class IsCrawlableTest(UnitTestCase):
 		self.assertFalse(_is_crawlable("https://x.com/[bad", ["[bad"]))
 
 
-class ExtractContentTest(UnitTestCase):
-	def test_pulls_title_headings_and_text(self):
-		_page, soup = fixtures.make_page("https://acme.example", fixtures.HOMEPAGE)
-		content = extract_content(soup)
-		self.assertEqual(content["title"], "Acme Analytics | AI powered SaaS")
-		self.assertIn("AI powered analytics", content["headings"])
-		self.assertIn("hello@acme.example", content["text"])
-
-	def test_strips_script_and_style(self):
-		html = (
-			"<html><head><style>.x{}</style></head><body><script>var x=1</script><p>Visible</p></body></html>"
-		)
-		_page, soup = fixtures.make_page("https://x.com", html)
-		content = extract_content(soup)
-		self.assertIn("Visible", content["text"])
-		self.assertNotIn("var x", content["text"])
-
-
 class ParseSitemapTest(UnitTestCase):
 	def test_parses_urlset(self):
 		kind, locs = crawler._parse_sitemap(fixtures.URLSET_XML)
@@ -312,7 +347,7 @@ class CrawlSitemapSeedingTest(UnitTestCase):
 		)
 		with mock.patch.object(crawler, "fetch", side_effect=fixtures.fake_fetch(self._responses())):
 			results = crawler.crawl("https://acme.example", cfg)
-		urls = [page.url for page, _soup in results]
+		urls = [page.url for page, _parsed in results]
 		self.assertEqual(urls[0], "https://acme.example")
 		self.assertIn("https://acme.example/hidden-about", urls)
 		self.assertIn("https://acme.example/contact", urls)
@@ -325,7 +360,7 @@ class CrawlSitemapSeedingTest(UnitTestCase):
 		)
 		with mock.patch.object(crawler, "fetch", side_effect=fixtures.fake_fetch(self._responses())):
 			results = crawler.crawl("https://acme.example", cfg)
-		urls = [page.url for page, _soup in results]
+		urls = [page.url for page, _parsed in results]
 		self.assertEqual(urls[0], "https://acme.example")
 		self.assertNotIn("https://acme.example/hidden-about", urls)
 		self.assertIn("https://acme.example/contact", urls)
@@ -342,7 +377,7 @@ class CrawlSitemapSeedingTest(UnitTestCase):
 		)
 		with mock.patch.object(crawler, "fetch", side_effect=fixtures.fake_fetch(responses)):
 			results = crawler.crawl("https://acme.example", cfg)
-		urls = [page.url for page, _soup in results]
+		urls = [page.url for page, _parsed in results]
 		self.assertEqual(urls[0], "https://acme.example")
 		self.assertIn("https://acme.example/contact", urls)
 		self.assertNotIn("https://acme.example/hidden-about", urls)
@@ -379,7 +414,7 @@ class RedirectDedupTest(UnitTestCase):
 			crawler, "fetch", side_effect=fixtures.fake_fetch_with_redirects(responses, redirects)
 		):
 			results = crawler.crawl("https://acme.example", cfg)
-		urls = [page.url for page, _soup in results]
+		urls = [page.url for page, _parsed in results]
 		self.assertEqual(urls.count("https://acme.example/contact"), 1)
 		# The freed budget slot means /team -- otherwise starved by the wasted
 		# duplicate fetch -- still gets crawled.
@@ -414,7 +449,7 @@ class OffSiteRedirectScopeTest(UnitTestCase):
 		):
 			results = crawler.crawl("https://jpm-test.com", cfg)
 		offsite = next(
-			page for page, _soup in results if page.url == "https://reports.jpmchase-test.com/ir/2022.htm"
+			page for page, _parsed in results if page.url == "https://reports.jpmchase-test.com/ir/2022.htm"
 		)
 		self.assertTrue(offsite.error)
 		self.assertEqual(offsite.html, "")
@@ -422,7 +457,7 @@ class OffSiteRedirectScopeTest(UnitTestCase):
 
 	def test_offsite_redirect_clears_title_and_headings(self):
 		# title/headings are parsed by crawl_page() before the off-site check runs,
-		# so clearing html/text/soup alone isn't enough -- extractors that read
+		# so clearing html/text/parsed page alone isn't enough -- extractors that read
 		# title/headings straight off the CrawledPage (e.g. classify_industry's
 		# About-page lookup) would otherwise still see off-site content.
 		homepage_html = '<html><body><a href="/about">About</a></body></html>'
@@ -444,7 +479,7 @@ class OffSiteRedirectScopeTest(UnitTestCase):
 			crawler, "fetch", side_effect=fixtures.fake_fetch_with_redirects(responses, redirects)
 		):
 			results = crawler.crawl("https://jpm-test.com", cfg)
-		offsite = next(page for page, _soup in results if page.url == "https://widgetco-test.com/about")
+		offsite = next(page for page, _parsed in results if page.url == "https://widgetco-test.com/about")
 		self.assertTrue(offsite.error)
 		self.assertEqual(offsite.title, "")
 		self.assertEqual(offsite.headings, [])
@@ -465,3 +500,85 @@ class OffSiteRedirectScopeTest(UnitTestCase):
 			results = crawler.crawl("https://old-home-test.com", cfg)
 		self.assertEqual(results[0][0].url, "https://new-home-test.com")
 		self.assertFalse(results[0][0].error)
+
+
+class ConcurrentCrawlTest(UnitTestCase):
+	"""crawl_concurrency > 1 overlaps fetches but must not change which pages are
+	crawled, their order (homepage first), or the max_pages budget."""
+
+	HOMEPAGE_HTML = (
+		'<html><body><a href="/about">About</a><a href="/contact">Contact</a>'
+		'<a href="/team">Team</a><a href="/blog">Blog</a><a href="/pricing">Pricing</a></body></html>'
+	)
+
+	def _responses(self):
+		responses = {"https://acme.example": (200, self.HOMEPAGE_HTML)}
+		for path in ("about", "contact", "team", "blog", "pricing"):
+			responses[f"https://acme.example/{path}"] = (200, f"<html><body>{path}</body></html>")
+		return responses
+
+	def _crawl(self, fetch, **settings):
+		cfg = make_config(
+			settings={"max_pages": 10, "max_depth": 1, "use_sitemap": 0, **settings},
+			link_priority=PRIORITY,
+			skip_patterns=[],
+		)
+		with mock.patch.object(crawler, "fetch", side_effect=fetch):
+			return [page.url for page, _parsed in crawler.crawl("https://acme.example", cfg)]
+
+	def test_same_pages_and_order_as_sequential_crawl(self):
+		fetch = fixtures.fake_fetch(self._responses())
+		sequential = self._crawl(fetch, crawl_concurrency=1)
+		concurrent = self._crawl(fetch, crawl_concurrency=4)
+		self.assertEqual(concurrent, sequential)
+		self.assertEqual(concurrent[0], "https://acme.example")
+
+	def test_in_flight_fetches_count_against_max_pages(self):
+		urls = self._crawl(fixtures.fake_fetch(self._responses()), crawl_concurrency=4, max_pages=3)
+		self.assertEqual(
+			urls, ["https://acme.example", "https://acme.example/about", "https://acme.example/contact"]
+		)
+
+	def test_pages_are_fetched_in_parallel(self):
+		# Every non-homepage fetch waits until all of them are in flight at once, which
+		# only a concurrent crawl can satisfy before the barrier times out.
+		barrier = threading.Barrier(5, timeout=5)
+		responses = self._responses()
+		base = fixtures.fake_fetch(responses)
+
+		def fetch(url, cfg, session=None, html_only=True, head_only=False):
+			if url in responses and url != "https://acme.example":
+				barrier.wait()
+			return base(url, cfg, session=session, html_only=html_only)
+
+		urls = self._crawl(fetch, crawl_concurrency=5)
+		self.assertEqual(len(urls), 6)
+		self.assertFalse(barrier.broken)
+
+
+class ProbeAboutPagesTest(UnitTestCase):
+	ABOUT_HTML = "<html><body>" + "<p>We build analytics for retailers.</p>" * 20 + "</body></html>"
+
+	def _probe(self, about_path="/about-us", **settings):
+		cfg = make_config(settings=settings)
+		responses = {f"https://acme.example{about_path}": (200, self.ABOUT_HTML)} if about_path else {}
+		with (
+			mock.patch.object(crawler, "load_robots", return_value=None),
+			mock.patch.object(crawler, "fetch", side_effect=fixtures.fake_fetch(responses)) as fetch,
+		):
+			pages = crawler.probe_about_pages("https://acme.example", cfg)
+		return pages, sorted(call.args[0] for call in fetch.call_args_list)
+
+	def test_stops_after_the_wave_with_a_hit(self):
+		pages, fetched = self._probe(crawl_concurrency=2)
+		self.assertEqual([page.url for page, _parsed in pages], ["https://acme.example/about-us"])
+		self.assertEqual(fetched, ["https://acme.example/about", "https://acme.example/about-us"])
+
+	def test_one_at_a_time_stops_at_the_hit(self):
+		_pages, fetched = self._probe(crawl_concurrency=1)
+		self.assertEqual(fetched, ["https://acme.example/about", "https://acme.example/about-us"])
+
+	def test_no_hit_probes_every_path(self):
+		pages, fetched = self._probe(about_path=None, crawl_concurrency=3)
+		self.assertEqual(pages, [])
+		self.assertEqual(len(fetched), len(crawler.ABOUT_PROBE_PATHS))
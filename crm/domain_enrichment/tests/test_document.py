@@ -0,0 +1,76 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and contributors
+# For license information, please see license.txt
+
+"""Pure unit tests for the parse-once page model (``document.parse_page``): title,
+headings, visible text, links, meta/link tags, JSON-LD and body paragraphs."""
+
+from __future__ import annotations
+
+from bs4 import BeautifulSoup
+from frappe.tests import UnitTestCase
+
+from crm.domain_enrichment.document import PARSER, parse_page
+from crm.domain_enrichment.tests import fixtures
+
+
+class ParsePageTest(UnitTestCase):
+	def test_pulls_title_headings_and_text(self):
+		parsed = parse_page(fixtures.HOMEPAGE)
+		self.assertEqual(parsed.title, "Acme Analytics | AI powered SaaS")
+		self.assertIn("AI powered analytics", parsed.headings)
+		self.assertIn("hello@acme.example", parsed.text)
+
+	def test_strips_script_and_style(self):
+		html = (
+			"<html><head><style>.x{}</style></head><body><script>var x=1</script><p>Visible</p></body></html>"
+		)
+		parsed = parse_page(html)
+		self.assertIn("Visible", parsed.text)
+		self.assertNotIn("var x", parsed.text)
+
+	def test_text_matches_get_text_without_invisible_tags(self):
+		"""One walk yields what the decompose-then-get_text extraction did"""
+		for html in (fixtures.HOMEPAGE, fixtures.BROKEN_JSON_LD):
+			soup = BeautifulSoup(html, PARSER)
+			headings = [h.get_text(" ", strip=True) for h in soup.find_all(["h1", "h2", "h3"])]
+			for node in soup(["script", "style", "noscript", "template", "svg"]):
+				node.decompose()
+
+			parsed = parse_page(html)
+			self.assertEqual(parsed.text, " ".join(soup.get_text(" ", strip=True).split()))
+			self.assertEqual(parsed.headings, [h for h in headings if h])
+
+	def test_indexes_links_and_head_tags(self):
+		parsed = parse_page(
+			"<html><head>"
+			"<meta property='og:title' content=''><meta name='og:title' content='Named'>"
+			"<meta name='description' content='First'><meta name='description' content='Second'>"
+			"<link rel='icon' href='/fav.png' sizes='16x16'><link rel='stylesheet'>"
+			"</head><body><a href='/about'>About <b>us</b></a><a>no href</a></body></html>"
+		)
+		self.assertEqual(parsed.links, [("/about", "About us")])
+		self.assertEqual([tag["href"] for tag in parsed.link_tags], ["/fav.png"])
+		# The first property tag wins even when empty, like soup.find() on each attribute.
+		self.assertEqual(parsed.meta_content("og:title"), "")
+		self.assertEqual(parsed.meta_content("description"), "First")
+
+	def test_paragraphs_skip_page_chrome(self):
+		parsed = parse_page(
+			"<html><body><nav><p>Menu item</p></nav><main><p>Body  copy\n here</p></main>"
+			"<footer><div><p>Footer</p></div></footer></body></html>"
+		)
+		self.assertEqual(parsed.paragraphs, ["Body copy here"])
+
+
+class JsonLdTest(UnitTestCase):
+	def test_parses_graph_blocks(self):
+		parsed = parse_page(
+			'<html><head><script type="application/ld+json">'
+			'{"@graph":[{"@type":"Organization","name":"A"},{"@type":"WebSite"}]}'
+			"</script></head><body></body></html>",
+		)
+		self.assertEqual(len(parsed.json_ld), 2)
+		self.assertEqual(parsed.json_ld[0]["name"], "A")
+
+	def test_ignores_invalid_json(self):
+		self.assertEqual(parse_page(fixtures.BROKEN_JSON_LD).json_ld, [])
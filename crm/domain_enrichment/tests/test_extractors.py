@@ -6,7 +6,7 @@
 The classifiers (industry / social) are exercised with **in-memory Rule objects**
 built directly (see ``tests.fixtures``), never the DB — this is the rule-driven
 rewrite of the POC's extractor tests. The mechanics (company-name cleaning, favicon
-scorer, JSON-LD parse, email/phone extraction, readability diagnosis) are tested
+scorer, JSON-LD typing, email/phone extraction, readability diagnosis) are tested
 standalone.
 """
 
@@ -20,13 +20,13 @@ from crm.domain_enrichment.tests import fixtures
 
 
 def _pages(*specs):
-	"""specs: (url, html) tuples -> list[CrawledPage], soups_by_url dict."""
-	pages, soups = [], {}
+	"""specs: (url, html) tuples -> list[CrawledPage], parsed_by_url dict."""
+	pages, parsed_by_url = [], {}
 	for url, html in specs:
-		page, soup = fixtures.make_page(url, html)
+		page, parsed = fixtures.make_page(url, html)
 		pages.append(page)
-		soups[url] = soup
-	return pages, soups
+		parsed_by_url[url] = parsed
+	return pages, parsed_by_url
 
 
 # --------------------------------------------------------------------------- #
@@ -34,50 +34,50 @@ def _pages(*specs):
 # --------------------------------------------------------------------------- #
 class CompanyInfoTest(UnitTestCase):
 	def setUp(self):
-		self.page, self.soup = fixtures.make_page("https://acme.example", fixtures.HOMEPAGE)
+		self.page, self.parsed = fixtures.make_page("https://acme.example", fixtures.HOMEPAGE)
 
 	def test_prefers_json_ld_for_name(self):
-		info = extractors.extract_company_info(self.page, self.soup)
+		info = extractors.extract_company_info(self.page, self.parsed)
 		self.assertEqual(info["company_name"].value, "Acme Analytics Inc.")
 		self.assertEqual(info["company_name"].method, Method.JSON_LD)
 		self.assertEqual(info["company_name"].source, "https://acme.example")
 
 	def test_description_from_json_ld(self):
-		info = extractors.extract_company_info(self.page, self.soup)
+		info = extractors.extract_company_info(self.page, self.parsed)
 		self.assertIn("analytics", info["description"].value.lower())
 
 	def test_logo_is_link_icon_not_json_ld_image(self):
 		# The company logo is the link icon (HOMEPAGE declares none -> favicon.ico
 		# fallback), NOT the JSON-LD Organization.logo. That image is kept separately.
-		info = extractors.extract_company_info(self.page, self.soup)
+		info = extractors.extract_company_info(self.page, self.parsed)
 		self.assertEqual(info["logo"].method, Method.FAVICON)
 		self.assertEqual(info["logo"].value, "https://acme.example/favicon.ico")
 		self.assertEqual(info["image"].method, Method.JSON_LD)
 		self.assertEqual(info["image"].value, "https://acme.example/ld-logo.png")
 
 	def test_logo_prefers_declared_apple_touch_icon(self):
-		page, soup = fixtures.make_page(
+		page, parsed = fixtures.make_page(
 			"https://x.example",
 			"<html><head>"
 			"<link rel='icon' href='/fav.png' sizes='16x16'>"
 			"<link rel='apple-touch-icon' href='/touch.png'>"
 			"</head><body></body></html>",
 		)
-		info = extractors.extract_company_info(page, soup)
+		info = extractors.extract_company_info(page, parsed)
 		self.assertEqual(info["logo"].value, "https://x.example/touch.png")
 
 	def test_meta_fallback_when_no_json_ld(self):
-		page, soup = fixtures.make_page(
+		page, parsed = fixtures.make_page(
 			"https://x.example",
 			"<html><head><title>Foo</title><meta property='og:site_name' content='Foo Inc'></head><body></body></html>",
 		)
-		info = extractors.extract_company_info(page, soup)
+		info = extractors.extract_company_info(page, parsed)
 		self.assertEqual(info["company_name"].value, "Foo Inc")
 		self.assertEqual(info["company_name"].method, Method.META_TAG)
 
 	def test_broken_json_ld_does_not_crash(self):
-		page, soup = fixtures.make_page("https://b.example", fixtures.BROKEN_JSON_LD)
-		info = extractors.extract_company_info(page, soup)
+		page, parsed = fixtures.make_page("https://b.example", fixtures.BROKEN_JSON_LD)
+		info = extractors.extract_company_info(page, parsed)
 		self.assertEqual(info["company_name"].method, Method.TITLE_TAG)
 
 
@@ -86,50 +86,50 @@ class LogoResolutionTest(UnitTestCase):
 	captured by extract_image, never used as the logo."""
 
 	def test_scalable_svg_beats_small_png(self):
-		_p, soup = fixtures.make_page(
+		_p, parsed = fixtures.make_page(
 			"https://x.example",
 			"<html><head>"
 			"<link rel='icon' type='image/png' href='/fav-32.png' sizes='32x32'>"
 			"<link rel='icon' type='image/svg+xml' href='/logo.svg'>"
 			"</head><body></body></html>",
 		)
-		logo = extractors.extract_logo(soup, "https://x.example")
+		logo = extractors.extract_logo(parsed, "https://x.example")
 		self.assertEqual(logo.value, "https://x.example/logo.svg")
 		self.assertEqual(logo.method, Method.FAVICON)
 
 	def test_logo_is_link_icon_even_when_og_image_exists(self):
 		# A declared link icon is the logo; the bigger og:image is NOT the logo -- it
 		# is captured as the image instead.
-		_p, soup = fixtures.make_page(
+		_p, parsed = fixtures.make_page(
 			"https://x.example",
 			"<html><head>"
 			"<link rel='icon' href='/fav.ico' sizes='16x16'>"
 			"<meta property='og:image' content='https://x.example/social-1200.png'>"
 			"</head><body></body></html>",
 		)
-		logo = extractors.extract_logo(soup, "https://x.example")
+		logo = extractors.extract_logo(parsed, "https://x.example")
 		self.assertEqual(logo.value, "https://x.example/fav.ico")
 		self.assertEqual(logo.method, Method.FAVICON)
-		image = extractors.extract_image(soup, "https://x.example")
+		image = extractors.extract_image(parsed, "https://x.example")
 		self.assertEqual(image.value, "https://x.example/social-1200.png")
 		self.assertEqual(image.method, Method.META_TAG)
 
 	def test_falls_back_to_favicon_ico_ignoring_og_image(self):
 		# No link icon declared -> favicon.ico, even though an og:image exists.
-		_p, soup = fixtures.make_page(
+		_p, parsed = fixtures.make_page(
 			"https://x.example",
 			"<html><head>"
 			"<meta property='og:image' content='https://x.example/banner.png'>"
 			"</head><body></body></html>",
 		)
-		logo = extractors.extract_logo(soup, "https://x.example")
+		logo = extractors.extract_logo(parsed, "https://x.example")
 		self.assertEqual(logo.value, "https://x.example/favicon.ico")
 		self.assertEqual(logo.method, Method.FAVICON)
 
 	def test_image_prefers_json_ld_logo_over_og_image(self):
 		# extract_image keeps the old "best big image" priority: curated JSON-LD logo
 		# outranks a social-share og:image.
-		_p, soup = fixtures.make_page(
+		_p, parsed = fixtures.make_page(
 			"https://x.example",
 			"<html><head>"
 			'<script type="application/ld+json">'
@@ -137,40 +137,40 @@ class LogoResolutionTest(UnitTestCase):
 			"<meta property='og:image' content='https://x.example/banner.png'>"
 			"</head><body></body></html>",
 		)
-		image = extractors.extract_image(soup, "https://x.example")
+		image = extractors.extract_image(parsed, "https://x.example")
 		self.assertEqual(image.value, "https://x.example/brand.png")
 		self.assertEqual(image.method, Method.JSON_LD)
 
 	def test_image_empty_when_none_declared(self):
-		_p, soup = fixtures.make_page("https://x.example", "<html><head></head><body></body></html>")
-		self.assertEqual(extractors.extract_image(soup, "https://x.example").value, "")
+		_p, parsed = fixtures.make_page("https://x.example", "<html><head></head><body></body></html>")
+		self.assertEqual(extractors.extract_image(parsed, "https://x.example").value, "")
 
 	def test_falls_back_to_favicon_ico(self):
-		_p, soup = fixtures.make_page("https://x.example", "<html><head></head><body></body></html>")
-		logo = extractors.extract_logo(soup, "https://x.example")
+		_p, parsed = fixtures.make_page("https://x.example", "<html><head></head><body></body></html>")
+		logo = extractors.extract_logo(parsed, "https://x.example")
 		self.assertEqual(logo.value, "https://x.example/favicon.ico")
 		self.assertEqual(logo.method, Method.FAVICON)
 
 	def test_rejects_unsafe_scheme_in_icon(self):
 		# A crawled site injecting a javascript: icon href must not be stored as the
 		# logo -- it is skipped and the safe favicon.ico fallback is used.
-		_p, soup = fixtures.make_page(
+		_p, parsed = fixtures.make_page(
 			"https://x.example",
 			"<html><head><link rel='icon' href='javascript:alert(1)'></head><body></body></html>",
 		)
-		logo = extractors.extract_logo(soup, "https://x.example")
+		logo = extractors.extract_logo(parsed, "https://x.example")
 		self.assertEqual(logo.value, "https://x.example/favicon.ico")
 
 	def test_rejects_unsafe_scheme_in_image(self):
 		# javascript:/data: in JSON-LD logo or og:image is dropped, never stored.
-		_p, soup = fixtures.make_page(
+		_p, parsed = fixtures.make_page(
 			"https://x.example",
 			"<html><head>"
 			'<script type="application/ld+json">{"@type":"Organization","logo":"javascript:evil()"}</script>'
 			"<meta property='og:image' content='data:image/svg+xml;base64,PHN2Zz4='>"
 			"</head><body></body></html>",
 		)
-		self.assertEqual(extractors.extract_image(soup, "https://x.example").value, "")
+		self.assertEqual(extractors.extract_image(parsed, "https://x.example").value, "")
 
 
 class CompanyNameCleaningTest(UnitTestCase):
@@ -202,26 +202,9 @@ class CompanyNameCleaningTest(UnitTestCase):
 		)
 
 
-class JsonLdTest(UnitTestCase):
-	def test_parses_graph_blocks(self):
-		_page, soup = fixtures.make_page(
-			"https://x.com",
-			'<html><head><script type="application/ld+json">'
-			'{"@graph":[{"@type":"Organization","name":"A"},{"@type":"WebSite"}]}'
-			"</script></head><body></body></html>",
-		)
-		blocks = extractors.parse_json_ld(soup)
-		self.assertEqual(len(blocks), 2)
-		self.assertEqual(blocks[0]["name"], "A")
-
-	def test_ignores_invalid_json(self):
-		_page, soup = fixtures.make_page("https://x.com", fixtures.BROKEN_JSON_LD)
-		self.assertEqual(extractors.parse_json_ld(soup), [])
-
-
 class DescriptionSelectionTest(UnitTestCase):
 	def test_prefers_about_over_product_homepage(self):
-		pages, soups = _pages(
+		pages, parsed_by_url = _pages(
 			(
 				"https://shop.example",
 				"<html><head><meta property='og:description' content='Shop the latest gadgets.'></head><body></body></html>",
@@ -231,22 +214,22 @@ class DescriptionSelectionTest(UnitTestCase):
 				"<html><head><meta name='description' content='Acme builds developer tools for teams.'></head><body></body></html>",
 			),
 		)
-		desc = extractors.select_description(pages, soups)
+		desc = extractors.select_description(pages, parsed_by_url)
 		self.assertEqual(desc.value, "Acme builds developer tools for teams.")
 		self.assertEqual(desc.source, "https://shop.example/about")
 
 	def test_falls_back_to_homepage(self):
-		pages, soups = _pages(
+		pages, parsed_by_url = _pages(
 			(
 				"https://x.example",
 				"<html><head><meta property='og:description' content='We make great software.'></head><body></body></html>",
 			),
 		)
-		desc = extractors.select_description(pages, soups)
+		desc = extractors.select_description(pages, parsed_by_url)
 		self.assertEqual(desc.value, "We make great software.")
 
 	def test_json_ld_is_authoritative(self):
-		pages, soups = _pages(
+		pages, parsed_by_url = _pages(
 			(
 				"https://s.example",
 				'<html><head><script type="application/ld+json">{"@type":"Organization","description":"Acme is a developer-tools company."}</script></head><body></body></html>',
@@ -256,7 +239,7 @@ class DescriptionSelectionTest(UnitTestCase):
 				"<html><head><meta name='description' content='Some about-page blurb.'></head><body></body></html>",
 			),
 		)
-		desc = extractors.select_description(pages, soups)
+		desc = extractors.select_description(pages, parsed_by_url)
 		self.assertEqual(desc.method, Method.JSON_LD)
 
 	def test_about_body_paragraph_when_no_meta(self):
@@ -265,18 +248,18 @@ class DescriptionSelectionTest(UnitTestCase):
 			"<main><p>Acme Robotics designs autonomous warehouse robots that help "
 			"retailers fulfil orders faster and at lower cost.</p></main>"
 		)
-		pages, soups = _pages(
+		pages, parsed_by_url = _pages(
 			("https://acme.example", "<html><head><title>Acme</title></head><body></body></html>"),
 			("https://acme.example/about", f"<html><body>{about_body}</body></html>"),
 		)
-		desc = extractors.select_description(pages, soups)
+		desc = extractors.select_description(pages, parsed_by_url)
 		self.assertIn("autonomous warehouse robots", desc.value)
 		self.assertEqual(desc.method, Method.BODY_TEXT)
 		self.assertEqual(desc.source, "https://acme.example/about")
 
 	def test_head_meta_beats_home_body_paragraph(self):
 		# With an og:description present, head meta wins over a homepage body paragraph.
-		pages, soups = _pages(
+		pages, parsed_by_url = _pages(
 			(
 				"https://acme.example",
 				"<html><head><meta name='description' content='Acme makes developer tools.'>"
@@ -285,7 +268,7 @@ class DescriptionSelectionTest(UnitTestCase):
 				"</main></body></html>",
 			),
 		)
-		desc = extractors.select_description(pages, soups)
+		desc = extractors.select_description(pages, parsed_by_url)
 		self.assertEqual(desc.value, "Acme makes developer tools.")
 		self.assertEqual(desc.method, Method.META_TAG)
 
@@ -293,7 +276,7 @@ class DescriptionSelectionTest(UnitTestCase):
 		finance_rules = [
 			fixtures.keyword_rule("Industry", ["financial institution", "banking"], industry="Finance")
 		]
-		pages, soups = _pages(
+		pages, parsed_by_url = _pages(
 			(
 				"https://acmebank.example",
 				"<html><head><title>Acme Bank</title></head><body></body></html>",
@@ -308,7 +291,7 @@ class DescriptionSelectionTest(UnitTestCase):
 				"</main></body></html>",
 			),
 		)
-		desc = extractors.select_description(pages, soups, industry_rules=finance_rules)
+		desc = extractors.select_description(pages, parsed_by_url, industry_rules=finance_rules)
 		self.assertTrue(desc.value.startswith("Acme Bank is a full-service"))
 
 
@@ -320,14 +303,14 @@ class FirstParagraphTest(UnitTestCase):
 			"<main><p>Short.</p><p>Globex Corp is a logistics platform that moves freight "
 			"across the country for enterprise shippers.</p></main></body></html>"
 		)
-		_page, soup = fixtures.make_page("https://globex.example", html)
-		result = extractors.first_paragraph(soup)
+		_page, parsed = fixtures.make_page("https://globex.example", html)
+		result = extractors.first_paragraph(parsed)
 		self.assertIn("logistics platform", result)
 		self.assertNotIn("Login", result)  # nav paragraph skipped despite being long
 
 	def test_returns_empty_when_no_substantial_paragraph(self):
-		_page, soup = fixtures.make_page("https://x.example", "<html><body><p>Hi.</p></body></html>")
-		self.assertEqual(extractors.first_paragraph(soup), "")
+		_page, parsed = fixtures.make_page("https://x.example", "<html><body><p>Hi.</p></body></html>")
+		self.assertEqual(extractors.first_paragraph(parsed), "")
 
 	def test_prefers_paragraph_with_more_keyword_hits_over_first_qualifying_one(self):
 		# A narrow pull-quote with zero industry-keyword hits precedes a genuine
@@ -343,8 +326,8 @@ class FirstParagraphTest(UnitTestCase):
 			"institutions and private clients across commercial and investment banking.</p>"
 			"</main></body></html>"
 		)
-		_page, soup = fixtures.make_page("https://acmebank.example", html)
-		result = extractors.first_paragraph(soup, industry_rules=finance_rules)
+		_page, parsed = fixtures.make_page("https://acmebank.example", html)
+		result = extractors.first_paragraph(parsed, industry_rules=finance_rules)
 		self.assertTrue(result.startswith("Acme Bank is a full-service"))
 
 	def test_falls_back_to_first_paragraph_when_no_keyword_hits(self):
@@ -357,8 +340,8 @@ class FirstParagraphTest(UnitTestCase):
 			"trust of institutional investors across every market we serve.</p>"
 			"</main></body></html>"
 		)
-		_page, soup = fixtures.make_page("https://acmebank.example", html)
-		result = extractors.first_paragraph(soup, industry_rules=finance_rules)
+		_page, parsed = fixtures.make_page("https://acmebank.example", html)
+		result = extractors.first_paragraph(parsed, industry_rules=finance_rules)
 		self.assertTrue(result.startswith("Putting our long-tenured"))
 
 	def test_falls_back_to_first_paragraph_when_no_industry_rules_given(self):
@@ -372,13 +355,13 @@ class FirstParagraphTest(UnitTestCase):
 			"institutions and private clients across commercial and investment banking.</p>"
 			"</main></body></html>"
 		)
-		_page, soup = fixtures.make_page("https://acmebank.example", html)
-		self.assertTrue(extractors.first_paragraph(soup).startswith("Putting our long-tenured"))
+		_page, parsed = fixtures.make_page("https://acmebank.example", html)
+		self.assertTrue(extractors.first_paragraph(parsed).startswith("Putting our long-tenured"))
 		self.assertTrue(
-			extractors.first_paragraph(soup, industry_rules=[]).startswith("Putting our long-tenured")
+			extractors.first_paragraph(parsed, industry_rules=[]).startswith("Putting our long-tenured")
 		)
 		self.assertTrue(
-			extractors.first_paragraph(soup, industry_rules=None).startswith("Putting our long-tenured")
+			extractors.first_paragraph(parsed, industry_rules=None).startswith("Putting our long-tenured")
 		)
 
 	def test_company_name_breaks_tie_between_equal_keyword_hits(self):
@@ -393,8 +376,8 @@ class FirstParagraphTest(UnitTestCase):
 			"service for individuals, families and small businesses nationwide.</p>"
 			"</main></body></html>"
 		)
-		_page, soup = fixtures.make_page("https://acmebank.example", html)
-		result = extractors.first_paragraph(soup, industry_rules=finance_rules, company_name="Acme Bank")
+		_page, parsed = fixtures.make_page("https://acmebank.example", html)
+		result = extractors.first_paragraph(parsed, industry_rules=finance_rules, company_name="Acme Bank")
 		self.assertTrue(result.startswith("Acme Bank has led the market"))
 
 	def test_company_name_mentions_cannot_outrank_more_industry_hits(self):
@@ -412,8 +395,8 @@ class FirstParagraphTest(UnitTestCase):
 			"with award-winning retail banking and community-first values.</p>"
 			"</main></body></html>"
 		)
-		_page, soup = fixtures.make_page("https://acmebank.example", html)
-		result = extractors.first_paragraph(soup, industry_rules=finance_rules, company_name="Acme Bank")
+		_page, parsed = fixtures.make_page("https://acmebank.example", html)
+		result = extractors.first_paragraph(parsed, industry_rules=finance_rules, company_name="Acme Bank")
 		self.assertTrue(result.startswith("A full-service financial institution"))
 
 
@@ -508,10 +491,10 @@ class PhoneExtractionTest(UnitTestCase):
 # --------------------------------------------------------------------------- #
 class SocialTest(UnitTestCase):
 	def test_detects_networks_and_skips_share_links(self):
-		page, soup = fixtures.make_page("https://acme.example", fixtures.HOMEPAGE)
-		company = extractors.extract_company_info(page, soup)
+		page, parsed = fixtures.make_page("https://acme.example", fixtures.HOMEPAGE)
+		company = extractors.extract_company_info(page, parsed)
 		profiles = extractors.extract_social_profiles(
-			[page], {page.url: soup}, fixtures.social_rules(), extra_links=company["social_links"]
+			[page], {page.url: parsed}, fixtures.social_rules(), extra_links=company["social_links"]
 		)
 		self.assertTrue(profiles["linkedin"].value)
 		self.assertTrue(profiles["github"].value)
@@ -522,12 +505,12 @@ class SocialTest(UnitTestCase):
 		self.assertEqual(profiles["facebook"].value, "")
 
 	def test_protocol_relative_links_made_absolute(self):
-		page, soup = fixtures.make_page(
+		page, parsed = fixtures.make_page(
 			"https://bluedart.com",
 			"<html><body><a href='//www.linkedin.com/company/bluedart/'>li</a>"
 			"<a href='//twitter.com/BlueDart_'>tw</a></body></html>",
 		)
-		profiles = extractors.extract_social_profiles([page], {page.url: soup}, fixtures.social_rules())
+		profiles = extractors.extract_social_profiles([page], {page.url: parsed}, fixtures.social_rules())
 		self.assertEqual(profiles["linkedin"].value, "https://www.linkedin.com/company/bluedart/")
 		self.assertEqual(profiles["twitter"].value, "https://twitter.com/BlueDart_")
 
@@ -545,8 +528,8 @@ class IndustryTest(UnitTestCase):
 		return extractors.classify_industry([page], company, fixtures.industry_rules())
 
 	def test_classifies_saas_or_crm_with_confidence(self):
-		page, soup = fixtures.make_page("https://acme.example", fixtures.HOMEPAGE)
-		company = extractors.extract_company_info(page, soup)
+		page, parsed = fixtures.make_page("https://acme.example", fixtures.HOMEPAGE)
+		company = extractors.extract_company_info(page, parsed)
 		industry, conf = extractors.classify_industry([page], company, fixtures.industry_rules())
 		self.assertIn(industry, ("SaaS", "CRM"))
 		self.assertGreater(conf, 0.0)
@@ -649,6 +632,34 @@ class RuleExecutorTest(UnitTestCase):
 		# 3 hits * weight 2.0 = 6.0
 		self.assertEqual(scores["SaaS"], 6.0)
 
+	def test_keyword_matcher_counts_like_each_rule(self):
+		"""One scan for all rules finds exactly what every rule's own patterns find"""
+		rules = [
+			fixtures.keyword_rule("Industry", ["ai", "ai platform", "AI"], industry="AI"),
+			fixtures.keyword_rule("Industry", ["platform", "c++", "asp.net", "a a"], industry="Dev"),
+			fixtures.keyword_rule("Industry", ["saas"], industry="SaaS"),
+			fixtures.regex_rule("Industry", [r"cloud\w*"], target_value="Cloud"),
+		]
+		texts = [
+			"",
+			"An AI platform, the ai-platform for AI: platforms aside, ai platform wins.",
+			"c++ and C++x, asp.net core, a a a a, saasy saas SaaS cloudy cloud",
+			"nothing to see",
+		]
+		for text in texts:
+			with self.subTest(text=text):
+				self.assertEqual(
+					extractors.KeywordMatcher(rules).counts(text), [rule.matches(text) for rule in rules]
+				)
+
+	def test_apply_keyword_rules_scans_each_scope(self):
+		headline = fixtures.keyword_rule("Industry", ["bank"], industry="Finance", match_scope="Headline")
+		full_text = fixtures.keyword_rule("Industry", ["bank"], industry="Finance", match_scope="Full Text")
+		scores = extractors.apply_keyword_rules(
+			{"Headline": "bank", "Full Text": "bank bank"}, [headline, full_text]
+		)
+		self.assertEqual(scores, {"Finance": 3.0})
+
 
 # --------------------------------------------------------------------------- #
 # Readability diagnosis (mechanics)
@@ -3,7 +3,7 @@
 
 """IntegrationTestCase tests for the Frappe layer (real test DB).
 
-Covers: seeder idempotency, the mapper write-policies against real CRM
+Covers: seeder idempotency, the config cache, the mapper write-policies against real CRM
 Lead/Deal/Organization docs, the single Run writer, API permission/allow-list
 enforcement + preview rate-limit, and the link-time Organization -> Lead/Deal copy.
 
@@ -18,7 +18,8 @@ from unittest import mock
 import frappe
 from frappe.tests import IntegrationTestCase
 
-from crm.domain_enrichment import config, install, tasks
+from crm.domain_enrichment import bulk, config, http, install, tasks
+from crm.domain_enrichment import cache as fetch_cache
 from crm.domain_enrichment.config import get_config
 from crm.domain_enrichment.cross_record import copy_enrichment_from_organization
 from crm.domain_enrichment.mapper import apply_to_document
@@ -60,6 +61,34 @@ class SeederIdempotencyTest(IntegrationTestCase):
 		self.assertGreater(mappings_before, 0)
 
 
+class ConfigCacheTest(IntegrationTestCase):
+	"""get_config reuses its build until a config row changes, however it was written."""
+
+	def tearDown(self):
+		frappe.db.rollback()
+
+	def test_reused_until_a_rule_changes_through_frappe_db(self):
+		cfg = get_config()
+		self.assertIs(get_config(), cfg)
+
+		rule = frappe.get_all("CRM Enrichment Rule", filters={"enabled": 1}, fields=["name", "rule_type"])[0]
+		frappe.db.set_value("CRM Enrichment Rule", rule.name, "weight", 7.5)
+
+		rebuilt = get_config()
+		self.assertIsNot(rebuilt, cfg)
+		self.assertIn(7.5, [r.weight for r in rebuilt.rules(rule.rule_type)])
+
+	def test_settings_write_rebuilds(self):
+		get_config()
+		frappe.db.set_single_value("CRM Enrichment Settings", "max_pages", 3)
+		self.assertEqual(get_config().setting("max_pages"), 3)
+
+	def test_clear_config_cache_rebuilds(self):
+		cfg = get_config()
+		config.clear_config_cache()
+		self.assertIsNot(get_config(), cfg)
+
+
 class MapperWritePolicyTest(IntegrationTestCase):
 	def setUp(self):
 		self.cfg = get_config()
@@ -142,6 +171,206 @@ class RunWriterTest(IntegrationTestCase):
 		self.assertIn("Acme Analytics", run.raw_json)
 
 
+class BulkEnrichmentTest(IntegrationTestCase):
+	def tearDown(self):
+		frappe.db.rollback()
+
+	def _new_org(self, website):
+		org = frappe.new_doc("CRM Organization")
+		org.organization_name = "Bulk Org " + frappe.generate_hash(length=6)
+		org.website = website
+		return org.insert()
+
+	def test_groups_records_by_registrable_domain(self):
+		groups, invalid = bulk.group_by_domain(
+			[
+				("A", "acme.example"),
+				("B", "https://www.acme.example/about"),
+				("C", "https://other.example"),
+				("D", "ftp://files.example"),
+			]
+		)
+		self.assertEqual(groups["acme.example"], ("https://acme.example", ["A", "B"]))
+		self.assertEqual(groups["other.example"], ("https://other.example", ["C"]))
+		self.assertEqual(invalid, [("D", "ftp://files.example")])
+
+	def test_enqueue_counts_matching_records_and_refuses_a_second_backfill(self):
+		names = [self._new_org("https://acme.example").name, self._new_org("https://other.example").name]
+
+		with (
+			mock.patch.object(bulk, "is_job_enqueued", return_value=False),
+			mock.patch.object(frappe, "enqueue") as enqueue,
+		):
+			queued = bulk.enqueue_bulk_enrichment(
+				"CRM Organization", {"name": ["in", names]}, "Administrator"
+			)
+		self.assertEqual((queued["queued"], queued["count"]), (True, 2))
+		self.assertEqual(enqueue.call_args.kwargs["job_id"], queued["job_id"])
+
+		with (
+			mock.patch.object(bulk, "is_job_enqueued", return_value=True),
+			mock.patch.object(frappe, "enqueue") as enqueue,
+			self.assertRaises(frappe.ValidationError),
+		):
+			bulk.enqueue_bulk_enrichment("CRM Organization", {"name": ["in", names]}, "Administrator")
+		enqueue.assert_not_called()
+
+	def test_crawls_each_domain_once_and_writes_a_run_per_record(self):
+		orgs = [
+			self._new_org("https://acme.example"),
+			self._new_org("https://www.acme.example"),
+			self._new_org("https://other.example"),
+		]
+		names = [org.name for org in orgs]
+
+		with (
+			mock.patch.object(
+				bulk, "run_pipeline", side_effect=lambda website, cfg: canned_result(website)
+			) as run,
+			mock.patch.object(frappe.db, "commit"),
+			mock.patch.object(frappe, "publish_realtime") as publish,
+		):
+			bulk.run_bulk_enrichment("CRM Organization", {"name": ["in", names]})
+
+		self.assertEqual(
+			sorted(call.args[0] for call in run.call_args_list),
+			["https://acme.example", "https://other.example"],
+		)
+		runs = frappe.get_all(
+			"CRM Enrichment Run",
+			filters={"reference_name": ["in", names]},
+			fields=["reference_name", "status", "company_name"],
+		)
+		self.assertEqual(sorted(r.reference_name for r in runs), sorted(names))
+		self.assertTrue(all(r.status == "Completed" for r in runs))
+		self.assertTrue(all(r.company_name == "Acme Analytics Inc." for r in runs))
+
+		final = publish.call_args.args[1]
+		self.assertEqual((final["status"], final["done"], final["total"]), ("completed", 3, 3))
+
+
+class FetchCacheTest(IntegrationTestCase):
+	"""http.fetch serves repeated fetches of a URL from the shared page cache."""
+
+	def setUp(self):
+		# A private key namespace, so eviction here never touches real cached pages.
+		patcher = mock.patch.object(
+			fetch_cache, "FETCH_CACHE_KEY", "crm_enrichment_fetch_test_" + frappe.generate_hash()
+		)
+		patcher.start()
+		self.addCleanup(patcher.stop)
+		self.cache = fetch_cache.FetchCache(ttl=60, max_bytes=1024 * 1024)
+
+	def _response(self, body, status=200, headers=None):
+		import requests
+
+		resp = requests.Response()
+		resp.status_code = status
+		resp.headers["Content-Type"] = "text/html; charset=utf-8"
+		resp.headers.update(headers or {})
+		resp._content = body.encode()
+		resp._content_consumed = True
+		return resp
+
+	def _fetch(self, url, max_download_bytes=100_000, response=None):
+		cfg = fixtures.make_config(
+			settings={"max_download_bytes": max_download_bytes}, fetch_cache=self.cache
+		)
+		if response is None:
+			# not `or`: an error response is falsy
+			response = self._response("<html><body>Cached page</body></html>")
+		with (
+			mock.patch.object(http, "_validated_ips", return_value=["93.184.216.34"]),
+			mock.patch.object(http, "_pinned_get", return_value=response) as get,
+		):
+			self.pinned_get = get
+			return http.fetch(url, cfg), get.call_count
+
+	def test_second_fetch_is_served_from_cache(self):
+		url = "https://acme.example/about"
+		first, connections = self._fetch(url)
+		self.assertEqual(connections, 1)
+
+		second, connections = self._fetch(url)
+		self.assertEqual(connections, 0)
+		self.assertEqual(second, first)
+		self.assertEqual(second, (200, "<html><body>Cached page</body></html>", "", url))
+
+	def test_transient_error_is_not_cached(self):
+		url = "https://acme.example/careers"
+		unavailable, connections = self._fetch(url, response=self._response("Try later", status=503))
+		self.assertEqual((unavailable[0], connections), (503, 1))
+
+		recovered, connections = self._fetch(url)
+		self.assertEqual(connections, 1)
+		self.assertEqual(recovered[:2], (200, "<html><body>Cached page</body></html>"))
+
+		# a missing page is cached like one that exists
+		self._fetch("https://acme.example/gone", response=self._response("Not found", status=404))
+		_missing, connections = self._fetch("https://acme.example/gone")
+		self.assertEqual(connections, 0)
+
+	def test_body_truncated_by_a_smaller_cap_is_refetched(self):
+		# A preview caches a head-sized body; the full run must not be served it.
+		url = "https://acme.example"
+		_preview, connections = self._fetch(url, max_download_bytes=10)
+		self.assertEqual(connections, 1)
+
+		full, connections = self._fetch(url)
+		self.assertEqual(connections, 1)
+		self.assertEqual(full[1], "<html><body>Cached page</body></html>")
+
+	def test_head_only_fetch_stops_after_the_head(self):
+		url = "https://acme.example/landing"
+		head = "<html><head><title>Acme</title></head>"
+		body = "<body>" + "<p>Body copy.</p>" * 20_000 + "</body></html>"
+		cfg = fixtures.make_config(settings={"max_download_bytes": 512_000}, fetch_cache=self.cache)
+		with (
+			mock.patch.object(http, "_validated_ips", return_value=["93.184.216.34"]),
+			mock.patch.object(http, "_pinned_get", return_value=self._response(head + body)) as get,
+		):
+			_status, html, _error, _final = http.fetch(url, cfg, head_only=True)
+
+			self.assertTrue(html.startswith(head))
+			self.assertEqual(len(html), len(head) - len("</head>") + http.HEAD_ONLY_TAIL_BYTES)
+
+			# The cut-short body is reused by the next preview, never by a full fetch.
+			self.assertEqual(http.fetch(url, cfg, head_only=True)[1], html)
+			self.assertEqual(get.call_count, 1)
+			self.assertEqual(http.fetch(url, cfg)[1], head + body)
+			self.assertEqual(get.call_count, 2)
+
+	def test_stale_page_is_revalidated_and_reused_on_304(self):
+		self.cache = fetch_cache.FetchCache(ttl=0, max_bytes=1024 * 1024)  # every entry is stale
+		url = "https://acme.example/team"
+		validators = {"ETag": '"v1"', "Last-Modified": "Wed, 14 Oct 2026 08:00:00 GMT"}
+		first, _connections = self._fetch(
+			url, response=self._response("<html><body>Team</body></html>", headers=validators)
+		)
+
+		second, connections = self._fetch(url, response=self._response("", status=304))
+		self.assertEqual(connections, 1)
+		self.assertEqual(
+			self.pinned_get.call_args.kwargs["headers"],
+			{"If-None-Match": '"v1"', "If-Modified-Since": "Wed, 14 Oct 2026 08:00:00 GMT"},
+		)
+		self.assertEqual(second, first)
+		self.assertEqual(second[1], "<html><body>Team</body></html>")
+
+	def test_least_recently_used_page_is_evicted_over_the_size_cap(self):
+		self.cache = fetch_cache.FetchCache(ttl=60, max_bytes=5000)
+		pages = {path: frappe.generate_hash(length=4000) for path in ("a", "b", "c")}
+
+		self.cache.set("https://acme.example/a", {"html": pages["a"]})
+		self.cache.set("https://acme.example/b", {"html": pages["b"]})
+		self.assertTrue(self.cache.get("https://acme.example/a"))
+		self.cache.set("https://acme.example/c", {"html": pages["c"]})
+
+		self.assertIsNone(self.cache.get("https://acme.example/b"))
+		self.assertEqual(self.cache.get("https://acme.example/a")["html"], pages["a"])
+		self.assertEqual(self.cache.get("https://acme.example/c")["html"], pages["c"])
+
+
 class ApiPermissionTest(IntegrationTestCase):
 	def tearDown(self):
 		frappe.db.rollback()
@@ -168,10 +397,10 @@ class ApiPermissionTest(IntegrationTestCase):
 			enrich("CRM Organization", org.name)
 
 	def test_enrich_routes_are_rate_limited(self):
-		# enrich / retry / enrich_preview each carry rate_limit(limit=ENRICH_RATE_LIMIT).
+		# enrich / retry / enrich_bulk / enrich_preview each carry rate_limit(limit=ENRICH_RATE_LIMIT).
 		from crm.domain_enrichment import api
 
-		for fn in (api.enrich, api.retry, api.enrich_preview):
+		for fn in (api.enrich, api.retry, api.enrich_bulk, api.enrich_preview):
 			self.assertTrue(hasattr(fn, "__wrapped__"), fn.__name__)
 
 
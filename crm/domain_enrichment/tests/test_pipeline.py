@@ -58,7 +58,7 @@ def _full_config():
 
 
 def _canned_crawl(*_args, **_kwargs):
-	"""Return canned (CrawledPage, soup) tuples instead of crawling the network."""
+	"""Return canned (CrawledPage, ParsedPage) tuples instead of crawling the network."""
 	return [
 		fixtures.make_page("https://acme.example", fixtures.HOMEPAGE),
 		fixtures.make_page("https://acme.example/about", fixtures.ABOUT),
@@ -157,6 +157,9 @@ class JsSpaSiteTest(UnitTestCase):
 		self.assertEqual(out["phones"], [])
 		self.assertTrue(all(p.value == "" for p in result.social_profiles.values()))
 
+		# The run reports its share of the resolver cache (the crawl is stubbed: none).
+		self.assertEqual(out["_meta"]["dns_cache"], {"hits": 0, "misses": 0, "hit_rate": 0.0})
+
 		# Only the metadata the shell actually exposes is surfaced.
 		self.assertEqual(out["company_name"]["value"], "Vite App")
 		self.assertEqual(out["company_name"]["method"], "Title Tag")
@@ -165,7 +168,7 @@ class JsSpaSiteTest(UnitTestCase):
 	def test_readability_diagnosed_empty(self):
 		from crm.domain_enrichment import extractors
 
-		page, _soup = fixtures.make_page("https://spa.example", fixtures.JS_SPA_SHELL)
+		page, _parsed = fixtures.make_page("https://spa.example", fixtures.JS_SPA_SHELL)
 		self.assertEqual(extractors.diagnose_readability([page]), "empty")
 
 
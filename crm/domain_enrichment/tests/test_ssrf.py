@@ -41,8 +41,11 @@ def _resolves_to(ip_map):
 		# getaddrinfo returns 5-tuples; element 4 is the sockaddr (ip, port, ...).
 		return [(socket.AF_INET, socket.SOCK_STREAM, 6, "", (ip, 0)) for ip in ips]
 
-	with mock.patch.object(http.socket, "getaddrinfo", side_effect=fake_getaddrinfo):
-		yield
+	# Answers cached by an earlier test must not stand in for this test's resolver.
+	http.clear_dns_cache()
+	with mock.patch.object(http.socket, "getaddrinfo", side_effect=fake_getaddrinfo) as resolver:
+		yield resolver
+	http.clear_dns_cache()
 
 
 class SSRFGuardTest(UnitTestCase):
@@ -161,6 +164,50 @@ class SSRFGuardTest(UnitTestCase):
 		self.assertTrue(http._is_blocked_ip("not-an-ip"))
 
 
+class ResolverCacheTest(UnitTestCase):
+	def test_repeated_validation_resolves_once(self):
+		with _resolves_to({"acme.example": "93.184.216.34"}) as resolver:
+			validate_url("https://acme.example/", make_config())
+			validate_url("https://acme.example/about", make_config())
+			self.assertEqual(resolver.call_count, 1)
+			self.assertEqual(http.dns_cache_stats(), {"hits": 1, "misses": 1, "hit_rate": 0.5})
+
+	def test_session_counts_its_own_lookups(self):
+		session = http.build_session(make_config())
+		with _resolves_to({"acme.example": "93.184.216.34"}):
+			validate_url("https://acme.example/", make_config())
+			http._validated_ips("https://acme.example/about", make_config(), session.dns_stats)
+			http._validated_ips("https://acme.example/team", make_config(), session.dns_stats)
+			self.assertEqual(
+				http.dns_cache_stats(session.dns_stats), {"hits": 2, "misses": 0, "hit_rate": 1.0}
+			)
+			self.assertEqual(http.dns_cache_stats()["hits"], 2)
+		session.close()
+
+	def test_expired_answer_is_resolved_again(self):
+		with (
+			mock.patch.object(http, "DNS_CACHE_TTL", 0),
+			_resolves_to({"acme.example": "93.184.216.34"}) as resolver,
+		):
+			validate_url("https://acme.example/", make_config())
+			validate_url("https://acme.example/", make_config())
+			self.assertEqual(resolver.call_count, 2)
+
+	def test_cached_answer_is_still_checked_by_the_guard(self):
+		# A host on the block list is rejected even though its answer is cached.
+		with _resolves_to({"acme.example": "93.184.216.34"}):
+			validate_url("https://acme.example/", make_config())
+			with self.assertRaises(SSRFError):
+				validate_url("https://acme.example/", make_config(blocked_domains=["acme.example"]))
+
+	def test_failed_lookup_is_not_cached(self):
+		with _resolves_to({}) as resolver:
+			for _attempt in range(2):
+				with self.assertRaises(SSRFError):
+					validate_url("https://missing.example/", make_config())
+			self.assertEqual(resolver.call_count, 2)
+
+
 class PinnedConnectionTest(UnitTestCase):
 	"""DNS-rebinding defense: the socket must go to the IP the guard validated.
 
@@ -5,7 +5,7 @@ import frappe
 from frappe import _, generate_hash
 from frappe.model.document import Document
 
-from crm.integrations.api import get_contact_by_phone_number
+from crm.integrations.api import get_contacts_by_phone_numbers
 from crm.utils import seconds_to_duration
 
 
@@ -125,7 +125,7 @@ class CRMCallLog(Document):
 		return {"columns": columns, "rows": rows}
 
 	def parse_list_data(calls):
-		return [parse_call_log(call) for call in calls] if calls else []
+		return parse_call_logs(calls)
 
 	def has_link(self, doctype, name):
 		for link in self.links:
@@ -148,42 +148,51 @@ class CRMCallLog(Document):
 
 
 def parse_call_log(call):
-	call["show_recording"] = False
-	call["_duration"] = seconds_to_duration(call.get("duration"))
-	if call.get("type") == "Incoming":
-		call["activity_type"] = "incoming_call"
-		contact = get_contact_by_phone_number(call.get("from"))
-		receiver = (
-			frappe.db.get_values("User", call.get("receiver"), ["full_name", "user_image"])[0]
-			if call.get("receiver")
-			else [None, None]
-		)
-		call["_caller"] = {
-			"label": contact.get("full_name", "Unknown"),
-			"image": contact.get("image"),
-		}
-		call["_receiver"] = {
-			"label": receiver[0],
-			"image": receiver[1],
-		}
-	elif call.get("type") == "Outgoing":
-		call["activity_type"] = "outgoing_call"
-		contact = get_contact_by_phone_number(call.get("to"))
-		caller = (
-			frappe.db.get_values("User", call.get("caller"), ["full_name", "user_image"])[0]
-			if call.get("caller")
-			else [None, None]
-		)
-		call["_caller"] = {
-			"label": caller[0],
-			"image": caller[1],
-		}
-		call["_receiver"] = {
-			"label": contact.get("full_name", "Unknown"),
-			"image": contact.get("image"),
-		}
-
-	return call
+	return parse_call_logs([call])[0]
+
+
+def parse_call_logs(calls):
+	"""
+	Add activity type, duration and caller/receiver labels to call log rows.
+
+	The contacts behind every row's number and the users on every row are
+	resolved together, so a page of calls costs a few queries rather than
+	a few per call.
+	"""
+	if not calls:
+		return []
+
+	# the contact's number: the caller's on incoming calls, the receiver's on outgoing ones
+	numbers = [call.get({"Incoming": "from", "Outgoing": "to"}.get(call.get("type"))) for call in calls]
+	contacts = get_contacts_by_phone_numbers([number for number in numbers if number])
+
+	users = {}
+	if user_names := {call.get(field) for call in calls for field in ("caller", "receiver")} - {None, ""}:
+		for user in frappe.get_all(
+			"User", filters={"name": ["in", list(user_names)]}, fields=["name", "full_name", "user_image"]
+		):
+			users[user.name] = user
+
+	def user_label(user):
+		user = users.get(user) or {}
+		return {"label": user.get("full_name"), "image": user.get("user_image")}
+
+	for call, number in zip(calls, numbers, strict=True):
+		call["show_recording"] = False
+		call["_duration"] = seconds_to_duration(call.get("duration"))
+		contact = contacts.get(number) or {}
+		contact_label = {"label": contact.get("full_name", "Unknown"), "image": contact.get("image")}
+
+		if call.get("type") == "Incoming":
+			call["activity_type"] = "incoming_call"
+			call["_caller"] = contact_label
+			call["_receiver"] = user_label(call.get("receiver"))
+		elif call.get("type") == "Outgoing":
+			call["activity_type"] = "outgoing_call"
+			call["_caller"] = user_label(call.get("caller"))
+			call["_receiver"] = contact_label
+
+	return calls
 
 
 @frappe.whitelist()
@@ -10,6 +10,7 @@ from crm.fcrm.doctype.crm_call_log.crm_call_log import (
 	create_lead_from_call_log,
 	get_call_log,
 	parse_call_log,
+	parse_call_logs,
 )
 from crm.integrations.api import _get_recording_credentials
 
@@ -235,6 +236,27 @@ class TestCRMCallLog(IntegrationTestCase):
 		self.assertEqual(parsed["from"], "+1234567890")
 		self.assertEqual(parsed["to"], "+0987654321")
 
+	def test_parse_call_logs_resolves_all_rows_together(self):
+		"""Test parse_call_logs resolves each row's contact and user in one batch"""
+		contact = frappe.get_doc({"doctype": "Contact", "first_name": "Batch", "last_name": "Caller"})
+		contact.append("phone_nos", {"phone": "+91 98765 43230", "is_primary_mobile_no": 1})
+		contact.insert()
+
+		calls = [
+			{"type": "Incoming", "from": "+91 98765 43230", "receiver": "Administrator", "duration": 60},
+			{"type": "Outgoing", "to": "9876543230", "caller": "Administrator", "duration": 0},
+			{"type": "Outgoing", "to": "+91 98765 43239", "caller": "Administrator"},
+		]
+
+		parsed = parse_call_logs(calls)
+
+		self.assertEqual(parsed[0]["_caller"]["label"], "Batch Caller")
+		self.assertEqual(parsed[0]["_receiver"]["label"], "Administrator")
+		self.assertEqual(parsed[1]["_receiver"]["label"], "Batch Caller")
+		self.assertEqual(parsed[1]["_duration"], "0s")
+		self.assertEqual(parsed[2]["_receiver"]["label"], "Unknown")
+		self.assertEqual(parsed[2]["activity_type"], "outgoing_call")
+
 	def test_get_call_log_api(self):
 		"""Test get_call_log API function"""
 		call = create_test_call_log(
@@ -0,0 +1,407 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and contributors
+# For license information, please see license.txt
+
+import hashlib
+from collections import defaultdict
+
+import frappe
+from frappe import _
+from frappe.model.document import Document
+from frappe.query_builder import DocType
+from frappe.query_builder.functions import Coalesce, Count, Date, IfNull, Sum
+from frappe.utils import create_batch, flt, getdate, now
+
+from crm.api.dashboard import invalidate_dashboard_cache
+
+# Columns a rollup row is bucketed by, in the order they make up its key
+KEY_FIELDS = (
+	"reference_doctype",
+	"metric",
+	"date",
+	"record_owner",
+	"status",
+	"stage",
+	"source",
+	"territory",
+	"lost_reason",
+)
+MEASURES = ("record_count", "valued_count", "total_value", "expected_value", "weighted_value")
+COLUMNS = ("name", "creation", "modified", "owner", "modified_by", *KEY_FIELDS, *MEASURES)
+# Named lock held by every writer of the rollup (hook deltas and the rebuild) until its
+# transaction ends, and how long a writer waits for it
+ROLLUP_LOCK = "crm_dashboard_rollup"
+ROLLUP_LOCK_TIMEOUT = 120
+REBUILD_BATCH_SIZE = 10_000
+
+
+class CRMDashboardRollup(Document):
+	# begin: auto-generated types
+	# This code is auto-generated. Do not modify anything in this block.
+
+	from typing import TYPE_CHECKING
+
+	if TYPE_CHECKING:
+		from frappe.types import DF
+
+		date: DF.Date | None
+		expected_value: DF.Float
+		lost_reason: DF.Link | None
+		metric: DF.Literal["Created", "Expected Closure", "Status Change"]
+		record_count: DF.Int
+		record_owner: DF.Link | None
+		reference_doctype: DF.Literal["CRM Lead", "CRM Deal"]
+		source: DF.Link | None
+		stage: DF.Data | None
+		status: DF.Data | None
+		territory: DF.Link | None
+		total_value: DF.Float
+		valued_count: DF.Int
+		weighted_value: DF.Float
+	# end: auto-generated types
+
+	pass
+
+
+def on_update(doc, method=None):
+	"""Move the contribution of a CRM Lead / CRM Deal from its previous buckets to its current ones."""
+	buckets = defaultdict(lambda: dict.fromkeys(MEASURES, 0))
+	add_contributions(buckets, get_contributions(doc))
+
+	if doc_before_save := doc.get_doc_before_save():
+		add_contributions(buckets, get_contributions(doc_before_save), sign=-1)
+
+	apply_deltas(buckets)
+
+
+def on_trash(doc, method=None):
+	"""Remove the contribution of a deleted CRM Lead / CRM Deal."""
+	buckets = defaultdict(lambda: dict.fromkeys(MEASURES, 0))
+	add_contributions(buckets, get_contributions(doc), sign=-1)
+	apply_deltas(buckets)
+
+
+def get_contributions(doc):
+	"""
+	Yield (key, measures) for every rollup bucket the given CRM Lead or CRM Deal counts towards.
+	"""
+	created_on = getdate(doc.creation)
+
+	if doc.doctype == "CRM Lead":
+		yield (
+			make_key(
+				doc.doctype,
+				"Created",
+				created_on,
+				doc.lead_owner,
+				doc.status,
+				None,
+				doc.source,
+				doc.territory,
+			),
+			{"record_count": 1},
+		)
+		return
+
+	exchange_rate = 1 if doc.exchange_rate is None else flt(doc.exchange_rate)
+	deal_value = flt(doc.deal_value) * exchange_rate
+
+	yield (
+		make_key(
+			doc.doctype,
+			"Created",
+			created_on,
+			doc.deal_owner,
+			doc.status,
+			None,
+			doc.source,
+			doc.territory,
+			doc.lost_reason,
+		),
+		{"record_count": 1, "valued_count": int(doc.deal_value is not None), "total_value": deal_value},
+	)
+
+	if doc.expected_closure_date:
+		expected_value = flt(doc.expected_deal_value) * exchange_rate
+		yield (
+			make_key(
+				doc.doctype,
+				"Expected Closure",
+				getdate(doc.expected_closure_date),
+				doc.deal_owner,
+				doc.status,
+			),
+			{
+				"record_count": 1,
+				"total_value": deal_value,
+				"expected_value": expected_value,
+				"weighted_value": expected_value * flt(doc.probability) / 100,
+			},
+		)
+
+	for log in doc.get("status_change_log") or []:
+		if log.to:
+			yield (
+				make_key(doc.doctype, "Status Change", created_on, doc.deal_owner, doc.status, log.to),
+				{"record_count": 1},
+			)
+
+
+def make_key(
+	reference_doctype,
+	metric,
+	date,
+	record_owner=None,
+	status=None,
+	stage=None,
+	source=None,
+	territory=None,
+	lost_reason=None,
+):
+	# empty strings and NULLs land in the same bucket
+	return tuple(
+		value or None
+		for value in (
+			reference_doctype,
+			metric,
+			date,
+			record_owner,
+			status,
+			stage,
+			source,
+			territory,
+			lost_reason,
+		)
+	)
+
+
+def add_contributions(buckets, contributions, sign=1):
+	for key, measures in contributions:
+		bucket = buckets[key]
+		for measure, value in measures.items():
+			bucket[measure] += sign * value
+
+
+def get_rollup_name(key):
+	"""Rollup rows are named after their key so concurrent writers upsert the same row."""
+	return hashlib.md5("\x1f".join(str(value or "") for value in key).encode()).hexdigest()
+
+
+def get_row_values(key, measures, timestamp):
+	return (
+		get_rollup_name(key),
+		timestamp,
+		timestamp,
+		"Administrator",
+		"Administrator",
+		*key,
+		*(measures[measure] for measure in MEASURES),
+	)
+
+
+def lock_rollup():
+	"""
+	Take the rollup lock for the rest of the transaction.
+
+	Deltas then never interleave with a rebuild: it doesn't read the records while a
+	delta for them is uncommitted, nor write its totals over one committed after its read.
+	"""
+	if frappe.flags.crm_rollup_locked:
+		return
+
+	# named locks are server-wide, so the name carries the site's database
+	name = f"{frappe.db.cur_db_name}:{ROLLUP_LOCK}"
+	if not frappe.db.sql("select get_lock(%s, %s)", (name, ROLLUP_LOCK_TIMEOUT))[0][0]:
+		frappe.throw(
+			_("Dashboard totals are being rebuilt, please try again in a moment."),
+			exc=frappe.QueryTimeoutError,
+		)
+	frappe.flags.crm_rollup_locked = True
+
+	def release():
+		frappe.db.sql("select release_lock(%s)", name)
+		frappe.flags.crm_rollup_locked = False
+
+	frappe.db.after_commit.add(release)
+	frappe.db.after_rollback.add(release)
+
+
+def apply_deltas(buckets):
+	rows = [(key, measures) for key, measures in buckets.items() if any(measures.values())]
+	if not rows:
+		return
+
+	lock_rollup()
+
+	timestamp = now()
+	values = [value for key, measures in rows for value in get_row_values(key, measures, timestamp)]
+
+	placeholders = ", ".join(["(" + ", ".join(["%s"] * len(COLUMNS)) + ")"] * len(rows))
+	updates = ", ".join(f"`{measure}` = `{measure}` + values(`{measure}`)" for measure in MEASURES)
+
+	frappe.db.sql(
+		f"""
+		insert into `tabCRM Dashboard Rollup` ({", ".join(f"`{column}`" for column in COLUMNS)})
+		values {placeholders}
+		on duplicate key update {updates}, `modified` = values(`modified`)
+		""",
+		values,
+	)
+
+
+def rebuild_rollup():
+	"""
+	Recompute every rollup row from CRM Lead, CRM Deal and their status change logs.
+
+	Runs nightly to repair drift from writes that bypass document hooks (`db_set`,
+	raw SQL, bulk updates). The drift is written as deltas through the hooks' upsert
+	and emptied rows are deleted, so only rows that are off get written.
+	"""
+	lock_rollup()
+	buckets = defaultdict(lambda: dict.fromkeys(MEASURES, 0))
+
+	for query in (
+		_aggregate_leads,
+		_aggregate_deals,
+		_aggregate_expected_closures,
+		_aggregate_status_changes,
+	):
+		add_contributions(buckets, query())
+
+	# what remains after taking away the stored totals is the drift
+	add_contributions(buckets, _stored_rows(), sign=-1)
+
+	for batch in create_batch(list(buckets.items()), REBUILD_BATCH_SIZE):
+		apply_deltas(dict(batch))
+	frappe.db.delete("CRM Dashboard Rollup", dict.fromkeys(MEASURES, 0))
+
+	invalidate_dashboard_cache()
+
+
+def _stored_rows():
+	Rollup = DocType("CRM Dashboard Rollup")
+	for row in frappe.qb.from_(Rollup).select(*KEY_FIELDS, *MEASURES).run(as_dict=True):
+		yield (
+			make_key(*(row[field] for field in KEY_FIELDS)),
+			{measure: flt(row[measure]) for measure in MEASURES},
+		)
+
+
+def _aggregate_leads():
+	Lead = DocType("CRM Lead")
+	day = Date(Lead.creation)
+
+	rows = (
+		frappe.qb.from_(Lead)
+		.select(
+			day.as_("date"),
+			Lead.lead_owner,
+			Lead.status,
+			Lead.source,
+			Lead.territory,
+			Count("*").as_("count"),
+		)
+		.groupby(day, Lead.lead_owner, Lead.status, Lead.source, Lead.territory)
+		.run(as_dict=True)
+	)
+
+	for row in rows:
+		yield (
+			make_key(
+				"CRM Lead", "Created", row.date, row.lead_owner, row.status, None, row.source, row.territory
+			),
+			{"record_count": row.count},
+		)
+
+
+def _aggregate_deals():
+	Deal = DocType("CRM Deal")
+	day = Date(Deal.creation)
+	columns = (Deal.deal_owner, Deal.status, Deal.source, Deal.territory, Deal.lost_reason)
+
+	rows = (
+		frappe.qb.from_(Deal)
+		.select(
+			day.as_("date"),
+			*columns,
+			Count("*").as_("count"),
+			Count(Deal.deal_value).as_("valued"),
+			Sum(Coalesce(Deal.deal_value, 0) * IfNull(Deal.exchange_rate, 1)).as_("value"),
+		)
+		.groupby(day, *columns)
+		.run(as_dict=True)
+	)
+
+	for row in rows:
+		yield (
+			make_key(
+				"CRM Deal",
+				"Created",
+				row.date,
+				row.deal_owner,
+				row.status,
+				None,
+				row.source,
+				row.territory,
+				row.lost_reason,
+			),
+			{"record_count": row.count, "valued_count": row.valued, "total_value": flt(row.value)},
+		)
+
+
+def _aggregate_expected_closures():
+	Deal = DocType("CRM Deal")
+	exchange_rate = IfNull(Deal.exchange_rate, 1)
+	expected_value = Coalesce(Deal.expected_deal_value, 0) * exchange_rate
+
+	rows = (
+		frappe.qb.from_(Deal)
+		.select(
+			Deal.expected_closure_date.as_("date"),
+			Deal.deal_owner,
+			Deal.status,
+			Count("*").as_("count"),
+			Sum(Coalesce(Deal.deal_value, 0) * exchange_rate).as_("value"),
+			Sum(expected_value).as_("expected_value"),
+			Sum(expected_value * IfNull(Deal.probability, 0) / 100).as_("weighted_value"),
+		)
+		.where(Deal.expected_closure_date.isnotnull())
+		.groupby(Deal.expected_closure_date, Deal.deal_owner, Deal.status)
+		.run(as_dict=True)
+	)
+
+	for row in rows:
+		yield (
+			make_key("CRM Deal", "Expected Closure", row.date, row.deal_owner, row.status),
+			{
+				"record_count": row.count,
+				"total_value": flt(row.value),
+				"expected_value": flt(row.expected_value),
+				"weighted_value": flt(row.weighted_value),
+			},
+		)
+
+
+def _aggregate_status_changes():
+	StatusChangeLog = DocType("CRM Status Change Log")
+	Deal = DocType("CRM Deal")
+	day = Date(Deal.creation)
+
+	rows = (
+		frappe.qb.from_(StatusChangeLog)
+		.join(Deal)
+		.on(StatusChangeLog.parent == Deal.name)
+		.select(day.as_("date"), Deal.deal_owner, Deal.status, StatusChangeLog.to, Count("*").as_("count"))
+		.where(
+			(StatusChangeLog.parenttype == "CRM Deal")
+			& (StatusChangeLog.to.isnotnull())
+			& (StatusChangeLog.to != "")
+		)
+		.groupby(day, Deal.deal_owner, Deal.status, StatusChangeLog.to)
+		.run(as_dict=True)
+	)
+
+	for row in rows:
+		yield (
+			make_key("CRM Deal", "Status Change", row.date, row.deal_owner, row.status, row.to),
+			{"record_count": row.count},
+		)
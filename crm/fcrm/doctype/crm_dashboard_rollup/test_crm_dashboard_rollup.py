@@ -0,0 +1,85 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and Contributors
+# See license.txt
+
+import frappe
+from frappe.tests import IntegrationTestCase
+from frappe.utils import add_days, getdate, now, nowdate
+
+from crm.fcrm.doctype.crm_dashboard_rollup.crm_dashboard_rollup import (
+	COLUMNS,
+	MEASURES,
+	get_rollup_name,
+	get_row_values,
+	make_key,
+	rebuild_rollup,
+)
+from crm.fcrm.doctype.crm_deal.test_crm_deal import create_test_deal
+
+
+def get_rollup_snapshot():
+	rows = frappe.get_all("CRM Dashboard Rollup", fields=["name", *MEASURES])
+	return {
+		row.name: tuple(round(row[measure], 6) for measure in MEASURES)
+		for row in rows
+		if any(row[measure] for measure in MEASURES)
+	}
+
+
+def get_created_rollup(**filters):
+	return frappe.get_all(
+		"CRM Dashboard Rollup",
+		filters={"reference_doctype": "CRM Deal", "metric": "Created", "date": nowdate(), **filters},
+		fields=["record_count", "total_value"],
+	)
+
+
+class IntegrationTestCRMDashboardRollup(IntegrationTestCase):
+	def tearDown(self):
+		frappe.db.rollback()
+
+	def test_deal_changes_move_between_buckets(self):
+		deal = create_test_deal(
+			organization="Rollup Test Org",
+			status="Qualification",
+			deal_value=1000,
+			expected_closure_date=add_days(nowdate(), 10),
+		)
+		before = sum(row.record_count for row in get_created_rollup(status="Negotiation"))
+
+		deal.status = "Negotiation"
+		deal.save()
+
+		after = sum(row.record_count for row in get_created_rollup(status="Negotiation"))
+		self.assertEqual(after, before + 1)
+
+		deal.delete()
+		self.assertEqual(sum(row.record_count for row in get_created_rollup(status="Negotiation")), before)
+
+	def test_rebuild_matches_incremental_updates(self):
+		deal = create_test_deal(organization="Rollup Test Org", status="Qualification", deal_value=500)
+		deal.deal_value = 750
+		deal.status = "Negotiation"
+		deal.save()
+
+		incremental = get_rollup_snapshot()
+		rebuild_rollup()
+
+		self.assertEqual(get_rollup_snapshot(), incremental)
+
+	def test_rebuild_repairs_drifted_and_orphaned_rows(self):
+		create_test_deal(organization="Rollup Test Org", status="Qualification", deal_value=500)
+		incremental = get_rollup_snapshot()
+
+		drifted = next(iter(incremental))
+		frappe.db.set_value("CRM Dashboard Rollup", drifted, "record_count", 99, update_modified=False)
+		orphan = make_key("CRM Lead", "Created", getdate("2000-01-01"))
+		frappe.db.bulk_insert(
+			"CRM Dashboard Rollup",
+			fields=COLUMNS,
+			values=[get_row_values(orphan, {**dict.fromkeys(MEASURES, 0), "record_count": 3}, now())],
+		)
+
+		rebuild_rollup()
+
+		self.assertEqual(get_rollup_snapshot(), incremental)
+		self.assertFalse(frappe.db.exists("CRM Dashboard Rollup", get_rollup_name(orphan)))
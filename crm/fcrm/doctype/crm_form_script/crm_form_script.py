@@ -5,6 +5,8 @@ import frappe
 from frappe import _
 from frappe.model.document import Document
 
+from crm.api.views import invalidate_view_config_cache
+
 
 class CRMFormScript(Document):
 	# begin: auto-generated types
@@ -38,6 +40,12 @@ class CRMFormScript(Document):
 			else:
 				frappe.throw(_("You need to be in developer mode to edit a Standard Form Script"))
 
+	def on_update(self):
+		invalidate_view_config_cache()
+
+	def on_trash(self):
+		invalidate_view_config_cache()
+
 
 def get_form_script(dt, view="Form"):
 	"""Returns the form script for the given doctype"""
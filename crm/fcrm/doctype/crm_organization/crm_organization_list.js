@@ -0,0 +1,40 @@
+frappe.listview_settings["CRM Organization"] = {
+  onload(listview) {
+    listview.page.add_menu_item(__("Enrich from Website"), () => {
+      frappe.confirm(
+        __("Enrich every organization matching the current filters from its website?"),
+        () => {
+          frappe
+            .call({
+              method: "crm.domain_enrichment.api.enrich_bulk",
+              args: {
+                reference_doctype: "CRM Organization",
+                filters: listview.get_filters_for_args(),
+              },
+            })
+            .then(({ message }) => {
+              frappe.show_alert({
+                message: __("Enrichment of {0} organizations queued", [message.count]),
+                indicator: "blue",
+              });
+            });
+        }
+      );
+    });
+
+    frappe.realtime.on("domain_enrichment_bulk_progress", (data) => {
+      if (data.reference_doctype !== "CRM Organization") return;
+      if (data.status === "completed") {
+        frappe.hide_progress();
+        listview.refresh();
+        return;
+      }
+      frappe.show_progress(
+        __("Domain Enrichment"),
+        data.done,
+        data.total,
+        __("Enriching organizations…")
+      );
+    });
+  },
+};
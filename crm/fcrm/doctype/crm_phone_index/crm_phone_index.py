@@ -0,0 +1,192 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and contributors
+# For license information, please see license.txt
+
+import re
+
+import frappe
+import phonenumbers
+from frappe.model.document import Document
+from frappe.query_builder import DocType
+from frappe.utils import now
+from phonenumbers import NumberParseException
+
+# Region callers' numbers without a country code are parsed with (see parse_phone_number)
+DEFAULT_REGION = "IN"
+COLUMNS = (
+	"name",
+	"creation",
+	"modified",
+	"owner",
+	"modified_by",
+	"reference_doctype",
+	"reference_name",
+	"phone",
+	"country_code",
+	"national_number",
+)
+BATCH_SIZE = 10_000
+
+
+class CRMPhoneIndex(Document):
+	# begin: auto-generated types
+	# This code is auto-generated. Do not modify anything in this block.
+
+	from typing import TYPE_CHECKING
+
+	if TYPE_CHECKING:
+		from frappe.types import DF
+
+		country_code: DF.Int
+		national_number: DF.Data | None
+		phone: DF.Data | None
+		reference_doctype: DF.Link | None
+		reference_name: DF.DynamicLink | None
+	# end: auto-generated types
+
+	pass
+
+
+def on_doctype_update():
+	frappe.db.add_index("CRM Phone Index", ["national_number", "country_code"])
+	frappe.db.add_index("CRM Phone Index", ["reference_doctype", "reference_name"])
+
+
+def parse_phone(phone_number: str, region: str | None = DEFAULT_REGION):
+	"""Parsed ``phonenumbers.PhoneNumber``, or None when the number can't be parsed."""
+	try:
+		return phonenumbers.parse(phone_number, region, keep_raw_input=True)
+	except NumberParseException:
+		return None
+
+
+def get_index_key(phone_number: str):
+	"""
+	(country code, national number) a saved number is indexed under, or None.
+
+	A number saved without a "+" can't be parsed without guessing its region, and may
+	well carry its country code anyway (1-415-555-0100), so it is indexed under country
+	code 0 with its digits, trunk zeros stripped. `get_lookup_key` gives the numbers a
+	caller matches such rows on.
+	"""
+	number = parse_phone(phone_number, None)
+	if number:
+		return number.country_code, phonenumbers.national_significant_number(number)
+
+	digits = re.sub(r"[^0-9]", "", phone_number).lstrip("0")
+	return (0, digits) if digits else None
+
+
+def get_lookup_key(number):
+	"""
+	(country code, national number, local numbers) a caller's parsed `number` is
+	looked up by.
+
+	Rows of the same country code match on the national number. Rows saved without
+	one (country code 0) match on either local number: the national number without
+	trunk zeros, or the country code followed by the national number.
+	"""
+	national_number = phonenumbers.national_significant_number(number)
+	local_numbers = {national_number.lstrip("0"), f"{number.country_code}{national_number}"}
+	return number.country_code, national_number, local_numbers
+
+
+def get_phones(doc):
+	if doc.doctype == "Contact":
+		return [row.phone for row in doc.get("phone_nos") or []]
+	return [doc.get("mobile_no")]
+
+
+def on_update(doc, method=None):
+	"""Re-index the numbers of a Contact (all of its phone_nos) or a CRM Lead (mobile_no)."""
+	phones = get_phones(doc)
+	doc_before_save = doc.get_doc_before_save()
+	if doc_before_save and get_phones(doc_before_save) == phones:
+		return
+
+	delete_index(doc.doctype, doc.name)
+	timestamp = now()
+	frappe.db.bulk_insert(
+		"CRM Phone Index",
+		fields=COLUMNS,
+		values=list(get_index_rows(doc.doctype, doc.name, phones, timestamp)),
+	)
+
+
+def on_trash(doc, method=None):
+	delete_index(doc.doctype, doc.name)
+
+
+def delete_index(reference_doctype, reference_name):
+	frappe.db.delete(
+		"CRM Phone Index", {"reference_doctype": reference_doctype, "reference_name": reference_name}
+	)
+
+
+def get_index_rows(reference_doctype, reference_name, phones, timestamp):
+	for phone in phones:
+		key = get_index_key(phone) if phone else None
+		if not key:
+			continue
+		yield (
+			frappe.generate_hash(),
+			timestamp,
+			timestamp,
+			"Administrator",
+			"Administrator",
+			reference_doctype,
+			reference_name,
+			phone,
+			*key,
+		)
+
+
+def rebuild_phone_index():
+	"""
+	Re-index every Contact phone number and CRM Lead mobile number.
+
+	Runs weekly to repair drift from writes that bypass document hooks (`db_set`,
+	raw SQL, bulk updates), and on migrate to backfill existing records.
+	"""
+	ContactPhone = DocType("Contact Phone")
+	Lead = DocType("CRM Lead")
+
+	contact_phones = (
+		frappe.qb.from_(ContactPhone)
+		.select(ContactPhone.name, ContactPhone.parent, ContactPhone.phone)
+		.where(
+			(ContactPhone.parenttype == "Contact")
+			& ContactPhone.phone.isnotnull()
+			& (ContactPhone.phone != "")
+		)
+	)
+	lead_phones = (
+		frappe.qb.from_(Lead)
+		.select(Lead.name, Lead.name, Lead.mobile_no)
+		.where(Lead.mobile_no.isnotnull() & (Lead.mobile_no != ""))
+	)
+
+	frappe.db.delete("CRM Phone Index")
+
+	timestamp = now()
+	for reference_doctype, query, name_column in (
+		("Contact", contact_phones, ContactPhone.name),
+		("CRM Lead", lead_phones, Lead.name),
+	):
+		for rows in scan(query, name_column):
+			frappe.db.bulk_insert(
+				"CRM Phone Index",
+				fields=COLUMNS,
+				values=[
+					row
+					for _name, reference_name, phone in rows
+					for row in get_index_rows(reference_doctype, reference_name, [phone], timestamp)
+				],
+			)
+
+
+def scan(query, name_column, batch_size=BATCH_SIZE):
+	"""Yield the rows of `query` in batches, paging on `name_column` (its first column)."""
+	last_name = ""
+	while rows := query.where(name_column > last_name).orderby(name_column).limit(batch_size).run():
+		yield rows
+		last_name = rows[-1][0]
@@ -0,0 +1,93 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and Contributors
+# See license.txt
+
+import frappe
+from frappe.tests import IntegrationTestCase
+
+from crm.fcrm.doctype.crm_phone_index.crm_phone_index import get_index_key, rebuild_phone_index
+from crm.integrations.api import get_contact_by_phone_number
+
+
+def get_index_snapshot():
+	rows = frappe.get_all(
+		"CRM Phone Index",
+		fields=["reference_doctype", "reference_name", "phone", "country_code", "national_number"],
+	)
+	return sorted(tuple(row.values()) for row in rows)
+
+
+def create_contact(*phones):
+	contact = frappe.get_doc({"doctype": "Contact", "first_name": "Phone", "last_name": "Index"})
+	for phone in phones:
+		contact.append("phone_nos", {"phone": phone})
+	return contact.insert()
+
+
+class TestCRMPhoneIndex(IntegrationTestCase):
+	def tearDown(self):
+		frappe.db.rollback()
+
+	def test_index_key(self):
+		self.assertEqual(get_index_key("+91 98765-43210"), (91, "9876543210"))
+		self.assertEqual(get_index_key("+1 (415) 555-2671"), (1, "4155552671"))
+		# no country code: its digits, whatever the region
+		self.assertEqual(get_index_key("098765 43210"), (0, "9876543210"))
+		self.assertEqual(get_index_key("1-415-555-0100"), (0, "14155550100"))
+		self.assertIsNone(get_index_key("not a number"))
+
+	def test_contact_numbers_follow_saves_and_deletes(self):
+		contact = create_contact("+91 98765 43220", "+1 415 555 2671")
+		self.assertEqual(
+			frappe.get_all(
+				"CRM Phone Index",
+				filters={"reference_doctype": "Contact", "reference_name": contact.name},
+				pluck="national_number",
+				order_by="national_number",
+			),
+			["4155552671", "9876543220"],
+		)
+
+		contact.phone_nos = contact.phone_nos[:1]
+		contact.save()
+		self.assertEqual(
+			frappe.get_all("CRM Phone Index", filters={"reference_name": contact.name}, pluck="phone"),
+			["+91 98765 43220"],
+		)
+
+		contact.delete()
+		self.assertFalse(frappe.db.exists("CRM Phone Index", {"reference_name": contact.name}))
+
+	def test_resolves_numbers_in_any_format(self):
+		contact = create_contact("98765 43221")
+
+		result = get_contact_by_phone_number("+91-98765-43221")
+
+		self.assertEqual(result["name"], contact.name)
+		self.assertEqual(result["matched_phone"], "98765 43221")
+		self.assertNotIn("name", get_contact_by_phone_number("+91 98765 43229"))
+
+	def test_resolves_national_numbers_of_other_regions(self):
+		us_contact = create_contact("1-415-555-0101")
+		local_contact = create_contact("(415) 555-0102")
+
+		self.assertEqual(get_contact_by_phone_number("+1 415 555 0101")["name"], us_contact.name)
+		self.assertEqual(get_contact_by_phone_number("+1 415 555 0102")["name"], local_contact.name)
+		self.assertNotIn("name", get_contact_by_phone_number("+1 415 555 0109"))
+
+	def test_rebuild_matches_incremental_updates(self):
+		create_contact("+91 98765 43222", "098765 43223")
+		lead = frappe.get_doc(
+			{
+				"doctype": "CRM Lead",
+				"first_name": "Phone",
+				"mobile_no": "+91 98765 43224",
+				"lead_owner": "Administrator",
+			}
+		).insert()
+		lead.mobile_no = "+91 98765 43225"
+		lead.save()
+
+		incremental = get_index_snapshot()
+		rebuild_phone_index()
+
+		self.assertEqual(get_index_snapshot(), incremental)
@@ -4,6 +4,8 @@
 import frappe
 from frappe.model.document import Document
 
+from crm.api.views import invalidate_view_config_cache
+
 
 class CRMProducts(Document):
 	# begin: auto-generated types
@@ -95,6 +97,7 @@ def create_product_details_script(doctype):
 	if frappe.db.exists("CRM Form Script", name):
 		if frappe.db.get_value("CRM Form Script", name, "script") != script:
 			frappe.db.set_value("CRM Form Script", name, "script", script)
+			invalidate_view_config_cache()
 		return
 	frappe.get_doc(
 		{
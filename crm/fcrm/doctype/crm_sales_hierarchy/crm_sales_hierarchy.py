@@ -4,6 +4,8 @@
 import frappe
 from frappe.utils.nestedset import NestedSet, update_nsm
 
+from crm.permissions.org_hierarchy import clear_permission_cache
+
 
 class CRMSalesHierarchy(NestedSet):
 	# begin: auto-generated types
@@ -28,7 +30,7 @@ class CRMSalesHierarchy(NestedSet):
 
 	def on_update(self):
 		update_nsm(self)
-		frappe.cache.delete_value("crm_sales_hierarchy_subtree")
+		clear_permission_cache()
 
 	def validate(self):
 		if self.user:
@@ -48,7 +50,7 @@ class CRMSalesHierarchy(NestedSet):
 			frappe.db.set_value("CRM Sales Hierarchy", self.reports_to, "is_group", 1)
 
 	def on_trash(self):
-		frappe.cache.delete_value("crm_sales_hierarchy_subtree")
+		clear_permission_cache()
 
 
 def on_doctype_update():
@@ -7,6 +7,8 @@ from frappe import _
 from frappe.model.document import Document, get_controller
 from frappe.utils import parse_json
 
+from crm.api.views import invalidate_view_config_cache
+
 
 class CRMViewSettings(Document):
 	# begin: auto-generated types
@@ -40,7 +42,11 @@ class CRMViewSettings(Document):
 		user: DF.Link | None
 	# end: auto-generated types
 
-	pass
+	def on_update(self):
+		invalidate_view_config_cache()
+
+	def on_trash(self):
+		invalidate_view_config_cache()
 
 
 @frappe.whitelist()
@@ -212,6 +218,7 @@ def set_as_default(name: str | int | None = None, type: str | None = None, docty
 		"is_default",
 		0,
 	)
+	invalidate_view_config_cache()
 
 
 @frappe.whitelist()
@@ -10,6 +10,7 @@ from frappe.model.document import Document
 
 from crm.demo.api import create_demo_data
 from crm.install import after_install
+from crm.permissions.org_hierarchy import clear_permission_cache
 
 
 class FCRMSettings(Document):
@@ -56,6 +57,10 @@ class FCRMSettings(Document):
 		self.setup_forecasting()
 		self.make_currency_read_only()
 
+	def on_update(self):
+		if self.has_value_changed("enable_sales_hierarchy"):
+			clear_permission_cache()
+
 	def do_not_allow_to_delete_if_standard(self):
 		if not self.has_value_changed("dropdown_items"):
 			return
@@ -163,13 +163,22 @@ override_doctype_class = {
 doc_events = {
 	"Contact": {
 		"validate": ["crm.api.contact.validate"],
+		"on_update": ["crm.fcrm.doctype.crm_phone_index.crm_phone_index.on_update"],
+		"on_trash": ["crm.fcrm.doctype.crm_phone_index.crm_phone_index.on_trash"],
 	},
 	"Notification Log": {
 		"before_insert": ["crm.extends.notification_log.before_insert"],
 	},
 	"ToDo": {
-		"after_insert": ["crm.api.todo.after_insert"],
-		"on_update": ["crm.api.todo.on_update"],
+		"after_insert": [
+			"crm.api.todo.after_insert",
+			"crm.permissions.org_hierarchy.on_todo_change",
+		],
+		"on_update": [
+			"crm.api.todo.on_update",
+			"crm.permissions.org_hierarchy.on_todo_change",
+		],
+		"on_trash": ["crm.permissions.org_hierarchy.on_todo_change"],
 	},
 	"Communication": {
 		"after_insert": ["crm.utils.on_communication_insert"],
@@ -183,10 +192,44 @@ doc_events = {
 		"validate": ["crm.api.whatsapp.validate"],
 		"on_update": ["crm.api.whatsapp.on_update"],
 	},
+	"CRM Lead": {
+		"on_update": [
+			"crm.fcrm.doctype.crm_dashboard_rollup.crm_dashboard_rollup.on_update",
+			"crm.fcrm.doctype.crm_phone_index.crm_phone_index.on_update",
+			"crm.api.dashboard.invalidate_dashboard_cache",
+		],
+		"on_trash": [
+			"crm.fcrm.doctype.crm_dashboard_rollup.crm_dashboard_rollup.on_trash",
+			"crm.fcrm.doctype.crm_phone_index.crm_phone_index.on_trash",
+			"crm.api.dashboard.invalidate_dashboard_cache",
+		],
+	},
 	"CRM Deal": {
 		"on_update": [
-			"crm.fcrm.doctype.erpnext_crm_settings.erpnext_crm_settings.create_customer_in_erpnext"
+			"crm.fcrm.doctype.erpnext_crm_settings.erpnext_crm_settings.create_customer_in_erpnext",
+			"crm.fcrm.doctype.crm_dashboard_rollup.crm_dashboard_rollup.on_update",
+			"crm.api.dashboard.invalidate_dashboard_cache",
 		],
+		"on_trash": [
+			"crm.fcrm.doctype.crm_dashboard_rollup.crm_dashboard_rollup.on_trash",
+			"crm.api.dashboard.invalidate_dashboard_cache",
+		],
+	},
+	"CRM Deal Status": {
+		"on_update": ["crm.api.dashboard.invalidate_dashboard_cache"],
+		"on_trash": ["crm.api.dashboard.invalidate_dashboard_cache"],
+	},
+	"DocType": {
+		"on_update": ["crm.api.views.invalidate_view_config_cache"],
+		"on_trash": ["crm.api.views.invalidate_view_config_cache"],
+	},
+	"Custom Field": {
+		"on_update": ["crm.api.views.invalidate_view_config_cache"],
+		"on_trash": ["crm.api.views.invalidate_view_config_cache"],
+	},
+	"Property Setter": {
+		"on_update": ["crm.api.views.invalidate_view_config_cache"],
+		"on_trash": ["crm.api.views.invalidate_view_config_cache"],
 	},
 	"Sales Order": {
 		"before_validate": [
@@ -222,7 +265,10 @@ doc_events = {
 # ---------------
 
 scheduler_events = {
-	"all": ["crm.api.event.trigger_offset_event_notifications"],
+	"all": [
+		"crm.api.event.trigger_offset_event_notifications",
+		"crm.lead_syncing.webhook.enqueue_drain",
+	],
 	"hourly": ["crm.api.event.trigger_hourly_event_notifications"],
 	"daily": [
 		"crm.api.event.trigger_daily_event_notifications",
@@ -231,7 +277,11 @@ scheduler_events = {
 		"crm.telemetry.capture_feature_state",
 	],
 	"weekly": ["crm.api.event.trigger_weekly_event_notifications"],
-	"daily_long": ["crm.lead_syncing.background_sync.sync_leads_from_sources_daily"],
+	"weekly_long": ["crm.fcrm.doctype.crm_phone_index.crm_phone_index.rebuild_phone_index"],
+	"daily_long": [
+		"crm.lead_syncing.background_sync.sync_leads_from_sources_daily",
+		"crm.fcrm.doctype.crm_dashboard_rollup.crm_dashboard_rollup.rebuild_rollup",
+	],
 	"hourly_long": ["crm.lead_syncing.background_sync.sync_leads_from_sources_hourly"],
 	"monthly_long": ["crm.lead_syncing.background_sync.sync_leads_from_sources_monthly"],
 	"cron": {
@@ -3,13 +3,14 @@ import socket
 from urllib.parse import urlparse, urlunparse
 
 import frappe
+import phonenumbers
 import requests
 from frappe import _
 from frappe.query_builder import Order
-from pypika.functions import Replace
 from werkzeug.wrappers import Response
 
-from crm.utils import are_same_phone_number, parse_phone_number
+from crm.fcrm.doctype.crm_phone_index.crm_phone_index import get_lookup_key, parse_phone
+from crm.utils import parse_phone_number
 
 
 def _get_recording_credentials(telephony_medium: str) -> tuple | None:
@@ -165,6 +166,38 @@ def get_contact_by_phone_number(phone_number: str):
 		return get_contact(phone_number, number.get("country"), exact_match=True)
 
 
+def get_contacts_by_phone_numbers(phone_numbers: list) -> dict:
+	"""
+	`get_contact_by_phone_number` for many numbers at once: {phone_number: contact}.
+
+	Each number is parsed once and all of them are resolved together by
+	`find_contacts`. Results are kept for the rest of the request, since call
+	lists and timelines repeat the same few numbers.
+	"""
+	resolved = getattr(frappe.local, "resolved_phone_numbers", None)
+	if resolved is None:
+		resolved = frappe.local.resolved_phone_numbers = {}
+
+	numbers = {}
+	for phone_number in set(phone_numbers) - resolved.keys():
+		number = _parse_caller_number(phone_number) if phone_number else None
+		if number:
+			numbers[phone_number] = number
+		else:
+			resolved[phone_number] = {"mobile_no": phone_number}
+
+	resolved.update(find_contacts(numbers))
+	return {phone_number: resolved[phone_number] for phone_number in phone_numbers}
+
+
+def _parse_caller_number(phone_number: str):
+	# the number get_contact_by_phone_number looks up: validated, else matched exactly
+	number = parse_phone_number(phone_number)
+	if number.get("is_valid"):
+		return parse_phone(number.get("national_number"), number.get("country"))
+	return parse_phone(phone_number, number.get("country"))
+
+
 def _resolve_validated_ip(hostname: str, port: int) -> str:
 	# Refuse any host that resolves to a non-public address (cloud metadata, localhost,
 	# private/link-local ranges) and return a single validated IP to connect to. Returning
@@ -303,79 +336,130 @@ def get_contact(phone_number: str, country: str = "IN", exact_match: bool = Fals
 	if not phone_number:
 		return {"mobile_no": phone_number}
 
-	cleaned_number = (
-		phone_number.strip()
-		.replace(" ", "")
-		.replace("-", "")
-		.replace("(", "")
-		.replace(")", "")
-		.replace("+", "")
-	)
+	number = parse_phone(phone_number, country)
+	if not number or not (exact_match or phonenumbers.is_valid_number(number)):
+		return {"mobile_no": phone_number}
 
-	# Check if the number is associated with a contact.
-	# Search all of a contact's numbers (phone_nos child table) and not just the
-	# primary mobile_no, so calls from a secondary number still resolve.
-	Contact = frappe.qb.DocType("Contact")
-	ContactPhone = frappe.qb.DocType("Contact Phone")
-	normalized_phone = Replace(
-		Replace(Replace(Replace(Replace(ContactPhone.phone, " ", ""), "-", ""), "(", ""), ")", ""), "+", ""
+	return find_contacts({phone_number: number})[phone_number]
+
+
+def find_contacts(numbers: dict) -> dict:
+	"""
+	Resolve parsed numbers ({phone_number: PhoneNumber}) to a contact, lead or deal
+	with one query each against CRM Phone Index: {phone_number: contact}.
+
+	A contact that is the primary contact of a deal wins, then the latest
+	unconverted lead, then the latest contact.
+	"""
+	if not numbers:
+		return {}
+
+	keys = {phone_number: get_lookup_key(number) for phone_number, number in numbers.items()}
+	national_numbers = list(
+		{
+			candidate
+			for _country_code, national_number, local_numbers in keys.values()
+			for candidate in (national_number, *local_numbers)
+		}
 	)
 
-	query = (
-		frappe.qb.from_(ContactPhone)
+	# Exact match on the normalized number. Numbers saved without a country code
+	# are indexed under 0 and match on the caller's local numbers.
+	PhoneIndex = frappe.qb.DocType("CRM Phone Index")
+
+	# All of a contact's numbers (phone_nos child table) are indexed and not just
+	# the primary mobile_no, so calls from a secondary number still resolve.
+	Contact = frappe.qb.DocType("Contact")
+	contacts = (
+		frappe.qb.from_(PhoneIndex)
 		.join(Contact)
-		.on(ContactPhone.parent == Contact.name)
+		.on(PhoneIndex.reference_name == Contact.name)
 		.select(
 			Contact.name,
 			Contact.full_name,
 			Contact.image,
 			Contact.mobile_no,
-			ContactPhone.phone.as_("matched_phone"),
+			PhoneIndex.phone.as_("matched_phone"),
+			PhoneIndex.national_number,
+			PhoneIndex.country_code,
 		)
-		.where(ContactPhone.parenttype == "Contact")
-		.where(normalized_phone.like(f"%{cleaned_number}%"))
+		.where(PhoneIndex.reference_doctype == "Contact")
+		.where(PhoneIndex.national_number.isin(national_numbers))
 		.orderby(Contact.modified, order=Order.desc)
+		.run(as_dict=True)
 	)
-	contacts = query.run(as_dict=True)
 
-	if len(contacts):
-		# Check if the contact is associated with a deal
-		for contact in contacts:
-			if frappe.db.exists("CRM Contacts", {"contact": contact.name, "is_primary": 1}):
-				deal = frappe.db.get_value(
-					"CRM Contacts", {"contact": contact.name, "is_primary": 1}, "parent"
-				)
-				if are_same_phone_number(
-					contact.matched_phone, phone_number, country, validate=not exact_match
-				):
-					contact["deal"] = deal
-					return contact
-
-	# Else, Check if the number is associated with a lead
-	Lead = frappe.qb.DocType("CRM Lead")
-	normalized_phone = Replace(
-		Replace(Replace(Replace(Replace(Lead.mobile_no, " ", ""), "-", ""), "(", ""), ")", ""), "+", ""
-	)
+	deals = {}
+	if contacts:
+		for row in frappe.get_all(
+			"CRM Contacts",
+			filters={"contact": ["in", list({contact.name for contact in contacts})], "is_primary": 1},
+			fields=["contact", "parent"],
+		):
+			deals.setdefault(row.contact, row.parent)
 
-	query = (
-		frappe.qb.from_(Lead)
-		.select(Lead.name, Lead.lead_name, Lead.image, Lead.mobile_no)
+	Lead = frappe.qb.DocType("CRM Lead")
+	leads = (
+		frappe.qb.from_(PhoneIndex)
+		.join(Lead)
+		.on(PhoneIndex.reference_name == Lead.name)
+		.select(
+			Lead.name,
+			Lead.lead_name,
+			Lead.image,
+			Lead.mobile_no,
+			PhoneIndex.national_number,
+			PhoneIndex.country_code,
+		)
+		.where(PhoneIndex.reference_doctype == "CRM Lead")
 		.where(Lead.converted == 0)
-		.where(normalized_phone.like(f"%{cleaned_number}%"))
-		.orderby("modified", order=Order.desc)
+		.where(PhoneIndex.national_number.isin(national_numbers))
+		.orderby(Lead.modified, order=Order.desc)
+		.run(as_dict=True)
 	)
-	leads = query.run(as_dict=True)
 
-	if len(leads):
-		for lead in leads:
-			if are_same_phone_number(lead.mobile_no, phone_number, country, validate=not exact_match):
-				lead["lead"] = lead.name
-				lead["full_name"] = lead.lead_name
-				return lead
+	def matching(rows, key):
+		country_code, national_number, local_numbers = key
+		return [
+			row
+			for row in rows
+			if (row.country_code == country_code and row.national_number == national_number)
+			or (row.country_code == 0 and row.national_number in local_numbers)
+		]
+
+	result = {}
+	for phone_number, key in keys.items():
+		matched_contacts = matching(contacts, key)
+		matched_leads = matching(leads, key)
+
+		# Check if the contact is associated with a deal
+		contact = next((contact for contact in matched_contacts if contact.name in deals), None)
+		if contact:
+			result[phone_number] = {**_contact_fields(contact), "deal": deals[contact.name]}
+		# Else, Check if the number is associated with a lead
+		elif matched_leads:
+			lead = matched_leads[0]
+			result[phone_number] = {
+				"name": lead.name,
+				"lead_name": lead.lead_name,
+				"image": lead.image,
+				"mobile_no": lead.mobile_no,
+				"lead": lead.name,
+				"full_name": lead.lead_name,
+			}
+		elif matched_contacts:
+			result[phone_number] = _contact_fields(matched_contacts[0])
+		else:
+			result[phone_number] = {"mobile_no": phone_number}
+
+	return result
 
-	if len(contacts) and are_same_phone_number(
-		contacts[0].matched_phone, phone_number, country, validate=not exact_match
-	):
-		return contacts[0]
 
-	return {"mobile_no": phone_number}
+def _contact_fields(contact):
+	return {
+		"name": contact.name,
+		"full_name": contact.full_name,
+		"image": contact.image,
+		"mobile_no": contact.mobile_no,
+		"matched_phone": contact.matched_phone,
+	}
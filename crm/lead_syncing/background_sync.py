@@ -1,16 +1,15 @@
 import frappe
 
+from crm.lead_syncing.doctype.lead_sync_source.lead_sync_source import enqueue_sync
+
 
 def sync_leads_from_all_enabled_sources(frequency: str | None = None) -> None:
+	"""Fan every enabled source of this frequency out as its own job (see `enqueue_sync`)."""
 	enabled_sources = frappe.get_all(
 		"Lead Sync Source", filters={"enabled": 1, "background_sync_frequency": frequency}, pluck="name"
 	)
 	for source in enabled_sources:
-		lead_sync_source = frappe.get_cached_doc("Lead Sync Source", source)
-		try:
-			lead_sync_source._sync_leads()
-		except Exception as _:
-			frappe.log_error(f"Error syncing leads for source {source}")
+		enqueue_sync(source)
 
 
 def sync_leads_from_sources_5_minutes() -> None:
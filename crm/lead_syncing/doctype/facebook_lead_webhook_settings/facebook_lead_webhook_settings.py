@@ -0,0 +1,21 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and contributors
+# For license information, please see license.txt
+
+from frappe.model.document import Document
+
+
+class FacebookLeadWebhookSettings(Document):
+	# begin: auto-generated types
+	# This code is auto-generated. Do not modify anything in this block.
+
+	from typing import TYPE_CHECKING
+
+	if TYPE_CHECKING:
+		from frappe.types import DF
+
+		app_secret: DF.Password | None
+		enabled: DF.Check
+		webhook_verify_token: DF.Data | None
+	# end: auto-generated types
+
+	pass
@@ -0,0 +1,166 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and Contributors
+# See license.txt
+
+import hashlib
+import hmac
+import json
+from unittest.mock import patch
+
+import frappe
+from frappe.tests import IntegrationTestCase
+from frappe.utils import set_request
+
+from crm.lead_syncing.doctype.lead_sync_source.facebook import FacebookSyncSource
+from crm.lead_syncing.doctype.lead_sync_source.test_lead_sync_source import make_facebook_lead
+from crm.lead_syncing.webhook import (
+	BUFFER_KEY,
+	DRAIN_JOB_ID,
+	SETTINGS,
+	drain_lead_buffer,
+	enqueue_drain,
+	facebook_leadgen,
+)
+
+WEBHOOK_PATH = "/api/method/crm.lead_syncing.webhook.facebook_leadgen"
+FORM_ID = "test-webhook-form"
+
+
+def make_lead_form_source(form_id):
+	frappe.get_doc(
+		{
+			"doctype": "Facebook Lead Form",
+			"id": form_id,
+			"form_name": "Webhook Test Form",
+			"page": "test-webhook-page",
+			"questions": [
+				{"key": "email", "mapped_to_crm_field": "email"},
+				{"key": "first_name", "mapped_to_crm_field": "first_name"},
+			],
+		}
+	).insert(ignore_permissions=True, ignore_links=True)
+
+	source = frappe.get_doc(
+		{
+			"doctype": "Lead Sync Source",
+			"name": f"Webhook Source {form_id}",
+			"type": "Facebook",
+			"enabled": 1,
+			"access_token": "token",
+			"facebook_lead_form": form_id,
+			"background_sync_frequency": "Hourly",
+		}
+	)
+	with patch(
+		"crm.lead_syncing.doctype.lead_sync_source.lead_sync_source.fetch_and_store_pages_from_facebook"
+	):
+		return source.insert(ignore_permissions=True, ignore_links=True)
+
+
+class IntegrationTestFacebookLeadWebhookSettings(IntegrationTestCase):
+	def setUp(self):
+		settings = frappe.get_single(SETTINGS)
+		settings.update({"enabled": 1, "app_secret": "app-secret", "webhook_verify_token": "verify-me"})
+		settings.save()
+
+	def tearDown(self):
+		frappe.db.rollback()
+		frappe.clear_document_cache(SETTINGS, SETTINGS)
+		frappe.cache.delete_value(BUFFER_KEY)
+		frappe.local.request = None
+
+	def deliver(self, body, signature=None):
+		if signature is None:
+			signature = "sha256=" + hmac.new(b"app-secret", body.encode(), hashlib.sha256).hexdigest()
+		set_request(
+			method="POST",
+			path=WEBHOOK_PATH,
+			data=body,
+			headers={"Content-Type": "application/json", "X-Hub-Signature-256": signature},
+		)
+		with (
+			patch.object(frappe.cache, "rpush") as rpush,
+			patch.object(frappe.cache, "llen", return_value=1),
+			patch.object(frappe, "enqueue") as enqueue,
+		):
+			facebook_leadgen()
+		return rpush, enqueue
+
+	def test_subscription_handshake_echoes_challenge(self):
+		set_request(
+			method="GET",
+			path=WEBHOOK_PATH,
+			query_string="hub.mode=subscribe&hub.verify_token=verify-me&hub.challenge=1158201444",
+		)
+		self.assertEqual(facebook_leadgen().get_data(as_text=True), "1158201444")
+
+	def test_signed_delivery_is_buffered(self):
+		body = json.dumps(
+			{
+				"object": "page",
+				"entry": [
+					{
+						"id": "1",
+						"changes": [
+							{
+								"field": "leadgen",
+								"value": {"leadgen_id": "444", "form_id": "555", "page_id": "1"},
+							}
+						],
+					}
+				],
+			}
+		)
+
+		rpush, enqueue = self.deliver(body)
+
+		self.assertEqual(json.loads(rpush.call_args.args[1])["leadgen_id"], "444")
+		self.assertTrue(enqueue.call_args.kwargs["deduplicate"])
+
+	def test_unsigned_delivery_is_rejected(self):
+		with self.assertRaises(frappe.PermissionError):
+			self.deliver(json.dumps({"entry": []}), signature="sha256=forged")
+
+	def test_scheduler_only_enqueues_a_drain_for_buffered_leads(self):
+		with patch.object(frappe, "enqueue") as enqueue:
+			with patch.object(frappe.cache, "llen", return_value=0):
+				enqueue_drain()
+			enqueue.assert_not_called()
+
+			with patch.object(frappe.cache, "llen", return_value=3):
+				enqueue_drain()
+			self.assertEqual(enqueue.call_args.kwargs["job_id"], DRAIN_JOB_ID)
+			self.assertTrue(enqueue.call_args.kwargs["deduplicate"])
+
+	def test_drain_syncs_buffered_leads_of_enabled_sources(self):
+		make_lead_form_source(FORM_ID)
+		frappe.cache.delete_value(BUFFER_KEY)
+		for lead_id, form_id in (("9001", FORM_ID), ("9002", FORM_ID), ("9003", "unknown-form")):
+			frappe.cache.rpush(BUFFER_KEY, json.dumps({"leadgen_id": lead_id, "form_id": form_id}))
+
+		def read_leads(url, params):
+			return {
+				lead_id: make_facebook_lead(lead_id, f"{lead_id}@example.com")
+				for lead_id in params["ids"].split(",")
+			}
+
+		with (
+			patch(
+				"crm.lead_syncing.doctype.lead_sync_source.facebook.make_get_request", side_effect=read_leads
+			) as get_request,
+			patch.object(
+				FacebookSyncSource, "sync_page", autospec=True, side_effect=FacebookSyncSource.sync_page
+			) as sync_page,
+			patch.object(frappe.db, "commit"),
+		):
+			drain_lead_buffer()
+
+		# one ?ids= read and one page, for the enabled source's form only
+		self.assertEqual(get_request.call_count, 1)
+		self.assertEqual(get_request.call_args.kwargs["params"]["ids"], "9001,9002")
+		self.assertEqual(sync_page.call_count, 1)
+		self.assertCountEqual(
+			frappe.get_all("CRM Lead", filters={"facebook_form_id": FORM_ID}, pluck="facebook_lead_id"),
+			["9001", "9002"],
+		)
+		self.assertFalse(frappe.db.exists("CRM Lead", {"facebook_lead_id": "9003"}))
+		self.assertEqual(frappe.cache.llen(BUFFER_KEY), 0)
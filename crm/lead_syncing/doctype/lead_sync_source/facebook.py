@@ -1,9 +1,17 @@
 import frappe
 from frappe.exceptions import ValidationError
 from frappe.integrations.utils import make_get_request
+from frappe.utils import create_batch, cstr
 
 FB_GRAPH_API_BASE = "https://graph.facebook.com"
 FB_GRAPH_API_VERSION = "v23.0"
+# Leads requested per Graph API page; the API may return fewer
+LEADS_PAGE_SIZE = 500
+# Leads inserted per transaction while syncing a page
+LEADS_COMMIT_BATCH_SIZE = 100
+# Most objects the Graph API reads in one `?ids=` request
+GRAPH_IDS_PER_REQUEST = 50
+LEAD_FIELDS = "id,created_time,field_data"
 
 
 class DuplicateLeadError(ValidationError):
@@ -32,30 +40,59 @@ class FacebookSyncSource:
 	def get_api_url(self, endpoint: str) -> str:
 		return get_fb_graph_api_url(endpoint)
 
-	def sync(self):
-		leads = self.fetch_leads()
-		for lead in leads:
-			self.sync_single_lead(lead)
-		self.update_last_synced_at()
-
-	def sync_single_lead(self, lead, raise_exception=False):
+	def sync(self) -> int:
+		"""Sync the leads created since the last sync; returns how many were created."""
+		# Leads created while the sync runs are picked up by the next one
+		sync_started_at = frappe.utils.now()
+		synced_leads = sum(self.sync_page(leads) for leads in self.fetch_lead_pages())
+		self.update_last_synced_at(sync_started_at)
+		return synced_leads
+
+	def sync_page(self, leads: list[dict]) -> int:
+		"""
+		Insert a page of leads, committing every `LEADS_COMMIT_BATCH_SIZE` of them.
+
+		Leads that were already synced (an interrupted run being picked up again)
+		are skipped with one query for the whole page, and the page is checked for
+		duplicates against the existing leads of this form with one more.
+		"""
+		if not leads:
+			return 0
+
+		synced = set(
+			frappe.get_all(
+				"CRM Lead",
+				filters={"facebook_lead_id": ["in", [lead["id"] for lead in leads]]},
+				pluck="facebook_lead_id",
+			)
+		)
+		leads = [lead for lead in leads if lead["id"] not in synced]
+		if not leads:
+			return 0
+
+		known_leads = self.get_known_leads([self.get_crm_lead_data(lead) for lead in leads])
+		created = 0
+		for batch in create_batch(leads, LEADS_COMMIT_BATCH_SIZE):
+			for lead in batch:
+				created += bool(self.sync_single_lead(lead, known_leads=known_leads))
+			frappe.db.commit()  # nosemgrep
+		return created
+
+	def sync_single_lead(self, lead, raise_exception=False, known_leads: set | None = None):
 		question_to_field_map = self.get_form_questions_mapping()
-		lead_data = {item["name"]: item["values"][0] for item in lead["field_data"]}
-		crm_lead_data = {
-			question_to_field_map.get(k): v for k, v in lead_data.items() if k in question_to_field_map
-		}
-		crm_lead_data["source"] = "Facebook"
-		crm_lead_data["facebook_lead_id"] = lead["id"]
-		crm_lead_data["facebook_form_id"] = self.form_id
+		crm_lead_data = self.get_crm_lead_data(lead)
 
 		try:
-			self.validate_duplicate_lead(crm_lead_data, question_to_field_map)
-			return frappe.get_doc(
+			self.validate_duplicate_lead(crm_lead_data, question_to_field_map, known_leads)
+			crm_lead = frappe.get_doc(
 				{
 					"doctype": "CRM Lead",
 					**crm_lead_data,
 				}
 			).insert(ignore_permissions=True)
+			if known_leads is not None:
+				known_leads.add(self.get_duplicate_key(crm_lead_data))
+			return crm_lead
 		except (frappe.UniqueValidationError, DuplicateLeadError):
 			self.create_failure_log(lead, "Duplicate")
 			if raise_exception:
@@ -65,12 +102,25 @@ class FacebookSyncSource:
 			if raise_exception:
 				raise
 
-	def fetch_leads(self):
+	def get_crm_lead_data(self, lead: dict) -> dict:
+		question_to_field_map = self.get_form_questions_mapping()
+		lead_data = {item["name"]: item["values"][0] for item in lead["field_data"]}
+		crm_lead_data = {
+			question_to_field_map.get(k): v for k, v in lead_data.items() if k in question_to_field_map
+		}
+		crm_lead_data["source"] = "Facebook"
+		crm_lead_data["facebook_lead_id"] = lead["id"]
+		crm_lead_data["facebook_form_id"] = self.form_id
+		return crm_lead_data
+
+	def fetch_lead_pages(self):
+		"""Yield the leads created since the last sync, one page at a time, following the
+		Graph API's `paging.next` cursors."""
 		url = self.get_api_url(f"/{self.form_id}/leads")
 		params = {
 			"access_token": self.access_token,
-			"fields": "id,created_time,field_data",
-			"limit": 100000,  # TODO: pagination
+			"fields": LEAD_FIELDS,
+			"limit": LEADS_PAGE_SIZE,
 		}
 
 		filtering = []
@@ -79,10 +129,23 @@ class FacebookSyncSource:
 			filtering.append({"field": "time_created", "operator": "GREATER_THAN", "value": timestamp})
 			params["filtering"] = frappe.as_json(filtering)
 
-		return make_get_request(
-			url,
-			params=params,
-		).get("data", [])
+		while url:
+			response = make_get_request(url, params=params)
+			yield response.get("data", [])
+			# the next page's URL carries the token, fields, filtering and cursor
+			url = response.get("paging", {}).get("next")
+			params = None
+
+	def fetch_leads_by_ids(self, lead_ids: list[str]) -> list[dict]:
+		"""Read the given leads, `GRAPH_IDS_PER_REQUEST` per Graph API request."""
+		leads = []
+		for batch in create_batch(lead_ids, GRAPH_IDS_PER_REQUEST):
+			response = make_get_request(
+				self.get_api_url("/"),
+				params={"ids": ",".join(batch), "fields": LEAD_FIELDS, "access_token": self.access_token},
+			)
+			leads.extend(response.values())
+		return leads
 
 	def get_form_questions_mapping(self):
 		if self.form_questions_mapping:
@@ -118,12 +181,12 @@ class FacebookSyncSource:
 			}
 		).insert(ignore_permissions=True)
 
-	def update_last_synced_at(self):
+	def update_last_synced_at(self, synced_at: str | None = None):
 		frappe.db.set_value(
 			"Lead Sync Source",
 			self.source_name or {"facebook_lead_form": self.form_id},
 			"last_synced_at",
-			frappe.utils.now(),
+			synced_at or frappe.utils.now(),
 		)
 
 	def get_source_name(self):
@@ -132,12 +195,42 @@ class FacebookSyncSource:
 
 		return frappe.db.get_value("Lead Sync Source", {"facebook_lead_form": self.form_id}, "name")
 
-	def validate_duplicate_lead(self, lead_data: dict, field_mapping: dict):
+	def validate_duplicate_lead(self, lead_data: dict, field_mapping: dict, known_leads: set | None = None):
+		if known_leads is not None:
+			if self.get_duplicate_key(lead_data) in known_leads:
+				raise DuplicateLeadError
+			return
+
 		validation_filters = {crm_field: lead_data[crm_field] for crm_field in field_mapping.values()}
 		validation_filters["facebook_form_id"] = lead_data["facebook_form_id"]  # only for this campaign
 		if frappe.db.exists("CRM Lead", validation_filters):
 			raise DuplicateLeadError
 
+	def get_duplicate_fields(self) -> list[str]:
+		return sorted(set(self.get_form_questions_mapping().values()))
+
+	def get_duplicate_key(self, lead_data: dict) -> tuple:
+		# compared the way the database would: case-insensitively, NULL as ""
+		return tuple(cstr(lead_data.get(field)).casefold() for field in self.get_duplicate_fields())
+
+	def get_known_leads(self, leads_data: list[dict]) -> set:
+		"""Duplicate keys of this form's existing leads that may match any of `leads_data`."""
+		fields = self.get_duplicate_fields()
+		filters = {"facebook_form_id": self.form_id}
+		if not fields:
+			# nothing mapped: any earlier lead of the form is a duplicate
+			return {()} if frappe.db.exists("CRM Lead", filters) else set()
+
+		values = list({cstr(lead_data.get(fields[0])) for lead_data in leads_data})
+		or_filters = [[fields[0], "in", values]]
+		if "" in values:
+			# an empty answer also matches leads stored with NULL, as in get_duplicate_key
+			or_filters.append([fields[0], "is", "not set"])
+		return {
+			self.get_duplicate_key(lead_data)
+			for lead_data in frappe.get_all("CRM Lead", filters=filters, or_filters=or_filters, fields=fields)
+		}
+
 
 @frappe.whitelist()
 def fetch_and_store_pages_from_facebook(access_token: str) -> list[dict]:
@@ -3,12 +3,17 @@
 
 import frappe
 from frappe.model.document import Document
+from frappe.utils import now, now_datetime, time_diff_in_seconds
 
 from crm.lead_syncing.doctype.lead_sync_source.facebook import (
 	FacebookSyncSource,
 	fetch_and_store_pages_from_facebook,
 )
 
+# Seconds a source's sync job may run: a burst of leads takes many pages, and
+# enqueue_doc would otherwise give it the default 300
+LEAD_SYNC_TIMEOUT = 3600
+
 
 class LeadSyncSource(Document):
 	# begin: auto-generated types
@@ -26,7 +31,11 @@ class LeadSyncSource(Document):
 		enabled: DF.Check
 		facebook_lead_form: DF.Link | None
 		facebook_page: DF.Link | None
+		last_sync_duration: DF.Duration | None
+		last_sync_lag: DF.Duration | None
+		last_sync_status: DF.Literal["", "Success", "Failed"]
 		last_synced_at: DF.Datetime | None
+		last_synced_leads: DF.Int
 		type: DF.Literal["Facebook"]
 	# end: auto-generated types
 
@@ -59,11 +68,54 @@ class LeadSyncSource(Document):
 			self._sync_leads()
 			return
 
-		frappe.enqueue_doc(self.doctype, self.name, "_sync_leads", queue="long")
+		enqueue_sync(self.name)
 
-	def _sync_leads(self):
+	def _sync_leads(self, enqueued_at: str | None = None):
 		if self.type == "Facebook" and self.access_token:
 			if not self.facebook_lead_form:
 				frappe.throw(frappe._("Please select a lead gen form before syncing!"))
 
-			FacebookSyncSource(self.get_password("access_token"), self.facebook_lead_form).sync()
+			started_at = now_datetime()
+			try:
+				synced_leads = FacebookSyncSource(
+					self.get_password("access_token"), self.facebook_lead_form, self.name
+				).sync()
+			except Exception:
+				# batches committed so far stay; record the failure past the job's rollback
+				frappe.db.rollback()
+				self.record_sync(started_at, enqueued_at, status="Failed")
+				frappe.db.commit()  # nosemgrep
+				raise
+
+			self.record_sync(started_at, enqueued_at, synced_leads)
+
+	def record_sync(self, started_at, enqueued_at=None, synced_leads=0, status="Success"):
+		self.db_set(
+			{
+				"last_sync_status": status,
+				"last_synced_leads": synced_leads,
+				"last_sync_duration": time_diff_in_seconds(now_datetime(), started_at),
+				"last_sync_lag": time_diff_in_seconds(started_at, enqueued_at) if enqueued_at else 0,
+			},
+			update_modified=False,
+		)
+
+
+def enqueue_sync(source: str):
+	"""
+	Sync a Lead Sync Source in its own long job.
+
+	The per-source ``job_id`` with ``deduplicate`` makes this a no-op while the
+	source's previous sync is still queued or running, so a slow source neither
+	piles up jobs nor holds up the others.
+	"""
+	frappe.enqueue_doc(
+		"Lead Sync Source",
+		source,
+		"_sync_leads",
+		queue="long",
+		timeout=LEAD_SYNC_TIMEOUT,
+		job_id=f"lead-sync-{source}",
+		deduplicate=True,
+		enqueued_at=now(),
+	)
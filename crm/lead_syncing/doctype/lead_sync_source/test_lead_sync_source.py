@@ -1,15 +1,33 @@
 # Copyright (c) 2025, Frappe Technologies Pvt. Ltd. and Contributors
 # See license.txt
 
-# import frappe
+from unittest.mock import patch
+
+import frappe
 from frappe.tests import IntegrationTestCase
 
+from crm.lead_syncing.background_sync import sync_leads_from_sources_5_minutes
+from crm.lead_syncing.doctype.lead_sync_source.facebook import GRAPH_IDS_PER_REQUEST, FacebookSyncSource
+
 # On IntegrationTestCase, the doctype test records and all
 # link-field test record dependencies are recursively loaded
 # Use these module variables to add/remove to/from that list
 EXTRA_TEST_RECORD_DEPENDENCIES = []  # eg. ["User"]
 IGNORE_TEST_RECORD_DEPENDENCIES = []  # eg. ["User"]
 
+FORM_ID = "test-facebook-form"
+
+
+def make_facebook_lead(lead_id, email):
+	return {
+		"id": lead_id,
+		"created_time": "2026-10-18T10:00:00+0000",
+		"field_data": [
+			{"name": "email", "values": [email]},
+			{"name": "first_name", "values": ["Facebook"]},
+		],
+	}
+
 
 class IntegrationTestLeadSyncSource(IntegrationTestCase):
 	"""
@@ -17,4 +35,84 @@ class IntegrationTestLeadSyncSource(IntegrationTestCase):
 	Use this class for testing interactions between multiple components.
 	"""
 
-	pass
+	def tearDown(self):
+		frappe.db.rollback()
+
+	def sync(self, responses):
+		source = FacebookSyncSource("token", FORM_ID)
+		source.form_questions_mapping = {"email": "email", "first_name": "first_name"}
+		with (
+			patch(
+				"crm.lead_syncing.doctype.lead_sync_source.facebook.make_get_request", side_effect=responses
+			) as get_request,
+			patch.object(frappe.db, "commit"),
+		):
+			source.sync()
+		return get_request
+
+	def test_facebook_sync_follows_pages_and_skips_synced_leads(self):
+		next_page = "https://graph.facebook.com/v23.0/next-page"
+		responses = [
+			{
+				"data": [
+					make_facebook_lead("1001", "a@example.com"),
+					make_facebook_lead("1002", "b@example.com"),
+				],
+				"paging": {"next": next_page},
+			},
+			# a second submission with the same answers is a duplicate
+			{"data": [make_facebook_lead("1003", "A@example.com")], "paging": {}},
+		]
+
+		get_request = self.sync(responses)
+
+		self.assertEqual(get_request.call_args_list[1].args[0], next_page)
+		leads = frappe.get_all("CRM Lead", filters={"facebook_form_id": FORM_ID}, pluck="facebook_lead_id")
+		self.assertCountEqual(leads, ["1001", "1002"])
+
+		# an interrupted sync picked up again doesn't insert or flag synced leads twice
+		self.sync(responses[:1])
+		self.assertEqual(frappe.db.count("CRM Lead", {"facebook_form_id": FORM_ID}), 2)
+		self.assertFalse(frappe.db.exists("Failed Lead Sync Log", {"lead_data": ["like", '%"1001"%']}))
+
+	def test_empty_answer_is_a_duplicate_of_a_lead_without_the_field(self):
+		frappe.get_doc({"doctype": "CRM Lead", "first_name": "Facebook", "facebook_form_id": FORM_ID}).insert(
+			ignore_permissions=True
+		)
+
+		self.sync([{"data": [make_facebook_lead("2001", "")], "paging": {}}])
+
+		self.assertFalse(frappe.db.exists("CRM Lead", {"facebook_lead_id": "2001"}))
+		self.assertTrue(frappe.db.exists("Failed Lead Sync Log", {"lead_data": ["like", '%"2001"%']}))
+
+	def test_leads_are_read_by_id_in_batches(self):
+		lead_ids = [str(lead_id) for lead_id in range(2 * GRAPH_IDS_PER_REQUEST + 1)]
+
+		def read_leads(url, params):
+			return {
+				lead_id: make_facebook_lead(lead_id, "a@example.com") for lead_id in params["ids"].split(",")
+			}
+
+		with patch(
+			"crm.lead_syncing.doctype.lead_sync_source.facebook.make_get_request", side_effect=read_leads
+		) as get_request:
+			leads = FacebookSyncSource("token", FORM_ID).fetch_leads_by_ids(lead_ids)
+
+		self.assertEqual(
+			[len(call.kwargs["params"]["ids"].split(",")) for call in get_request.call_args_list],
+			[GRAPH_IDS_PER_REQUEST, GRAPH_IDS_PER_REQUEST, 1],
+		)
+		self.assertEqual([lead["id"] for lead in leads], lead_ids)
+
+	def test_scheduler_enqueues_one_deduplicated_job_per_source(self):
+		with (
+			patch.object(frappe, "get_all", return_value=["Form A", "Form B"]),
+			patch.object(frappe, "enqueue_doc") as enqueue_doc,
+		):
+			sync_leads_from_sources_5_minutes()
+
+		self.assertEqual([call.args[1] for call in enqueue_doc.call_args_list], ["Form A", "Form B"])
+		job_ids = {call.kwargs["job_id"] for call in enqueue_doc.call_args_list}
+		self.assertEqual(len(job_ids), 2)
+		self.assertTrue(all(call.kwargs["deduplicate"] for call in enqueue_doc.call_args_list))
+		self.assertTrue(all(call.kwargs["timeout"] > 300 for call in enqueue_doc.call_args_list))
@@ -0,0 +1,132 @@
+"""Real-time Facebook lead ingestion.
+
+Facebook calls ``facebook_leadgen`` for every lead submitted on a subscribed page.
+The endpoint only verifies the delivery, appends the lead ids to a Redis list and
+enqueues ``drain_lead_buffer``; that job reads the buffered leads from the Graph API
+in batches and inserts them through the form's Lead Sync Source, like a scheduled
+sync does. A burst of deliveries costs each web request a few Redis calls, and the
+scheduled sync of every source still picks up anything a delivery missed.
+
+Callback URL: <site>/api/method/crm.lead_syncing.webhook.facebook_leadgen
+"""
+
+import hashlib
+import hmac
+import json
+from collections import defaultdict
+
+import frappe
+from frappe import _
+from werkzeug.wrappers import Response
+
+from crm.lead_syncing.doctype.lead_sync_source.facebook import FacebookSyncSource
+
+SETTINGS = "Facebook Lead Webhook Settings"
+BUFFER_KEY = "crm_facebook_leadgen_buffer"
+DRAIN_JOB_ID = "facebook-leadgen-drain"
+# Buffered leads taken per drain round
+DRAIN_BATCH_SIZE = 500
+
+
+@frappe.whitelist(allow_guest=True, methods=["GET", "POST"])
+def facebook_leadgen(**kwargs):
+	settings = frappe.get_cached_doc(SETTINGS)
+	if not settings.enabled:
+		frappe.throw(_("Facebook lead webhook is not enabled"), exc=frappe.PermissionError)
+
+	if frappe.request.method == "GET":
+		return verify_subscription(settings)
+
+	validate_signature(settings)
+
+	entries = [
+		frappe.as_json(change["value"], indent=None)
+		for entry in (frappe.parse_json(frappe.request.get_data(as_text=True)) or {}).get("entry", [])
+		for change in entry.get("changes", [])
+		if change.get("field") == "leadgen" and change.get("value", {}).get("leadgen_id")
+	]
+	for entry in entries:
+		frappe.cache.rpush(BUFFER_KEY, entry)
+	if entries:
+		enqueue_drain()
+
+	return Response("OK", mimetype="text/plain")
+
+
+def verify_subscription(settings):
+	# Facebook's subscription handshake: echo the challenge if the verify token matches
+	args = frappe.request.args
+	token = settings.webhook_verify_token
+	if args.get("hub.mode") != "subscribe" or not token or args.get("hub.verify_token") != token:
+		frappe.throw(_("Unauthorized request"), exc=frappe.PermissionError)
+
+	return Response(args.get("hub.challenge", ""), mimetype="text/plain")
+
+
+def validate_signature(settings):
+	# X-Hub-Signature-256: sha256=<HMAC-SHA256 of the raw body, keyed with the app secret>
+	app_secret = settings.get_password("app_secret", raise_exception=False)
+	signature = frappe.get_request_header("X-Hub-Signature-256") or ""
+	if not app_secret or not signature.startswith("sha256="):
+		frappe.throw(_("Unauthorized request"), exc=frappe.PermissionError)
+
+	expected = hmac.new(app_secret.encode(), frappe.request.get_data(), hashlib.sha256).hexdigest()
+	if not hmac.compare_digest(signature.removeprefix("sha256="), expected):
+		frappe.throw(_("Unauthorized request"), exc=frappe.PermissionError)
+
+
+def enqueue_drain():
+	"""
+	Enqueue `drain_lead_buffer` unless it is already queued or running, or there is
+	nothing to drain.
+
+	Also runs on every scheduler tick, for leads buffered just as a previous drain
+	was finishing (their delivery's enqueue was deduplicated against it).
+	"""
+	if not frappe.cache.llen(BUFFER_KEY):
+		return
+
+	frappe.enqueue(
+		"crm.lead_syncing.webhook.drain_lead_buffer",
+		queue="long",
+		job_id=DRAIN_JOB_ID,
+		deduplicate=True,
+	)
+
+
+def drain_lead_buffer():
+	"""Sync buffered leads until the buffer is empty, `DRAIN_BATCH_SIZE` at a time."""
+	while entries := pop_buffered_leads(DRAIN_BATCH_SIZE):
+		lead_ids_by_form = defaultdict(list)
+		for entry in entries:
+			value = json.loads(entry)
+			lead_ids_by_form[str(value.get("form_id"))].append(str(value["leadgen_id"]))
+
+		for form_id, lead_ids in lead_ids_by_form.items():
+			source = frappe.db.get_value(
+				"Lead Sync Source",
+				{"type": "Facebook", "enabled": 1, "facebook_lead_form": form_id},
+				"name",
+			)
+			if not source:
+				# leads of forms without an enabled source aren't synced
+				continue
+
+			try:
+				source_doc = frappe.get_cached_doc("Lead Sync Source", source)
+				sync_source = FacebookSyncSource(
+					source_doc.get_password("access_token"), form_id, source_name=source
+				)
+				sync_source.sync_page(sync_source.fetch_leads_by_ids(list(dict.fromkeys(lead_ids))))
+			except Exception:
+				# left to the source's scheduled sync, which reads every lead since its last run
+				frappe.db.rollback()
+				frappe.log_error(f"Error syncing Facebook webhook leads for source {source}")
+
+
+def pop_buffered_leads(count: int) -> list:
+	key = frappe.cache.make_key(BUFFER_KEY)
+	pipe = frappe.cache.pipeline()
+	pipe.lrange(key, 0, count - 1)
+	pipe.ltrim(key, count, -1)
+	return pipe.execute()[0]
@@ -0,0 +1,5 @@
+from crm.fcrm.doctype.crm_dashboard_rollup.crm_dashboard_rollup import rebuild_rollup
+
+
+def execute():
+	rebuild_rollup()
@@ -0,0 +1,5 @@
+from crm.fcrm.doctype.crm_phone_index.crm_phone_index import rebuild_phone_index
+
+
+def execute():
+	rebuild_phone_index()
@@ -1,14 +1,25 @@
 # Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and contributors
 # For license information, please see license.txt
 
+import hashlib
+
 import frappe
-from frappe.utils.caching import request_cache
 
 _OWNER_FIELD = {
 	"CRM Lead": "lead_owner",
 	"CRM Deal": "deal_owner",
 }
 
+# Redis hashes holding, per user, the users of their subtree and the records assigned
+# to those users. Both are cleared on any CRM Sales Hierarchy change and when the
+# hierarchy is switched on or off in FCRM Settings; a ToDo change only drops the
+# assigned records of the users whose team includes its assignee.
+SUBTREE_CACHE_KEY = "crm_sales_hierarchy_subtree"
+ASSIGNED_CACHE_KEY = "crm_sales_hierarchy_assigned"
+
+# Beyond this many values the conditions fall back to subqueries instead of IN lists
+MAX_INLINE_VALUES = 1000
+
 
 def hierarchy_enabled() -> bool:
 	return bool(frappe.db.get_single_value("FCRM Settings", "enable_sales_hierarchy"))
@@ -35,6 +46,13 @@ def _permission_query_conditions(user: str | None, doctype: str):
 	DT = frappe.qb.DocType(doctype)
 	Todo = frappe.qb.DocType("ToDo").as_("_todo")
 
+	members = _team_members(user) if in_tree else [user]
+	assigned = _assigned_records(user, doctype, members)
+	if len(members) <= MAX_INLINE_VALUES and assigned is not None:
+		# Owned by the user or their subtree, or assigned to any of them by an open ToDo
+		condition = DT[owner_field].isin(members)
+		return condition | DT.name.isin(assigned) if assigned else condition
+
 	if in_tree:
 		# Owner is the user themselves or any member of their subtree
 		q1 = (DT[owner_field] == user) | DT[owner_field].isin(_team_mem_query(user))
@@ -88,6 +106,14 @@ def _has_permission(doc, ptype, user, doctype: str) -> bool | None:
 	if "Sales Manager" in roles and not in_tree:
 		return True
 
+	members = _team_members(user) if in_tree else [user]
+	assigned = _assigned_records(user, doctype, members)
+	if assigned is not None:
+		if doc.name in assigned:
+			return True
+		# the stored owner, not the in-memory one, which the request may have changed
+		return frappe.db.get_value(doctype, doc.name, _OWNER_FIELD[doctype]) in members
+
 	conditions = _permission_query_conditions(user, doctype)
 	DT = frappe.qb.DocType(doctype)
 	return bool(
@@ -104,7 +130,104 @@ def has_deal_permission(doc, ptype, user):
 
 
 def _in_hierarchy(user: str) -> bool:
-	return bool(frappe.db.exists("CRM Sales Hierarchy", {"user": user}))
+	# a user's subtree includes their own node
+	return bool(_team_members(user))
+
+
+def _team_members(user: str) -> list[str]:
+	"""Users of the hierarchy subtree rooted at `user`'s node, `user` included."""
+	members = frappe.cache.hget(SUBTREE_CACHE_KEY, user)
+	if members is None:
+		members = [member for member in _team_mem_query(user).run(pluck=True) if member]
+		frappe.cache.hset(SUBTREE_CACHE_KEY, user, members)
+	return members
+
+
+def _assigned_records(user: str, doctype: str, members: list[str]) -> list[str] | None:
+	"""
+	Names of `doctype` records with an open ToDo allocated to any of `members`, or None
+	when there are more than `MAX_INLINE_VALUES` of them.
+	"""
+	key = _assigned_key(user, doctype, members)
+	assigned = frappe.cache.hget(ASSIGNED_CACHE_KEY, key)
+	if assigned is None:
+		Todo = frappe.qb.DocType("ToDo")
+		names = (
+			frappe.qb.from_(Todo)
+			.select(Todo.reference_name)
+			.distinct()
+			.where(
+				(Todo.reference_type == doctype)
+				& (Todo.status != "Cancelled")
+				& (Todo.allocated_to.isin(members))
+			)
+			.limit(MAX_INLINE_VALUES + 1)
+			.run(pluck=True)
+		)
+		# an empty string stands for "too many to inline" so it can be cached too
+		assigned = names if len(names) <= MAX_INLINE_VALUES else ""
+		frappe.cache.hset(ASSIGNED_CACHE_KEY, key, assigned)
+
+	return None if assigned == "" else assigned
+
+
+def _assigned_key(user: str, doctype: str, members: list[str]) -> str:
+	# keyed on the members too: a user's records differ with the hierarchy on and off
+	members_hash = hashlib.md5("\n".join(sorted(members)).encode(), usedforsecurity=False).hexdigest()
+	return f"{doctype}:{user}:{members_hash}"
+
+
+def clear_permission_cache(doc=None, method=None):
+	"""
+	Drop the cached subtrees and assigned records, now and again once the transaction ends
+	so that neither a concurrent read nor a rollback leaves uncommitted data cached.
+	"""
+
+	def clear():
+		frappe.cache.delete_value(SUBTREE_CACHE_KEY)
+		frappe.cache.delete_value(ASSIGNED_CACHE_KEY)
+
+	_clear_now_and_after_transaction(clear)
+
+
+def on_todo_change(doc, method=None):
+	"""Drop the cached assigned records of the users whose team includes the ToDo's assignee."""
+	if doc.reference_type not in _OWNER_FIELD:
+		return
+
+	assignees = {doc.allocated_to}
+	if doc_before_save := doc.get_doc_before_save():
+		assignees.add(doc_before_save.allocated_to)
+	assignees.discard(None)
+	if not assignees:
+		return
+
+	# the assignees and their managers, with their records cached with or without the hierarchy
+	keys = [
+		_assigned_key(user, doc.reference_type, members)
+		for user in {*assignees, *filter(None, _managers_query(assignees).run(pluck=True))}
+		for members in ([user], _team_members(user))
+	]
+	_clear_now_and_after_transaction(lambda: frappe.cache.hdel(ASSIGNED_CACHE_KEY, keys))
+
+
+def _clear_now_and_after_transaction(clear):
+	clear()
+	frappe.db.after_commit.add(clear)
+	frappe.db.after_rollback.add(clear)
+
+
+def _managers_query(users):
+	Node = frappe.qb.DocType("CRM Sales Hierarchy").as_("_sqnode")
+	Manager = frappe.qb.DocType("CRM Sales Hierarchy").as_("_sqmanager")
+	return (
+		frappe.qb.from_(Node)
+		.join(Manager)
+		.on((Node.lft > Manager.lft) & (Node.lft < Manager.rgt))
+		.select(Manager.user)
+		.distinct()
+		.where(Node.user.isin(list(users)))
+	)
 
 
 def _team_mem_query(user: str):
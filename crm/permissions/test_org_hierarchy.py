@@ -6,6 +6,9 @@ from frappe.tests import IntegrationTestCase
 from frappe.utils.nestedset import rebuild_tree
 
 from crm.permissions.org_hierarchy import (
+	ASSIGNED_CACHE_KEY,
+	SUBTREE_CACHE_KEY,
+	_assigned_key,
 	get_lead_permission_query_conditions,
 	has_deal_permission,
 	has_lead_permission,
@@ -18,7 +21,9 @@ class TestOrgHierarchy(IntegrationTestCase):
 	Hierarchy structure used in tests:
 	  manager@hier.test  (root)
 	  ├── rep1@hier.test
-	  └── rep2@hier.test
+	  ├── rep2@hier.test
+	  └── teamlead@hier.test  (a Sales User)
+	      └── member@hier.test
 	  outsider@hier.test  (not in the hierarchy)
 	"""
 
@@ -30,11 +35,15 @@ class TestOrgHierarchy(IntegrationTestCase):
 		make_user("rep1@hier.test", roles=["Sales User"])
 		make_user("rep2@hier.test", roles=["Sales User"])
 		make_user("outsider@hier.test", roles=["Sales User"])
+		make_user("teamlead@hier.test", roles=["Sales User"])
+		make_user("member@hier.test", roles=["Sales User"])
 
 		# Build hierarchy
 		mgr = make_hierarchy_node("manager@hier.test", is_group=1)
 		make_hierarchy_node("rep1@hier.test", reports_to=mgr.name)
 		make_hierarchy_node("rep2@hier.test", reports_to=mgr.name)
+		teamlead = make_hierarchy_node("teamlead@hier.test", reports_to=mgr.name, is_group=1)
+		make_hierarchy_node("member@hier.test", reports_to=teamlead.name)
 		rebuild_tree("CRM Sales Hierarchy")
 
 		settings = frappe.get_single("FCRM Settings")
@@ -144,6 +153,40 @@ class TestOrgHierarchy(IntegrationTestCase):
 		finally:
 			frappe.set_user("Administrator")
 
+	def test_query_conditions_inline_team_members(self):
+		conditions = get_lead_permission_query_conditions("manager@hier.test")
+		self.assertIn("'rep1@hier.test'", conditions)
+		self.assertIn("'rep2@hier.test'", conditions)
+		self.assertNotIn("CRM Sales Hierarchy", conditions)
+
+	def test_new_assignment_refreshes_cached_records(self):
+		lead = make_lead("outsider@hier.test")
+		self.assertFalse(has_lead_permission(lead, "read", "rep2@hier.test"))
+
+		assign_todo("CRM Lead", lead.name, "rep1@hier.test")
+		# keep the owner so that only the assignment grants access
+		frappe.db.set_value("CRM Lead", lead.name, "lead_owner", "outsider@hier.test")
+
+		self.assertTrue(has_lead_permission(lead, "read", "manager@hier.test"))
+		self.assertIn(f"'{lead.name}'", get_lead_permission_query_conditions("manager@hier.test"))
+
+	def test_assignment_only_drops_cached_records_of_assignee_team(self):
+		lead = make_lead("outsider@hier.test")
+		for user in ("manager@hier.test", "rep2@hier.test", "teamlead@hier.test"):
+			has_lead_permission(lead, "read", user)
+
+		assign_todo("CRM Lead", lead.name, "rep2@hier.test")
+
+		def cached_records(user):
+			members = frappe.cache.hget(SUBTREE_CACHE_KEY, user)
+			return frappe.cache.hget(ASSIGNED_CACHE_KEY, _assigned_key(user, "CRM Lead", members))
+
+		self.assertIsNotNone(frappe.cache.hget(SUBTREE_CACHE_KEY, "manager@hier.test"))
+		self.assertIsNone(cached_records("rep2@hier.test"))
+		self.assertIsNone(cached_records("manager@hier.test"))
+		# not in rep2's chain of managers
+		self.assertIsNotNone(cached_records("teamlead@hier.test"))
+
 	# ------------------------------------------------------------------
 	# Hierarchy disabled
 	# ------------------------------------------------------------------
@@ -162,6 +205,23 @@ class TestOrgHierarchy(IntegrationTestCase):
 			settings.enable_sales_hierarchy = 1
 			settings.save(ignore_permissions=True)
 
+	def test_disabling_hierarchy_drops_cached_team_assignments(self):
+		lead = make_lead("outsider@hier.test")
+		assign_todo("CRM Lead", lead.name, "member@hier.test")
+
+		# caches the records assigned to the team lead's team
+		self.assertTrue(has_lead_permission(lead, "read", "teamlead@hier.test"))
+
+		settings = frappe.get_single("FCRM Settings")
+		settings.enable_sales_hierarchy = 0
+		settings.save(ignore_permissions=True)
+		try:
+			self.assertFalse(has_lead_permission(lead, "read", "teamlead@hier.test"))
+			self.assertNotIn(f"'{lead.name}'", get_lead_permission_query_conditions("teamlead@hier.test"))
+		finally:
+			settings.enable_sales_hierarchy = 1
+			settings.save(ignore_permissions=True)
+
 	def test_query_conditions_when_hierarchy_disabled(self):
 		settings = frappe.get_single("FCRM Settings")
 		settings.enable_sales_hierarchy = 0
@@ -0,0 +1,71 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and Contributors
+# See license.txt
+
+import frappe
+from frappe.tests import IntegrationTestCase
+
+from crm.api.activities import get_activities, get_activities_page, get_attachments
+from crm.fcrm.doctype.crm_lead.test_crm_lead import create_lead
+
+
+def attach_file(doctype, name, file_name):
+	return frappe.get_doc(
+		{
+			"doctype": "File",
+			"file_name": file_name,
+			"content": b"activity attachment",
+			"attached_to_doctype": doctype,
+			"attached_to_name": name,
+		}
+	).insert()
+
+
+class TestActivities(IntegrationTestCase):
+	def tearDown(self):
+		frappe.db.rollback()
+
+	def test_comment_attachments_are_grouped_per_comment(self):
+		lead = create_lead(first_name="Timeline")
+		comments = [lead.add_comment("Comment", text=f"Comment {i}") for i in range(3)]
+		attach_file("Comment", comments[0].name, "first.txt")
+		attach_file("Comment", comments[0].name, "second.txt")
+		attach_file("Comment", comments[2].name, "third.txt")
+
+		activities = get_activities(lead.name)[0]
+		comment_activities = {a["name"]: a for a in activities if a["activity_type"] == "comment"}
+
+		for comment in comments:
+			expected = get_attachments("Comment", comment.name)
+			self.assertEqual(
+				sorted(f.name for f in comment_activities[comment.name]["attachments"]),
+				sorted(f.name for f in expected),
+			)
+
+		self.assertEqual(comment_activities[comments[1].name]["attachments"], [])
+
+	def test_activity_feed_pages_through_full_timeline(self):
+		"""Following the feed cursor returns every timeline entry once, newest first"""
+		lead = create_lead(first_name="Feed")
+		comments = [lead.add_comment("Comment", text=f"Comment {i}") for i in range(5)]
+		attach_file("Comment", comments[3].name, "feed.txt")
+
+		feed, cursor = [], None
+		while True:
+			page = get_activities_page(lead.name, limit=2, cursor=cursor)
+			self.assertLessEqual(len(page["activities"]), 2)
+			feed.extend(page["activities"])
+			if not (cursor := page["cursor"]):
+				break
+
+		timeline = get_activities(lead.name)[0]
+		self.assertEqual(
+			[a["name"] for a in feed if a["activity_type"] == "comment"],
+			[a["name"] for a in timeline if a["activity_type"] == "comment"],
+		)
+		self.assertEqual(feed[-1]["activity_type"], "creation")
+
+		creations = [a["creation"] for a in feed]
+		self.assertEqual(creations, sorted(creations, reverse=True))
+
+		commented = next(a for a in feed if a.get("name") == comments[3].name)
+		self.assertEqual([f.file_name for f in commented["attachments"]], ["feed.txt"])
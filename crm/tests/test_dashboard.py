@@ -649,3 +649,28 @@ class TestDashboard(IntegrationTestCase):
 			self.assertIn("name", item)
 			# Validate name is not empty
 			self.assertTrue(item["name"])
+
+	def test_dashboard_matches_individual_charts(self):
+		"""Test that widgets built together from shared scans match the same widgets built alone"""
+		dashboard = get_dashboard(self.from_date, self.to_date)
+
+		for item in dashboard:
+			if item["data"] is None:
+				continue
+			chart = get_chart(item["name"], item["type"], self.from_date, self.to_date)
+			self.assertEqual(
+				item["data"], chart, f"Chart {item['name']} differs when built with the dashboard"
+			)
+
+	def test_chart_cache_invalidated_on_write(self):
+		"""Test that cached charts are rebuilt after a write to the underlying data"""
+		before = get_chart("total_leads", "number", self.from_date, self.to_date)["value"]
+		self.assertEqual(get_chart("total_leads", "number", self.from_date, self.to_date)["value"], before)
+
+		lead = frappe.get_doc({"doctype": "CRM Lead", "first_name": "Dashboard Cache"}).insert()
+		self.assertEqual(
+			get_chart("total_leads", "number", self.from_date, self.to_date)["value"], before + 1
+		)
+
+		lead.delete()
+		self.assertEqual(get_chart("total_leads", "number", self.from_date, self.to_date)["value"], before)
@@ -0,0 +1,162 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and Contributors
+# See license.txt
+
+import time
+from unittest.mock import patch
+
+import frappe
+from frappe.tests import IntegrationTestCase
+from frappe.tests.utils import make_test_records
+
+from crm.api.doc import get_data, get_list_count_key, get_total_count, get_view_config
+from crm.api.views import invalidate_view_config_cache
+from crm.fcrm.doctype.crm_view_settings.crm_view_settings import create_or_update_standard_view
+
+
+class TestGetData(IntegrationTestCase):
+	@classmethod
+	def setUpClass(cls):
+		super().setUpClass()
+		make_test_records("CRM Deal Status")
+		make_test_records("CRM Organization")
+		make_test_records("CRM Deal")
+
+	@classmethod
+	def tearDownClass(cls):
+		frappe.db.rollback()
+		super().tearDownClass()
+
+	def get_kanban(self, kanban_columns, **kwargs):
+		return get_data(
+			doctype="CRM Deal",
+			filters={},
+			order_by="modified desc",
+			column_field="status",
+			kanban_columns=kanban_columns,
+			view={"view_type": "kanban"},
+			**kwargs,
+		)
+
+	def test_kanban_columns_counts_and_pages(self):
+		"""Every kanban column gets its own page and total count from the grouped queries"""
+		statuses = frappe.get_all("CRM Deal Status", pluck="name")
+		result = self.get_kanban([{"name": status, "page_length": 2} for status in statuses])
+
+		for column in result["data"]:
+			status = column["column"]["name"]
+			expected = frappe.get_list(
+				"CRM Deal",
+				filters={"status": status},
+				order_by="modified desc, name desc",
+				pluck="name",
+				limit_page_length=2,
+			)
+
+			self.assertEqual(column["column"]["all_count"], frappe.db.count("CRM Deal", {"status": status}))
+			self.assertEqual([d.name for d in column["data"]], expected)
+			self.assertEqual(column["column"]["count"], len(expected))
+
+	def test_kanban_manually_ordered_column(self):
+		"""Columns with a manual card order keep using their own per-column query"""
+		deals = frappe.get_all("CRM Deal", filters={"status": "Qualification"}, pluck="name", limit=3)
+		result = self.get_kanban([{"name": "Qualification", "order": list(reversed(deals))}])
+
+		names = [d.name for d in result["data"][0]["data"]]
+		self.assertEqual(names[: len(deals)], list(reversed(deals)))
+
+	def get_list_page(self, **kwargs):
+		return get_data(
+			doctype="CRM Deal",
+			filters={},
+			order_by="status asc, modified desc",
+			rows=["name", "status", "modified"],
+			columns=[{"label": "Name", "type": "Data", "key": "name"}],
+			view={"view_type": "list"},
+			use_cursor=True,
+			**kwargs,
+		)
+
+	def test_cursor_pagination_walks_full_list(self):
+		"""Following cursors returns every record exactly once, in list order"""
+		expected = frappe.get_list("CRM Deal", order_by="status asc, modified desc, name desc", pluck="name")
+
+		names = []
+		result = self.get_list_page(page_length=5)
+		while True:
+			self.assertLessEqual(result["row_count"], 5)
+			names.extend(d.name for d in result["data"])
+			if not result["cursor"]:
+				break
+			result = self.get_list_page(page_length=5, cursor=result["cursor"])
+
+		self.assertEqual(names, expected)
+
+	def test_cursor_for_other_order_is_rejected(self):
+		result = self.get_list_page(page_length=5)
+		self.assertTrue(result["cursor"])
+
+		with self.assertRaises(frappe.ValidationError):
+			get_data(
+				doctype="CRM Deal",
+				filters={},
+				order_by="creation asc",
+				view={"view_type": "list"},
+				cursor=result["cursor"],
+			)
+
+	def test_estimated_count_served_from_cache(self):
+		"""The first estimated count is exact and cached, later ones come from cache and refresh in the background once stale"""
+		filters = frappe._dict({"status": "Qualification"})
+		exact = frappe.db.count("CRM Deal", filters)
+		key = get_list_count_key("CRM Deal", filters)
+		frappe.cache.delete_value(key)
+
+		with patch("frappe.enqueue") as enqueue:
+			first = get_total_count("CRM Deal", filters, True)
+			second = get_total_count("CRM Deal", filters, True)
+		self.assertEqual(enqueue.call_count, 0)
+
+		self.assertEqual(first["total_count"], exact)
+		self.assertFalse(first["total_count_estimated"])
+		self.assertEqual(second["total_count"], exact)
+		self.assertTrue(second["total_count_estimated"])
+
+		frappe.cache.set_value(key, {"total_count": exact, "counted_at": time.time() - 3600})
+		with patch("frappe.enqueue") as enqueue:
+			stale = get_total_count("CRM Deal", filters, True)
+		self.assertEqual(stale["total_count"], exact)
+		self.assertEqual(enqueue.call_count, 1)
+
+	def test_restricted_user_not_served_table_estimate(self):
+		"""Unfiltered lists only use table statistics when permissions don't restrict them"""
+		filters = frappe._dict()
+		frappe.cache.delete_value(get_list_count_key("CRM Deal", filters))
+
+		with (
+			patch("crm.api.doc.get_match_cond", return_value=" and `tabCRM Deal`.`deal_owner` = 'x'"),
+			patch.object(frappe.db, "estimate_count", return_value=10**6) as estimate_count,
+		):
+			result = get_total_count("CRM Deal", filters, True)
+
+		estimate_count.assert_not_called()
+		self.assertFalse(result["total_count_estimated"])
+		self.assertEqual(result["total_count"], frappe.db.count("CRM Deal"))
+
+	def test_view_config_refreshed_on_view_settings_change(self):
+		"""Saving the standard view replaces the cached columns of the list view"""
+		frappe.db.delete("CRM View Settings", {"dt": "CRM Deal", "user": frappe.session.user})
+		invalidate_view_config_cache()
+		self.assertIsNone(get_view_config("CRM Deal", "list").standard_view)
+
+		columns = [{"label": "Status", "type": "Select", "key": "status", "width": "10rem"}]
+		create_or_update_standard_view(
+			{"doctype": "CRM Deal", "type": "list", "columns": columns, "rows": ["name", "status"]}
+		)
+
+		config = get_view_config("CRM Deal", "list")
+		self.assertEqual([column["key"] for column in config.standard_view.columns], ["status"])
+
+		result = get_data(
+			doctype="CRM Deal", filters={}, order_by="modified desc", view={"view_type": "list"}
+		)
+		self.assertEqual([column["key"] for column in result["columns"]], ["status"])